@@ -2,30 +2,40 @@ from langchain_community.document_loaders import PyPDFLoader, DirectoryLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_huggingface import HuggingFaceEmbeddings
 from typing import List
+from concurrent.futures import ProcessPoolExecutor
 from langchain.schema import Document
 import os
 
-def load_pdf_files(data_path: str) -> List[Document]:
-    """Load all PDF files from a directory."""
+def _load_pdf_file(file_path: str):
+    """Load one PDF in a worker process; returns (docs, error message)."""
+    try:
+        return PyPDFLoader(file_path).load(), None
+    except Exception as e:
+        return [], str(e)
+
+def load_pdf_files(data_path: str, max_workers: int = None) -> List[Document]:
+    """Load all PDF files from a directory, one file per worker process."""
     documents = []
     
     # Get all PDF files
     pdf_files = [f for f in os.listdir(data_path) if f.endswith('.pdf')]
     
     print(f"📚 Found {len(pdf_files)} PDF files")
-    
-    for pdf_file in pdf_files:
-        file_path = os.path.join(data_path, pdf_file)
-        try:
-            print(f"📄 Loading: {pdf_file}")
-            loader = PyPDFLoader(file_path)
-            docs = loader.load()
+    if not pdf_files:
+        return documents
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(pdf_files))
+    file_paths = [os.path.join(data_path, pdf_file) for pdf_file in pdf_files]
+
+    # map keeps the original file order even though files finish in any order
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for pdf_file, (docs, error) in zip(pdf_files, executor.map(_load_pdf_file, file_paths)):
+            if error is not None:
+                print(f"⚠️ Error loading {pdf_file}: {error}")
+                print(f"⏭️ Skipping this file...")
+                continue
             documents.extend(docs)
             print(f"✅ Loaded {len(docs)} pages from {pdf_file}")
-        except Exception as e:
-            print(f"⚠️ Error loading {pdf_file}: {str(e)}")
-            print(f"⏭️ Skipping this file...")
-            continue
     
     print(f"\n✅ Total documents loaded: {len(documents)}")
     return documents
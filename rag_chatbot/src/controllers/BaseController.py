@@ -18,6 +18,12 @@ class BaseController:
             self.base_dir,
             "assets/database"
         )
+
+        # content-addressed store: one copy per distinct upload, project files link into it
+        self.blob_dir = os.path.join(
+            self.base_dir,
+            "assets/blobs"
+        )
         
     
     def generate_random_string(self, length: int=12):
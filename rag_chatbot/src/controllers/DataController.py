@@ -3,6 +3,7 @@ from fastapi import UploadFile
 from models import ResponseSignal
 import os
 from .ProjectController import ProjectController
+import shutil
 import re
 
 class DataController(BaseController):
@@ -18,28 +19,43 @@ class DataController(BaseController):
             return False, ResponseSignal.File_Size_Error.value
         
         return True, ResponseSignal.File_Valid.value
-    def generate_unique_filepath(self, orig_file_name: str, project_id: str):
+    def generate_upload_filepath(self, project_id: str):
+        """Temporary path the upload is streamed to before its content hash is known."""
+        project_path = ProjectController().get_project_path(project_id=project_id)
+        return os.path.join(project_path, f".upload_{self.generate_random_string()}.part")
+
+    def get_blob_path(self, content_hash: str, orig_file_name: str):
+        extension = os.path.splitext(orig_file_name)[-1].lower()
+        return os.path.join(self.blob_dir, content_hash[:2], content_hash + extension)
 
-        random_key = self.generate_random_string()
+    def store_upload(self, temp_path: str, content_hash: str, orig_file_name: str, project_id: str):
+        """Move a finished upload into the content-addressed store and link it into the project.
+        The file id is derived from the content hash, so uploading the same file again only finds the
+        existing file. Returns (file_id, deduplicated)."""
         project_path = ProjectController().get_project_path(project_id=project_id)
+        cleaned_file_name = self.get_clean_file_name(orig_file_name=orig_file_name)
+        file_id = content_hash[:12] + "_" + cleaned_file_name
+        file_path = os.path.join(project_path, file_id)
 
-        cleaned_file_name = self.get_clean_file_name(
-            orig_file_name=orig_file_name
-        )
+        if os.path.exists(file_path):
+            os.remove(temp_path)
+            return file_id, True
 
-        new_file_path = os.path.join(
-            project_path,
-            random_key + "_" + cleaned_file_name
-        )
+        blob_path = self.get_blob_path(content_hash, cleaned_file_name)
+        deduplicated = os.path.exists(blob_path)
+        if deduplicated:
+            os.remove(temp_path)
+        else:
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.replace(temp_path, blob_path)
 
-        while os.path.exists(new_file_path):
-            random_key = self.generate_random_string()
-            new_file_path = os.path.join(
-                project_path,
-                random_key + "_" + cleaned_file_name
-            )
+        try:
+            os.link(blob_path, file_path)
+        except OSError:
+            # filesystems without hard links get a plain copy
+            shutil.copyfile(blob_path, file_path)
 
-        return new_file_path, random_key + "_" + cleaned_file_name
+        return file_id, deduplicated
 
     def get_clean_file_name(self, orig_file_name: str):
 
@@ -0,0 +1,120 @@
+from .ProcessController import ProcessController
+from stores.LLM.LLMEnums import DocumentTypeEnum
+from stores.lexical.LexicalIndexStore import get_lexical_index_store
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+class IngestionController(ProcessController):
+    """Upload -> chunk -> embed -> store for one project.
+    Pages are read lazily, chunked by a generator and embedded and written in fixed-size batches, so memory
+    stays bounded by one page, the carried overlap and one batch no matter how long the document is."""
+
+    def __init__(self, project_id: str):
+        super().__init__(project_id=project_id)
+
+    def get_collection_name(self) -> str:
+        return f"project_{self.project_id}"
+
+    def iter_chunks(self, file_id: str, chunk_size: int = 100, overlap_size: int = 20, stats: dict = None):
+        """Stream the file's chunks: from the chunk cache, or with pages coming lazily from the loader through
+        the generator chunker. Counts parsed pages into `stats["pages_parsed"]` when a stats dict is given."""
+        def counted_pages():
+            for page in self.iter_file_content(file_id):
+                if stats is not None:
+                    stats["pages_parsed"] += 1
+                yield page
+
+        yield from self.iter_processed_chunks(file_id, chunk_size=chunk_size, overlap_size=overlap_size,
+                                              pages=counted_pages(), stats=stats)
+
+    def get_chunk_id(self, text: str) -> str:
+        # content-addressed: the same chunk text maps to the same point in the project collection
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _flush(self, embedding_client, vector_db_provider, collection_name: str, batch: list, stats: dict) -> bool:
+        """Embed and write the batch's chunks that the collection does not hold yet."""
+        unique = {}
+        for chunk, index in batch:
+            unique.setdefault(self.get_chunk_id(chunk.page_content), (chunk, index))
+        existing = vector_db_provider.get_existing_ids(collection_name=collection_name, record_ids=list(unique.keys()))
+        new = [(chunk_id, chunk, index) for chunk_id, (chunk, index) in unique.items() if chunk_id not in existing]
+        stats["chunks_duplicate"] += len(batch) - len(new)
+
+        if new:
+            texts = [chunk.page_content for _, chunk, _ in new]
+            vectors = embedding_client.embed_many(texts, document_type=DocumentTypeEnum.DOCUMENT.value)
+            if not vectors or len(vectors) != len(texts):
+                logger.error(f"Embedding failed for a batch of {len(texts)} chunks in {collection_name}")
+                return False
+            stats["chunks_embedded"] += len(texts)
+
+            metadata = [{**chunk.metadata, "chunk_index": index} for _, chunk, index in new]
+            record_ids = [chunk_id for chunk_id, _, _ in new]
+            ok = vector_db_provider.insert_many(
+                collection_name=collection_name,
+                texts=texts,
+                vectors=vectors,
+                metadata=metadata,
+                record_ids=record_ids,
+                batch_size=len(texts),
+            )
+            if not ok:
+                logger.error(f"Vector DB insert failed for a batch of {len(texts)} chunks in {collection_name}")
+                return False
+            stats["points_written"] += len(texts)
+
+            # same ids and payloads as the vector points, so hybrid search can fuse the two rankings
+            get_lexical_index_store().add_many(collection_name, record_ids, texts,
+                                               [{"text": text, "metadata": meta} for text, meta in zip(texts, metadata)])
+
+        stats["chunks_processed"] += len(batch)
+        return True
+
+    def ingest_file(self, file_id: str, embedding_client, vector_db_provider, chunk_size: int = 100,
+                    overlap_size: int = 20, do_reset: bool = False, batch_size: int = 64, progress=None,
+                    resume: dict = None) -> dict:
+        """Chunk, embed and store one uploaded file into the project's collection.
+        `progress(stats)` is called after every written batch and may raise to stop the run. Batches are written
+        in order, so passing the stats of an interrupted run as `resume` skips the chunks it already processed
+        and continues its counters.
+        Chunks whose text is already stored in the collection (repeated within the file, or from an earlier
+        upload) are neither embedded nor written again. Returns the final stats."""
+        embedding_size = getattr(embedding_client, "embedding_size", None)
+        if embedding_size is None:
+            raise ValueError("Embedding client does not have embedding_size set")
+
+        collection_name = self.get_collection_name()
+        # a resumed run must not wipe what the interrupted one already wrote
+        vector_db_provider.create_collection(collection_name=collection_name, embedding_size=embedding_size,
+                                             do_reset=bool(do_reset) and not resume)
+        if do_reset and not resume:
+            get_lexical_index_store().reset(collection_name)
+
+        stats = {"collection_name": collection_name, "pages_parsed": 0, "chunks_read": 0}
+        for counter in ("chunks_processed", "chunks_duplicate", "chunks_embedded", "points_written"):
+            stats[counter] = (resume or {}).get(counter, 0)
+        resume_from = stats["chunks_processed"]
+        batch = []
+        chunks = self.iter_chunks(file_id, chunk_size=chunk_size, overlap_size=overlap_size, stats=stats)
+        for index, chunk in enumerate(chunks):
+            stats["chunks_read"] += 1
+            if index < resume_from:
+                continue
+            batch.append((chunk, index))
+            if len(batch) >= batch_size:
+                if not self._flush(embedding_client, vector_db_provider, collection_name, batch, stats):
+                    raise RuntimeError(f"Ingestion of '{file_id}' failed after {stats['chunks_processed']} chunks")
+                batch = []
+                if progress:
+                    progress(stats)
+
+        if batch:
+            if not self._flush(embedding_client, vector_db_provider, collection_name, batch, stats):
+                raise RuntimeError(f"Ingestion of '{file_id}' failed after {stats['chunks_processed']} chunks")
+            if progress:
+                progress(stats)
+
+        logger.info(f"Ingested {file_id} into {collection_name}: {stats}")
+        return stats
@@ -0,0 +1,105 @@
+from .BaseController import BaseController
+from .IngestionController import IngestionController
+from .PatientController import PatientController
+from models import ResponseSignal
+from stores.lexical.LexicalIndexStore import get_lexical_index_store
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+class JobController(BaseController):
+    """Background job handlers run by the JobScheduler.
+    Each handler receives a JobContext, reports progress through it and returns the final progress dict."""
+
+    INGEST_DOCUMENT = "ingest_document"
+    INDEX_PATIENTS = "index_patients"
+
+    def __init__(self, provider_registry):
+        super().__init__()
+        self.provider_registry = provider_registry
+        # one patient index run per collection; a replacement for a cancelled run waits for it to stop
+        self.index_locks = {}
+        self.index_locks_lock = threading.Lock()
+
+    def handlers(self) -> dict:
+        return {
+            self.INGEST_DOCUMENT: self.ingest_document,
+            self.INDEX_PATIENTS: self.index_patients,
+        }
+
+    def _clients(self):
+        embedding_client = self.provider_registry.embedding_client
+        vector_db_provider = self.provider_registry.vector_db_provider
+        if not embedding_client or not vector_db_provider:
+            raise RuntimeError(ResponseSignal.Ingestion_Not_Configured.value)
+        return embedding_client, vector_db_provider
+
+    def _snapshot(self, vector_db_provider):
+        # persist right away so a crash before shutdown does not lose the freshly embedded vectors
+        if hasattr(vector_db_provider, 'snapshot') and vector_db_provider.db_path:
+            vector_db_provider.snapshot()
+        get_lexical_index_store().snapshot()
+
+    def _can_resume(self, ingestion_controller, vector_db_provider, context) -> bool:
+        """Whether an interrupted earlier attempt can be continued: it processed some chunks and the points it
+        wrote are all still there (the in-memory store loses them in a crash before its snapshot)."""
+        if not context.progress.get("chunks_processed", 0):
+            return False
+        written = context.progress.get("points_written", 0)
+        collection_name = ingestion_controller.get_collection_name()
+        try:
+            if not vector_db_provider.is_collection_existed(collection_name):
+                return False
+            info = vector_db_provider.get_collection_info(collection_name)
+            size = info.get("size") if isinstance(info, dict) else getattr(info, "points_count", None)
+        except Exception as e:
+            logger.error(f"Could not inspect {collection_name} before resuming: {e}")
+            return False
+        return size is not None and size >= written
+
+    def ingest_document(self, context) -> dict:
+        params = context.params
+        embedding_client, vector_db_provider = self._clients()
+
+        ingestion_controller = IngestionController(project_id=params["project_id"])
+        stats = ingestion_controller.ingest_file(
+            file_id=params["file_id"],
+            embedding_client=embedding_client,
+            vector_db_provider=vector_db_provider,
+            chunk_size=params["chunk_size"],
+            overlap_size=params["overlap_size"],
+            do_reset=params["do_reset"],
+            batch_size=params["batch_size"],
+            progress=context.report,
+            resume=context.progress if self._can_resume(ingestion_controller, vector_db_provider, context) else None,
+        )
+        if stats["chunks_processed"] == 0:
+            raise RuntimeError(ResponseSignal.Processing_Failed.value)
+
+        self._snapshot(vector_db_provider)
+        return stats
+
+    def index_patients(self, context) -> dict:
+        embedding_client, vector_db_provider = self._clients()
+        params = context.params
+        collection_name = params.get("collection_name", "patients")
+
+        with self.index_locks_lock:
+            lock = self.index_locks.setdefault(collection_name, threading.Lock())
+
+        with lock:
+            context.check()
+            pc = PatientController()
+            # an interrupted attempt saved its manifest after every batch: continue incrementally from there
+            resume = "to_index" in context.progress
+            ok = pc.index_patients_to_qdrant(embedding_client=embedding_client, vector_db_provider=vector_db_provider,
+                                             collection_name=collection_name,
+                                             incremental=params.get("incremental", False) or resume,
+                                             batch_size=params.get("batch_size", 50),
+                                             progress=context.report)
+            if not ok:
+                raise RuntimeError("Indexing failed")
+
+            self._snapshot(vector_db_provider)
+        return {**pc.index_stats, "resumed": resume}
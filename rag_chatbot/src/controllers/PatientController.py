@@ -1,7 +1,13 @@
 import json
 import os
+import re
+import asyncio
+import hashlib
 from pathlib import Path
 from .BaseController import BaseController
+from stores.patients.PatientRepository import get_patient_repository
+from stores.lexical.LexicalIndexStore import get_lexical_index_store
+from stores.patients.PatientCohort import biomarker_flag, POSITIVE, NEGATIVE
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,18 +18,40 @@ class PatientController(BaseController):
         # default patients file at repo root data/patients.json
         repo_root = Path(__file__).resolve().parents[3]
         self.default_path = os.path.join(repo_root, "data", "patients.json")
+        # characters of a streamed answer held back before the prompt-echo check can judge them
+        self.stream_hold_chars = 40
+        # reciprocal rank fusion constant; 60 keeps a single first place from dominating the fused order
+        self.rrf_k = 60
+
+    def get_repository(self):
+        return get_patient_repository(path=self.default_path)
 
     def load_patients(self, path: str = None):
         path = path or self.default_path
         if not os.path.exists(path):
             raise FileNotFoundError(f"Patients file not found: {path}")
+
+        repository = self.get_repository()
+        if os.path.abspath(path) == os.path.abspath(repository.path):
+            # indexing wants the latest file, so pick up edits the watcher has not polled yet
+            repository.reload_if_changed()
+            return repository.all()
+
         with open(path, "r", encoding="utf-8") as f:
             return json.load(f)
 
     def get_patient_by_id(self, patient_id: str, path: str = None):
+        if path is None:
+            return self.get_repository().get(patient_id)
         patients = self.load_patients(path=path)
         return next((p for p in patients if p.get("patient_id") == patient_id), None)
 
+    def find_patients(self, stage: str = None, biomarkers: dict = None, tumor_type: str = None) -> list:
+        return self.get_repository().find(stage=stage, biomarkers=biomarkers, tumor_type=tumor_type)
+
+    def query_cohort(self, limit: int = None, **filters) -> tuple:
+        return self.get_repository().query(limit=limit, **filters)
+
     def summarize_patient(self, patient: dict) -> str:
         biomarkers = ", ".join([f"{k}: {v}" for k, v in (patient.get("biomarkers") or {}).items()])
         treatments = "; ".join([f"{t.get('date')} - {t.get('type')} ({t.get('details')})" for t in (patient.get("treatments") or [])])
@@ -33,8 +61,80 @@ class PatientController(BaseController):
         )
         return summary
 
-    def index_patients_to_qdrant(self, embedding_client, vector_db_provider, collection_name: str = "patients"):
-        """Create collection and index patients as documents (payload contains full patient record)"""
+    def lexical_text(self, patient: dict) -> str:
+        """Text for the BM25 index: the embedded summary plus the fields it leaves out (genetic tests, comorbidities,
+        allergies, notes), so exact terms such as BRCA or a comorbidity name can be matched.
+        Biomarkers are also written signed ("ER+ HER2-") so a query for "HER2-" only matches HER2-negative records."""
+        genetic = ", ".join([f"{k}: {v}" for k, v in (patient.get("genetic_tests") or {}).items()])
+        signs = {POSITIVE: "+", NEGATIVE: "-"}
+        signed = " ".join(f"{k}{signs[biomarker_flag(v)]}" for k, v in (patient.get("biomarkers") or {}).items()
+                          if biomarker_flag(v) in signs)
+        extra = [
+            f"Biomarker status: {signed}" if signed else "",
+            f"Grade {patient.get('grade')}" if patient.get("grade") is not None else "",
+            f"Genetic tests: {genetic}" if genetic else "",
+            "Comorbidities: " + ", ".join(patient.get("comorbidities") or []),
+            "Allergies: " + ", ".join(patient.get("allergies") or []),
+            f"Social support: {patient.get('social_support') or ''}",
+            f"Notes: {patient.get('notes') or ''}",
+        ]
+        return self.summarize_patient(patient) + "\n" + "\n".join(e for e in extra if e)
+
+    def _patient_fingerprint(self, patient: dict) -> dict:
+        digest = hashlib.sha256(json.dumps(patient, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+        return {"last_updated": patient.get("last_updated"), "hash": digest}
+
+    def get_manifest_path(self, collection_name: str) -> str:
+        return os.path.join(self.get_database_path(db_name="manifests"), f"{collection_name}.json")
+
+    def load_manifest(self, collection_name: str):
+        path = self.get_manifest_path(collection_name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Could not read index manifest {path}: {e}")
+            return None
+
+    def save_manifest(self, collection_name: str, manifest: dict):
+        path = self.get_manifest_path(collection_name)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def _collection_size(self, vector_db_provider, collection_name: str):
+        info = vector_db_provider.get_collection_info(collection_name)
+        if isinstance(info, dict):
+            return info.get("size") or info.get("points_count")
+        return getattr(info, "points_count", None)
+
+    def _can_index_incrementally(self, vector_db_provider, collection_name: str, manifest: dict) -> bool:
+        if manifest is None:
+            return False
+        if not hasattr(vector_db_provider, "delete_by_ids"):
+            logger.warning("Vector DB provider cannot delete by id; falling back to a full rebuild")
+            return False
+        try:
+            if not vector_db_provider.is_collection_existed(collection_name):
+                return False
+            # the manifest must describe what is actually stored (e.g. an in-memory store restarted without a snapshot)
+            return self._collection_size(vector_db_provider, collection_name) == len(manifest)
+        except Exception as e:
+            logger.error(f"Error checking collection for incremental indexing: {e}")
+            return False
+
+    def index_patients_to_qdrant(self, embedding_client, vector_db_provider, collection_name: str = "patients",
+                                 incremental: bool = False, batch_size: int = 50, progress=None):
+        """Create collection and index patients as documents (payload contains full patient record).
+        With incremental=True only new or changed patients (by last_updated / content hash, compared to the
+        manifest of the previous run) are embedded and upserted, and removed patients are deleted by record id.
+        Falls back to a full rebuild when there is no usable manifest.
+        Patients are embedded and written `batch_size` at a time. `progress(stats)` is called after every batch and
+        may raise to stop the run; the manifest is saved per batch, so an incremental run afterwards only embeds
+        the patients the stopped run did not reach."""
         patients = self.load_patients()
 
         if not hasattr(embedding_client, "embed_text"):
@@ -44,36 +144,164 @@ class PatientController(BaseController):
         if embedding_size is None:
             raise ValueError("Embedding client does not have embedding_size set")
 
-        # create collection (reset if exists)
-        vector_db_provider.create_collection(collection_name=collection_name, embedding_size=embedding_size, do_reset=True)
+        fingerprints = {p.get("patient_id"): self._patient_fingerprint(p) for p in patients if p.get("patient_id")}
+        previous = self.load_manifest(collection_name) if incremental else None
+
+        removed = []
+        lexical_store = get_lexical_index_store()
+        if self._can_index_incrementally(vector_db_provider, collection_name, previous):
+            mode = "incremental"
+            to_index = [p for p in patients if p.get("patient_id") and previous.get(p.get("patient_id")) != fingerprints[p.get("patient_id")]]
+            removed = [pid for pid in previous if pid not in fingerprints]
+
+            lexical_index = lexical_store.get(collection_name, create=False)
+            if lexical_index is None or len(lexical_index) != len(previous):
+                # missing or stale BM25 index (first run after an upgrade, crash before its snapshot): patching it
+                # would leave every unchanged patient out of hybrid search, so rebuild it from the records
+                kept = [p for p in patients if p.get("patient_id") in previous]
+                lexical_store.reset(collection_name)
+                lexical_store.add_many(collection_name, [p.get("patient_id") for p in kept], [self.lexical_text(p) for p in kept],
+                                       [{"text": self.summarize_patient(p), "metadata": {"patient_id": p.get("patient_id"), "patient_record": p}}
+                                        for p in kept])
+                logger.info(f"Rebuilt lexical index of {collection_name} ({len(kept)} patients)")
+        else:
+            mode = "full"
+            to_index = patients
+            previous = {}
+            # create collection (reset if exists)
+            vector_db_provider.create_collection(collection_name=collection_name, embedding_size=embedding_size, do_reset=True)
+            # per-patient retrieval filters on patient_id
+            vector_db_provider.create_payload_index(collection_name=collection_name, field_name="patient_id")
+            # the BM25 index mirrors the vector collection: rebuilt on a full run, patched on an incremental one
+            lexical_store.reset(collection_name)
+            # the old manifest no longer describes the emptied collection
+            self.save_manifest(collection_name, {})
+
+        self.index_stats = {
+            "mode": mode,
+            "to_index": len(to_index),
+            "indexed": 0,
+            "removed": 0,
+            "unchanged": len(fingerprints) - len(to_index) if mode == "incremental" else 0,
+        }
+        if progress:
+            progress(self.index_stats)
+
+        # removed patients stay in the manifest until their points are deleted at the end
+        manifest = dict(previous)
+        batch_size = max(1, batch_size)
+        ok = True
+        for start in range(0, len(to_index), batch_size):
+            batch = to_index[start:start + batch_size]
+            summaries = [self.summarize_patient(p) for p in batch]
+            embedded = self._embed_documents(embedding_client, summaries, document_type="patient")
+
+            texts = []
+            vectors = []
+            metadata = []
+            record_ids = []
+            lexical_texts = []
+
+            for p, text, vec in zip(batch, summaries, embedded):
+                if not vec:
+                    continue
+
+                texts.append(text)
+                vectors.append(vec)
+                metadata.append({"patient_id": p.get("patient_id"), "patient_record": p})
+                record_ids.append(p.get("patient_id"))
+                lexical_texts.append(self.lexical_text(p))
+
+            if texts:
+                ok = vector_db_provider.insert_many(collection_name=collection_name, texts=texts, vectors=vectors, metadata=metadata, record_ids=record_ids, batch_size=batch_size)
+                if not ok:
+                    break
+                lexical_store.add_many(collection_name, record_ids, lexical_texts,
+                                       [{"text": text, "metadata": meta} for text, meta in zip(texts, metadata)])
+
+                # patients that failed to embed are left out so the next incremental run retries them
+                manifest.update({pid: fingerprints[pid] for pid in record_ids if pid in fingerprints})
+                self.save_manifest(collection_name, manifest)
+                self.index_stats["indexed"] += len(texts)
+
+            if progress:
+                progress(self.index_stats)
+
+        if ok and removed:
+            ok = vector_db_provider.delete_by_ids(collection_name=collection_name, record_ids=removed)
+            if ok:
+                lexical_store.remove(collection_name, removed)
+                self.index_stats["removed"] = len(removed)
+
+        logger.info(f"Patient indexing ({collection_name}): {self.index_stats}")
+
+        if ok:
+            self.save_manifest(collection_name, {pid: fp for pid, fp in manifest.items() if pid in fingerprints})
 
-        texts = []
-        vectors = []
-        metadata = []
-        record_ids = []
+        return ok
 
-        for p in patients:
-            text = self.summarize_patient(p)
+    def _embed_documents(self, embedding_client, texts: list, document_type: str) -> list:
+        """Embed texts with one batched call per provider batch; falls back to one call per text
+        when the batch call fails. Returns a vector (or None) per text, in order."""
+        if hasattr(embedding_client, "embed_many"):
             try:
-                vec = embedding_client.embed_text(text, document_type="patient")
+                vectors = embedding_client.embed_many(texts, document_type=document_type)
+                if vectors and len(vectors) == len(texts):
+                    return vectors
+                logger.error("Batch embedding returned no vectors, embedding one by one")
             except Exception as e:
-                logger.error(f"Error embedding patient {p.get('patient_id')}: {e}")
-                continue
-
-            texts.append(text)
-            vectors.append(vec)
-            metadata.append({"patient_id": p.get("patient_id"), "patient_record": p})
-            record_ids.append(p.get("patient_id"))
+                logger.error(f"Batch embedding failed: {e}. Embedding one by one")
 
-        # bulk insert
-        ok = vector_db_provider.insert_many(collection_name=collection_name, texts=texts, vectors=vectors, metadata=metadata, record_ids=record_ids, batch_size=50)
-
-        return ok
-
-    def search_patients(self, query: str, embedding_client, vector_db_provider, collection_name: str = "patients", top_k: int = 5):
+        vectors = []
+        for text in texts:
+            try:
+                vectors.append(embedding_client.embed_text(text, document_type=document_type))
+            except Exception as e:
+                logger.error(f"Error embedding text: {e}")
+                vectors.append(None)
+        return vectors
+
+    def search_patients(self, query: str, embedding_client, vector_db_provider, collection_name: str = "patients", top_k: int = 5,
+                        query_vector: list = None, mode: str = None, reranker=None):
+        """Find the patients most similar to the query.
+        mode: "vector" or "hybrid" (default: SEARCH_MODE). Hybrid over-fetches candidates from the vector store and
+        the collection's BM25 index and fuses both rankings with reciprocal rank fusion, so exact terms (AC-T, BRCA,
+        drug names) are found even when the embedding misses them; it needs no extra embedding call.
+        reranker: optional BudgetedReranker; the first RERANK_CANDIDATES hits are re-scored within its time budget,
+        keeping the retrieval order when the budget runs out."""
         if not query or not query.strip():
             return []
 
+        limit = max(top_k, self.app_settings.RERANK_CANDIDATES) if reranker is not None else top_k
+
+        mode = (mode or self.app_settings.SEARCH_MODE or "vector").lower()
+        if mode != "hybrid":
+            hits = self._vector_search(query, embedding_client, vector_db_provider, collection_name, limit, query_vector)
+        else:
+            candidates = max(limit * 4, 20)
+            vector_hits = self._vector_search(query, embedding_client, vector_db_provider, collection_name, candidates, query_vector)
+            lexical_hits = get_lexical_index_store().search(collection_name, query, limit=candidates)
+            hits = self._fuse_hits(vector_hits, lexical_hits, limit)
+
+        if reranker is not None:
+            return self._rerank_hits(query, hits, reranker, top_k)
+        return hits
+
+    def _rerank_hits(self, query: str, hits: list, reranker, top_k: int) -> list:
+        if len(hits) <= 1:
+            return hits[:top_k]
+
+        scores = reranker.rerank(query, [(h.get("payload") or {}).get("text") or "" for h in hits])
+        if scores is None:
+            return hits[:top_k]
+
+        for hit, score in zip(hits, scores):
+            hit["rerank_score"] = score
+        # stable sort: equal rerank scores keep their retrieval order
+        return sorted(hits, key=lambda h: h["rerank_score"], reverse=True)[:top_k]
+
+    def _vector_search(self, query: str, embedding_client, vector_db_provider, collection_name: str, top_k: int,
+                       query_vector: list = None) -> list:
         # Ensure collection exists
         try:
             if not vector_db_provider.is_collection_existed(collection_name):
@@ -83,9 +311,9 @@ class PatientController(BaseController):
             logger.error(f"Error checking collection existence: {e}")
             return []
 
-        # Attempt to embed the query; fallback to LocalProvider on failure
+        # Attempt to embed the query (unless the caller already did); fallback to LocalProvider on failure
         try:
-            qvec = embedding_client.embed_text(query, document_type="query")
+            qvec = query_vector if query_vector is not None else embedding_client.embed_text(query, document_type="query")
         except Exception as e:
             logger.error(f"Embedding query failed: {e}. Falling back to LocalProvider.")
             try:
@@ -112,8 +340,32 @@ class PatientController(BaseController):
             logger.error(f"Unexpected error during search: {e}")
             return []
 
+        return self._normalize_hits(results)
+
+    async def asearch_patients(self, query: str, embedding_client, vector_db_provider, collection_name: str = "patients", top_k: int = 5,
+                               mode: str = None, reranker=None):
+        """Async variant of search_patients: awaits the query embedding, then runs the vector search on a worker thread."""
+        if not query or not query.strip():
+            return []
+
+        query_vector = None
+        try:
+            query_vector = await embedding_client.aembed_text(query, document_type="query")
+        except Exception as e:
+            # search_patients retries synchronously and falls back to LocalProvider
+            logger.error(f"Async query embedding failed: {e}")
+
+        return await asyncio.to_thread(self.search_patients, query, embedding_client, vector_db_provider,
+                                       collection_name=collection_name, top_k=top_k, query_vector=query_vector, mode=mode,
+                                       reranker=reranker)
+
+    def _normalize_hits(self, results) -> list:
         out = []
         for r in results:
+            if isinstance(r, dict) and "payload" in r:
+                # in-memory store hits are already {"payload", "score"} dicts
+                out.append({"payload": r["payload"], "score": r.get("score")})
+                continue
             payload = r.payload if hasattr(r, 'payload') else r[0].payload if isinstance(r, (list, tuple)) else r
             # qdrant returns score as 'score' attribute
             score = getattr(r, 'score', None)
@@ -121,18 +373,72 @@ class PatientController(BaseController):
 
         return out
 
-    def chat_with_patient(self, patient_id: str, question: str, generation_client, embedding_client=None, vector_db_provider=None, top_k: int = 3):
-        """Answer a question about a specific patient using their data as context.
-        - patient_id: identifier of the patient
-        - question: user question (Arabic or English)
-        - generation_client: LLM provider used for generation
-        - embedding_client/vector_db_provider: optional - could be used for RAG augmentation
-        Returns: dict {answer: str, sources: list}
+    def _hit_key(self, payload: dict) -> str:
+        # vector and BM25 hits of the same record share its id; chunks without one are keyed by their text
+        metadata = payload.get("metadata") or {}
+        return payload.get("record_id") or metadata.get("patient_id") or \
+            hashlib.sha256((payload.get("text") or "").encode("utf-8")).hexdigest()
+
+    def _fuse_hits(self, vector_hits: list, lexical_hits: list, top_k: int) -> list:
+        """Reciprocal rank fusion: each ranking adds 1 / (rrf_k + rank) per hit. The fused score is in "score",
+        the original similarity and BM25 scores are kept next to it (None when the hit came from one side only)."""
+        fused = {}
+        for hits, score_key in ((vector_hits, "vector_score"), (lexical_hits, "bm25_score")):
+            for rank, hit in enumerate(hits, start=1):
+                payload = hit.get("payload") or {}
+                entry = fused.setdefault(self._hit_key(payload),
+                                         {"payload": payload, "score": 0.0, "vector_score": None, "bm25_score": None})
+                entry["score"] += 1.0 / (self.rrf_k + rank)
+                entry[score_key] = hit.get("score")
+
+        return sorted(fused.values(), key=lambda h: h["score"], reverse=True)[:top_k]
+
+    def search_patients_many(self, queries: list, embedding_client, vector_db_provider, collection_name: str = "patients", top_k: int = 5):
+        """Search several queries against the collection with one batched vector DB call.
+        Returns one result list per query (empty for blank queries or failed embeddings)."""
+        results = [[] for _ in queries]
+        if not queries:
+            return results
+
+        try:
+            if not vector_db_provider.is_collection_existed(collection_name):
+                logger.error(f"Collection {collection_name} not found")
+                return results
+        except Exception as e:
+            logger.error(f"Error checking collection existence: {e}")
+            return results
+
+        positions = [i for i, query in enumerate(queries) if query and query.strip()]
+        embedded = self._embed_documents(embedding_client, [queries[i] for i in positions], document_type="query")
+
+        pairs = [(i, vec) for i, vec in zip(positions, embedded) if vec]
+        if not pairs:
+            return results
+
+        positions = [i for i, _ in pairs]
+        qvecs = [vec for _, vec in pairs]
+
+        try:
+            batch = vector_db_provider.search_by_vectors(collection_name=collection_name, vectors=qvecs, limit=top_k)
+        except Exception as e:
+            logger.error(f"Unexpected error during batch search: {e}")
+            return results
+
+        for i, hits in zip(positions, batch):
+            results[i] = self._normalize_hits(hits)
+
+        return results
+
+    def build_chat_prompt(self, patient_id: str, question: str, embedding_client=None, vector_db_provider=None, top_k: int = 3,
+                          query_vector: list = None):
+        """Load the patient, retrieve their record snippets and build the generation prompt.
+        query_vector: the already embedded question, if the caller has it
+        Returns: dict {patient, prompt, header, lang, sources}, or {error} when the patient does not exist
         """
         # Load patient record
         p = self.get_patient_by_id(patient_id)
         if not p:
-            return {"error": "Patient not found"}
+            return {"error": "Patient not found", "status_code": 404}
 
         # Build patient context
         summary = self.summarize_patient(p)
@@ -146,48 +452,26 @@ class PatientController(BaseController):
 
         # Optionally augment with RAG retrieved snippets if providers provided
         retrieved = []
-        if embedding_client and vector_db_provider:
+        if vector_db_provider and (embedding_client or query_vector):
             try:
-                # perform a scoped search and then filter to this patient_id
-                qvec = None
-                try:
-                    qvec = embedding_client.embed_text(question, document_type="query")
-                except Exception:
-                    qvec = None
+                # search only this patient's points; the store applies the filter before ranking
+                qvec = query_vector
+                if qvec is None:
+                    try:
+                        qvec = embedding_client.embed_text(question, document_type="query")
+                    except Exception:
+                        qvec = None
 
                 if qvec:
-                    results = vector_db_provider.search_by_vector(collection_name="patients", vector=qvec, limit=top_k)
-                    # filter results to this patient
+                    results = vector_db_provider.search_by_vector(collection_name="patients", vector=qvec, limit=top_k,
+                                                                  filter={"patient_id": patient_id})
                     for r in results:
-                        payload = r.payload if hasattr(r, 'payload') else r[0].payload if isinstance(r, (list, tuple)) else r
-                        meta = payload.get('metadata') if isinstance(payload, dict) else None
-                        pid = None
-                        if isinstance(meta, list) and len(meta) and isinstance(meta[0], dict):
-                            pid = meta[0].get('patient_id')
-                        elif isinstance(meta, dict):
-                            pid = meta.get('patient_id')
-
-                        if pid == patient_id:
-                            retrieved.append(payload)
+                        payload = r.payload if hasattr(r, 'payload') else r.get('payload', r) if isinstance(r, dict) else r
+                        retrieved.append(payload)
             except Exception as e:
                 logger.error(f"Error during RAG retrieval for patient chat: {e}")
 
-        # detect language and build prompt accordingly (Arabic by default)
-        import re
-
-        def _detect_language(text: str) -> str:
-            if not text or not text.strip():
-                return 'ar'
-            arabic_chars = re.findall(r'[\u0600-\u06FF]', text)
-            latin_chars = re.findall(r'[A-Za-z]', text)
-            if len(latin_chars) > len(arabic_chars):
-                return 'en'
-            eng_keywords = ['surgery', 'operate', 'surgical', 'mastectomy', 'lumpectomy', 'fertility', 'palliative', 'follow-up', 'chemotherapy']
-            if any(k in text.lower() for k in eng_keywords):
-                return 'en'
-            return 'ar'
-
-        lang = _detect_language(question)
+        lang = self._detect_language(question)
 
         if lang == 'en':
             header = (
@@ -218,31 +502,37 @@ class PatientController(BaseController):
                 text = r.get('text') if isinstance(r, dict) else str(r)
                 prompt += f"- {text}\n"
 
-        # Generate (try main generation client, then fallback to LocalProvider if result is None/empty)
-        try:
-            answer = None
-            used_fallback = False
-
-            if generation_client:
-                try:
-                    answer = generation_client.generate_text(prompt, chat_history=[], max_output_tokens=200, temperature=0.2)
-                except Exception as e:
-                    logger.error(f"Generation client failed: {e}")
-                    answer = None
-
-            if not answer:
-                try:
-                    from stores.LLM.Providers.LocalProvider import LocalProvider
-                    lp = LocalProvider()
-                    answer = lp.generate_text(prompt)
-                    used_fallback = True
-                except Exception as e:
-                    logger.error(f"LocalProvider fallback failed: {e}")
-                    answer = None
+        return {"patient": p, "prompt": prompt, "header": header, "lang": lang, "sources": retrieved}
 
-        except Exception as e:
-            logger.error(f"Unexpected error during generation: {e}")
-            return {"error": "Generation failed"}
+    def _detect_language(self, text: str) -> str:
+        """Arabic by default; English when the question is mostly Latin script or uses English clinical terms."""
+        if not text or not text.strip():
+            return 'ar'
+        arabic_chars = re.findall(r'[\u0600-\u06FF]', text)
+        latin_chars = re.findall(r'[A-Za-z]', text)
+        if len(latin_chars) > len(arabic_chars):
+            return 'en'
+        eng_keywords = ['surgery', 'operate', 'surgical', 'mastectomy', 'lumpectomy', 'fertility', 'palliative', 'follow-up', 'chemotherapy']
+        if any(k in text.lower() for k in eng_keywords):
+            return 'en'
+        return 'ar'
+
+    def _looks_like_prompt_echo(self, ans: str, prompt_head: str) -> bool:
+        """Heuristic to detect prompt echo / unusable generator output."""
+        if not ans or not ans.strip():
+            return True
+        s = ans.strip()
+        if len(s) < 20:
+            return True
+        if prompt_head[:30] in s or s[:30] in prompt_head:
+            return True
+        if any(marker in s for marker in ['أنت مساعد طبي افتراضي', 'You are a virtual medical assistant', 'معلومات المريضة', 'Patient info', 'الاستعلام', 'Query']):
+            return True
+        return False
+
+    def finalize_answer(self, patient: dict, question: str, answer: str, header: str, lang: str, used_fallback: bool = False) -> str:
+        """Replace an empty or prompt-echoing generation with the rule-based answer, or tag a local-provider answer."""
+        p = patient
 
         # intent detection + more specific rule-based fallback tailored to the question
         def _detect_intent(q: str) -> str:
@@ -412,21 +702,7 @@ class PatientController(BaseController):
             logger.error(f"Rule-based answer generation failed: {e}")
             rule_ans = ("عذرًا، حصلت مشكلة في توليد الإجابة الآن. " if lang=='ar' else "Sorry, something went wrong generating the answer.")
 
-        # Heuristic to detect prompt echo / unusable generator output
-        # Heuristic to detect prompt echo / unusable generator output
-        def _looks_like_prompt_echo(ans: str, prompt_head: str) -> bool:
-            if not ans or not ans.strip():
-                return True
-            s = ans.strip()
-            if len(s) < 20:
-                return True
-            if prompt_head[:30] in s or s[:30] in prompt_head:
-                return True
-            if any(marker in s for marker in ['أنت مساعد طبي افتراضي', 'You are a virtual medical assistant', 'معلومات المريضة', 'Patient info', 'الاستعلام', 'Query']):
-                return True
-            return False
-
-        looks_like_prompt = _looks_like_prompt_echo(answer, header)
+        looks_like_prompt = self._looks_like_prompt_echo(answer, header)
 
         if not answer or looks_like_prompt:
             try:
@@ -443,4 +719,191 @@ class PatientController(BaseController):
                 note = "\n\n(ملاحظة: تمت الإجابة باستخدام موفر محلي للتجربة)" if lang=='ar' else "\n\n(Note: answered using local provider for testing)"
                 answer = f"{answer}{note}"
 
-        return {"answer": answer, "sources": retrieved, "patient_id": patient_id}
+        return answer
+
+    def _cached_answer(self, answer_cache, patient_id: str, question: str, query_vector: list):
+        """Look the question up in the semantic answer cache.
+        Returns (cache_key, cached value or None); cache_key is None when the cache cannot be used."""
+        if answer_cache is None or not query_vector:
+            return None, None
+        patient = self.get_patient_by_id(patient_id)
+        if not patient:
+            return None, None
+        # the record's content hash, not last_updated: an edit that keeps last_updated still changes the key, and an
+        # answer generated from the old record while a reload lands is put under the old hash, which never matches again
+        key = (patient_id, self._patient_fingerprint(patient)["hash"], self._detect_language(question))
+        return key, answer_cache.get(key, query_vector)
+
+    def chat_with_patient(self, patient_id: str, question: str, generation_client, embedding_client=None, vector_db_provider=None, top_k: int = 3,
+                          answer_cache=None):
+        """Answer a question about a specific patient using their data as context.
+        - patient_id: identifier of the patient
+        - question: user question (Arabic or English)
+        - generation_client: LLM provider used for generation
+        - embedding_client/vector_db_provider: optional - could be used for RAG augmentation
+        - answer_cache: optional SemanticAnswerCache; near-duplicate questions about an unchanged record reuse the answer
+        Returns: dict {answer: str, sources: list, cached: bool}, or {error, status_code} when no answer could be built
+        (status_code 404 when the patient does not exist)
+        """
+        query_vector = None
+        if embedding_client and (vector_db_provider or answer_cache is not None):
+            try:
+                query_vector = embedding_client.embed_text(question, document_type="query")
+            except Exception as e:
+                logger.error(f"Question embedding failed: {e}")
+
+        cache_key, cached = self._cached_answer(answer_cache, patient_id, question, query_vector)
+        if cached:
+            return {**cached, "patient_id": patient_id, "cached": True}
+
+        chat = self.build_chat_prompt(patient_id, question, vector_db_provider=vector_db_provider, top_k=top_k,
+                                      query_vector=query_vector)
+        if chat.get("error"):
+            return chat
+        prompt = chat["prompt"]
+
+        # Generate (try main generation client, then fallback to LocalProvider if result is None/empty)
+        answer = None
+        used_fallback = False
+
+        if generation_client:
+            try:
+                answer = generation_client.generate_text(prompt, chat_history=[], max_output_tokens=200, temperature=0.2)
+            except Exception as e:
+                logger.error(f"Generation client failed: {e}")
+                answer = None
+
+        if not answer:
+            try:
+                from stores.LLM.Providers.LocalProvider import LocalProvider
+                lp = LocalProvider()
+                answer = lp.generate_text(prompt)
+                used_fallback = True
+            except Exception as e:
+                logger.error(f"LocalProvider fallback failed: {e}")
+                answer = None
+
+        generated = answer
+        try:
+            answer = self.finalize_answer(chat["patient"], question, answer, chat["header"], chat["lang"], used_fallback=used_fallback)
+        except Exception as e:
+            logger.error(f"Unexpected error during generation: {e}")
+            return {"error": "Generation failed", "status_code": 500}
+
+        # only real generations are cached; fallback answers should not outlive a provider outage
+        if cache_key and not used_fallback and answer == generated:
+            answer_cache.put(cache_key, query_vector, {"answer": answer, "sources": chat["sources"]})
+
+        return {"answer": answer, "sources": chat["sources"], "patient_id": patient_id, "cached": False}
+
+    async def achat_with_patient(self, patient_id: str, question: str, generation_client, embedding_client=None, vector_db_provider=None, top_k: int = 3,
+                                 answer_cache=None):
+        """Async variant of chat_with_patient: provider calls are awaited, the vector search runs on a worker thread."""
+        if not self.get_patient_by_id(patient_id):
+            return {"error": "Patient not found", "status_code": 404}
+
+        query_vector = None
+        if embedding_client and (vector_db_provider or answer_cache is not None):
+            try:
+                query_vector = await embedding_client.aembed_text(question, document_type="query")
+            except Exception as e:
+                logger.error(f"Async question embedding failed: {e}")
+
+        cache_key, cached = self._cached_answer(answer_cache, patient_id, question, query_vector)
+        if cached:
+            return {**cached, "patient_id": patient_id, "cached": True}
+
+        chat = await asyncio.to_thread(self.build_chat_prompt, patient_id, question, vector_db_provider=vector_db_provider,
+                                       top_k=top_k, query_vector=query_vector)
+        if chat.get("error"):
+            return chat
+        prompt = chat["prompt"]
+
+        answer = None
+        used_fallback = False
+
+        if generation_client:
+            try:
+                answer = await generation_client.agenerate_text(prompt, chat_history=[], max_output_tokens=200, temperature=0.2)
+            except Exception as e:
+                logger.error(f"Generation client failed: {e}")
+                answer = None
+
+        if not answer:
+            try:
+                from stores.LLM.Providers.LocalProvider import LocalProvider
+                answer = LocalProvider().generate_text(prompt)
+                used_fallback = True
+            except Exception as e:
+                logger.error(f"LocalProvider fallback failed: {e}")
+                answer = None
+
+        generated = answer
+        try:
+            answer = self.finalize_answer(chat["patient"], question, answer, chat["header"], chat["lang"], used_fallback=used_fallback)
+        except Exception as e:
+            logger.error(f"Unexpected error during generation: {e}")
+            return {"error": "Generation failed", "status_code": 500}
+
+        # only real generations are cached; fallback answers should not outlive a provider outage
+        if cache_key and not used_fallback and answer == generated:
+            answer_cache.put(cache_key, query_vector, {"answer": answer, "sources": chat["sources"]})
+
+        return {"answer": answer, "sources": chat["sources"], "patient_id": patient_id, "cached": False}
+
+    def stream_chat_with_patient(self, patient_id: str, question: str, generation_client, embedding_client=None, vector_db_provider=None, top_k: int = 3,
+                                 answer_cache=None):
+        """Streaming variant of chat_with_patient. Yields (event, data) pairs:
+        ("token", {text}) as the model produces text, then ("done", {answer, sources, patient_id, replaced, cached}).
+        The head of the stream is held back until it is clearly not a prompt echo; if the finished text still
+        needs the rule-based fallback, "done" carries the replacement answer with replaced=True.
+        """
+        query_vector = None
+        if embedding_client and (vector_db_provider or answer_cache is not None):
+            try:
+                query_vector = embedding_client.embed_text(question, document_type="query")
+            except Exception as e:
+                logger.error(f"Question embedding failed: {e}")
+
+        cache_key, cached = self._cached_answer(answer_cache, patient_id, question, query_vector)
+        if cached:
+            yield "token", {"text": cached["answer"]}
+            yield "done", {**cached, "patient_id": patient_id, "replaced": False, "cached": True}
+            return
+
+        chat = self.build_chat_prompt(patient_id, question, vector_db_provider=vector_db_provider, top_k=top_k,
+                                      query_vector=query_vector)
+        if chat.get("error"):
+            yield "error", {"message": chat["error"]}
+            return
+
+        chunks = []
+        streamed = False
+        if generation_client and hasattr(generation_client, 'generate_stream'):
+            try:
+                for text in generation_client.generate_stream(chat["prompt"], chat_history=[], max_output_tokens=200, temperature=0.2):
+                    chunks.append(text)
+                    if streamed:
+                        yield "token", {"text": text}
+                        continue
+
+                    head = "".join(chunks)
+                    if len(head) < self.stream_hold_chars:
+                        continue
+                    if self._looks_like_prompt_echo(head, chat["header"]):
+                        break
+                    streamed = True
+                    yield "token", {"text": head}
+            except Exception as e:
+                logger.error(f"Streaming generation failed: {e}")
+
+        generated = "".join(chunks)
+        answer = self.finalize_answer(chat["patient"], question, generated or None, chat["header"], chat["lang"])
+        if not streamed:
+            yield "token", {"text": answer}
+
+        if cache_key and answer == generated:
+            answer_cache.put(cache_key, query_vector, {"answer": answer, "sources": chat["sources"]})
+
+        yield "done", {"answer": answer, "sources": chat["sources"], "patient_id": patient_id,
+                       "replaced": streamed and answer != generated, "cached": False}
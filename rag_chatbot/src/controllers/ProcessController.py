@@ -1,9 +1,12 @@
 from .BaseController import BaseController
 from .ProjectController import ProjectController
 import os
-from langchain_community.document_loaders import TextLoader, PyMuPDFLoader
+import hashlib
+from langchain_community.document_loaders import TextLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from models.enums.ProcessingEnums import ProcessingEnums
+from stores.loaders.ParallelPDFLoader import ParallelPDFLoader
+from stores.loaders.ChunkCache import ChunkCache
 
 class ProcessController(BaseController):
 
@@ -26,7 +29,12 @@ class ProcessController(BaseController):
             return TextLoader(file_path, encoding="utf-8")
         if file_ext[1:] == ProcessingEnums.PDF.value.lower():
             try:
-                return PyMuPDFLoader(file_path)
+                # pages are parsed in parallel on a process pool and streamed back in order
+                return ParallelPDFLoader(
+                    file_path,
+                    max_workers=self.app_settings.PDF_PARSE_WORKERS,
+                    pages_per_task=self.app_settings.PDF_PAGES_PER_TASK
+                )
             except Exception as e:
                 raise ValueError(f"Cannot load PDF file '{file_id}': {e}")
         raise ValueError(f"Unsupported file type: {file_id}")
@@ -37,13 +45,102 @@ class ProcessController(BaseController):
             raise ValueError(f"Loader not found for file: {file_id}")
         return loader.load()
 
+    def iter_file_content(self, file_id: str):
+        """Yield the file's pages one at a time instead of loading them all."""
+        return self.get_file_loader(file_id).lazy_load()
+
+    def get_overlap_tail(self, text: str, overlap_size: int) -> str:
+        """Last `overlap_size` characters of a page, cut back to a word boundary."""
+        if overlap_size <= 0 or not text:
+            return ""
+        tail = text[-overlap_size:]
+        if len(text) > overlap_size and not text[-overlap_size - 1].isspace():
+            parts = tail.split(None, 1)
+            tail = parts[1] if len(parts) > 1 else tail
+        return tail.strip()
+
+    def iter_file_chunks(
+        self,
+        pages,
+        file_id: str,
+        chunk_size: int = 100,
+        overlap_size: int = 20
+    ):
+        """Generator version of process_file_content: consumes pages from any iterable and yields chunks as
+        they are produced, holding one page plus the overlap. The tail of each page is prepended to the next
+        one, so text spanning a page break still lands in a chunk together."""
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=overlap_size,
+            length_function=len,
+        )
+        carry = ""
+        for page in pages:
+            if not page.page_content.strip():
+                continue
+            text = carry + "\n" + page.page_content if carry else page.page_content
+            yield from text_splitter.create_documents(
+                [text],
+                metadatas=[{**page.metadata, "source_file": file_id}]
+            )
+            carry = self.get_overlap_tail(page.page_content, overlap_size)
+
+    def get_file_hash(self, file_id: str) -> str:
+        h = hashlib.sha256()
+        with open(os.path.join(self.project_path, file_id), "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    def get_chunk_cache(self):
+        if not self.app_settings.CHUNK_CACHE_ENABLED:
+            return None
+        return ChunkCache(cache_dir=self.get_database_path(db_name=self.app_settings.CHUNK_CACHE_PATH))
+
+    def _restamp_source(self, chunks, file_id: str):
+        # a cache entry may have been written for an identical file stored under another name
+        file_path = os.path.join(self.project_path, file_id)
+        for chunk in chunks:
+            chunk.metadata["source_file"] = file_id
+            if "source" in chunk.metadata:
+                chunk.metadata["source"] = file_path
+            if "file_path" in chunk.metadata:
+                chunk.metadata["file_path"] = file_path
+            yield chunk
+
+    def iter_processed_chunks(self, file_id: str, chunk_size: int = 100, overlap_size: int = 20, pages=None,
+                              stats: dict = None):
+        """Chunks of an uploaded file for these parameters, as a generator. Streamed from the chunk cache when
+        the same content was chunked the same way before; otherwise the pages (default: lazily from the loader)
+        are chunked and recorded in the cache on the way through. Sets `stats["chunk_cache_hit"]` when given."""
+        chunk_cache = self.get_chunk_cache()
+        hit = False
+        if chunk_cache is not None:
+            file_hash = self.get_file_hash(file_id)
+            hit = chunk_cache.has(file_hash, chunk_size, overlap_size)
+        if stats is not None:
+            stats["chunk_cache_hit"] = hit
+
+        if hit:
+            return self._restamp_source(chunk_cache.iter_chunks(file_hash, chunk_size, overlap_size), file_id)
+
+        chunks = self.iter_file_chunks(pages if pages is not None else self.iter_file_content(file_id),
+                                       file_id=file_id, chunk_size=chunk_size, overlap_size=overlap_size)
+        if chunk_cache is None:
+            return chunks
+        return chunk_cache.write_through(file_hash, chunk_size, overlap_size, chunks)
+
     def process_file_content(
         self, 
         file_content: list, 
         file_id: str,
         chunk_size: int = 100, 
-        overlap_size: int = 20
+        overlap_size: int = 20,
+        stream: bool = False
     ):
+        if stream:
+            return self.iter_file_chunks(file_content, file_id=file_id, chunk_size=chunk_size, overlap_size=overlap_size)
+
         text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=overlap_size,
@@ -1,3 +1,5 @@
 from .DataController import DataController
 from .ProjectController import ProjectController
-from .ProcessController import ProcessController
\ No newline at end of file
+from .ProcessController import ProcessController
+from .IngestionController import IngestionController
+from .JobController import JobController
\ No newline at end of file
@@ -9,6 +9,13 @@ class Settings(BaseSettings):
     FILE_ALLOWED_TYPES: list = ["txt", "pdf", "md"]
     MAX_FILE_SIZE_MB: int = 10
     CHUNK_SIZE: int = 1000
+    INGESTION_EMBED_BATCH_SIZE: int = 64
+    PDF_PARSE_WORKERS: int = 0  # 0 = one process per CPU core
+    PDF_PAGES_PER_TASK: int = 8
+    CHUNK_CACHE_ENABLED: bool = True
+    CHUNK_CACHE_PATH: str = "chunk_cache"
+    JOBS_DB_PATH: str = "jobs"
+    JOBS_MAX_WORKERS: int = 2
 
     # Optional external resources
     MONGODB_URL: str = None
@@ -22,6 +29,16 @@ class Settings(BaseSettings):
     VECTOR_DB_BACKEND: str = None
     VECTOR_DB_PATH: str = None
     VECTOR_DB_DISTANCE_METHOD: str = None
+    VECTOR_DB_INDEX_TYPE: str = "flat"
+    VECTOR_DB_IVF_NLIST: int = 0  # 0 = derive from collection size
+    VECTOR_DB_IVF_NPROBE: int = 8
+    LEXICAL_INDEX_PATH: str = "lexical_index"
+    SEARCH_MODE: str = "vector"  # "vector" or "hybrid" (BM25 + vector, reciprocal rank fusion; score is the RRF value)
+    RERANK_BACKEND: str = ""  # "CROSS_ENCODER" or "LLM"; empty disables re-ranking
+    RERANK_MODEL_ID: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_CANDIDATES: int = 20
+    RERANK_BUDGET_MS: int = 300
+    RERANK_BATCH_SIZE: int = 16
 
     # Provider keys
     OPENAI_API_KEY: str = None
@@ -33,6 +50,27 @@ class Settings(BaseSettings):
     GENERATION_MODEL_ID: str = None
     EMBEDDING_MODEL_ID: str = None
     EMBEDDING_MODEL_SIZE: int = None
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = "embedding_cache"
+    EMBEDDING_CACHE_MEMORY_ITEMS: int = 10000
+    EMBEDDING_CACHE_DISK_ITEMS: int = 500000
+    HTTP_POOL_MAX_CONNECTIONS: int = 100
+    HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_POOL_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_TIMEOUT_SECONDS: float = 60.0
+    LLM_PROVIDER_TIMEOUTS: dict = {}  # per provider seconds, e.g. {"GEMINI": 20}; falls back to HTTP_TIMEOUT_SECONDS
+    LLM_MAX_RETRIES: int = 2
+    LLM_BACKOFF_BASE_SECONDS: float = 0.5
+    LLM_BACKOFF_MAX_SECONDS: float = 8.0
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    LLM_CIRCUIT_RESET_SECONDS: float = 30.0
+    GENERATION_FALLBACK_CHAIN: str = ""  # e.g. "COHERE,OPENAI:gpt-4o-mini"; LOCAL is always the last resort
+    LLM_REQUEST_COALESCING_ENABLED: bool = True
+    PATIENTS_RELOAD_INTERVAL_SECONDS: float = 2.0
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.92
+    ANSWER_CACHE_TTL_SECONDS: float = 21600
+    ANSWER_CACHE_MAX_ENTRIES: int = 10000
     INPUT_DAFAULT_MAX_CHARACTERS: int = 1000
     GENERATION_DAFAULT_MAX_TOKENS: int = 1000
     GENERATION_DAFAULT_TEMPERATURE: float = 0.2
@@ -1,9 +1,18 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
+import os
 
-from routes import base, data, test, patients
+from routes import base, data, test, patients, jobs
 from helpers.config import get_settings
-from stores.LLM.LLMProviderFactory import LLMProviderFactory
+from stores.LLM.ProviderRegistry import ProviderRegistry
+from stores.LLM.CoalescingProvider import CoalescingProvider
+from stores.patients.PatientRepository import get_patient_repository
+from stores.lexical.LexicalIndexStore import get_lexical_index_store
+from stores.jobs.JobStore import JobStore
+from stores.jobs.JobScheduler import JobScheduler
+from stores.loaders.ParallelPDFLoader import shutdown_pdf_process_pool
+from controllers.BaseController import BaseController
+from controllers.JobController import JobController
 
 
 @asynccontextmanager
@@ -22,9 +31,35 @@ async def lifespan(app: FastAPI):
     if not settings.GEMINI_API_KEY:
         print("⚠️  Warning: GEMINI_API_KEY is not set")
     
+    # load patients once; a background watcher hot-reloads the file when it changes
+    app.patient_repository = get_patient_repository()
+    app.patient_repository.start_watching(interval_seconds=settings.PATIENTS_RELOAD_INTERVAL_SECONDS)
+    print(f"✅ Patient repository loaded: {len(app.patient_repository.all())} patients")
+
+    # near-duplicate patient questions reuse earlier answers until the record changes
+    app.answer_cache = None
+    if settings.ANSWER_CACHE_ENABLED:
+        from stores.LLM.SemanticAnswerCache import SemanticAnswerCache
+        app.answer_cache = SemanticAnswerCache(
+            similarity_threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+            ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+            max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+        )
+        answer_cache = app.answer_cache
+
+        # answers built from an edited record must not outlive the reload
+        def invalidate_answers(patient_ids):
+            for patient_id in patient_ids:
+                answer_cache.invalidate(patient_id)
+
+        app.patient_repository.add_reload_listener(invalidate_answers)
+
+    # one registry per process: providers and their pooled HTTP connections are shared by every request
+    app.provider_registry = ProviderRegistry(settings)
+    registry = app.provider_registry
+
     # Only initialize providers if API keys are available
     try:
-        llm_provider_factory = LLMProviderFactory(settings)
         
         # generation client (can be OpenAI, Cohere, Gemini, or LOCAL)
         if settings.GENERATION_BACKEND:
@@ -36,15 +71,19 @@ async def lifespan(app: FastAPI):
             )
             
             if api_key_available:
-                app.generation_client = llm_provider_factory.create(provider=settings.GENERATION_BACKEND)
-                if hasattr(app.generation_client, 'set_generation_model') and settings.GENERATION_MODEL_ID:
-                    app.generation_client.set_generation_model(model_id=settings.GENERATION_MODEL_ID)
-                print(f"✅ Generation client initialized: {settings.GENERATION_BACKEND}")
+                registry.generation_client = registry.get_llm(settings.GENERATION_BACKEND)
+                if hasattr(registry.generation_client, 'set_generation_model') and settings.GENERATION_MODEL_ID:
+                    registry.generation_client.set_generation_model(model_id=settings.GENERATION_MODEL_ID)
+                # retries with backoff, circuit breaking and the configured provider fallback chain
+                chain = [(settings.GENERATION_BACKEND, registry.generation_client)]
+                chain += registry.generation_fallbacks(primary=settings.GENERATION_BACKEND)
+                registry.generation_client = registry.wrap_resilient(chain)
+                if settings.LLM_REQUEST_COALESCING_ENABLED:
+                    # identical prompts arriving together share one upstream call
+                    registry.generation_client = CoalescingProvider(client=registry.generation_client)
+                print(f"✅ Generation client initialized: {' → '.join(name for name, _ in chain)}")
             else:
-                app.generation_client = None
                 print("⚠️  Generation client skipped - missing API key")
-        else:
-            app.generation_client = None
 
         # embedding client (can be OpenAI, Cohere, Gemini, or LOCAL)
         if settings.EMBEDDING_BACKEND:
@@ -56,48 +95,124 @@ async def lifespan(app: FastAPI):
             )
             
             if api_key_available:
-                app.embedding_client = llm_provider_factory.create(provider=settings.EMBEDDING_BACKEND)
-                if hasattr(app.embedding_client, 'set_embedding_model') and settings.EMBEDDING_MODEL_ID:
-                    app.embedding_client.set_embedding_model(
+                registry.embedding_client = registry.get_llm(settings.EMBEDDING_BACKEND)
+                if hasattr(registry.embedding_client, 'set_embedding_model') and settings.EMBEDDING_MODEL_ID:
+                    registry.embedding_client.set_embedding_model(
                         model_id=settings.EMBEDDING_MODEL_ID,
                         embedding_size=settings.EMBEDDING_MODEL_SIZE
                     )
+                registry.embedding_client = registry.wrap_resilient([(settings.EMBEDDING_BACKEND, registry.embedding_client)])
+                if settings.LLM_REQUEST_COALESCING_ENABLED:
+                    # sits under the embedding cache, so only concurrent cache misses are collapsed
+                    registry.embedding_client = CoalescingProvider(client=registry.embedding_client)
                 print(f"✅ Embedding client initialized: {settings.EMBEDDING_BACKEND}")
+
+                # serve repeated texts from the embedding cache instead of the provider
+                if settings.EMBEDDING_CACHE_ENABLED:
+                    from stores.LLM.EmbeddingCache import EmbeddingCache
+                    from stores.LLM.CachedEmbeddingProvider import CachedEmbeddingProvider
+
+                    cache_dir = BaseController().get_database_path(db_name=settings.EMBEDDING_CACHE_PATH)
+                    embedding_cache = EmbeddingCache(
+                        db_path=os.path.join(cache_dir, "embeddings.sqlite"),
+                        memory_items=settings.EMBEDDING_CACHE_MEMORY_ITEMS,
+                        disk_items=settings.EMBEDDING_CACHE_DISK_ITEMS,
+                    )
+                    registry.embedding_client = CachedEmbeddingProvider(
+                        client=registry.embedding_client,
+                        cache=embedding_cache,
+                        provider_name=settings.EMBEDDING_BACKEND,
+                    )
+                    print("✅ Embedding cache enabled")
             else:
-                app.embedding_client = None
                 print("⚠️  Embedding client skipped - missing API key")
-        else:
-            app.embedding_client = None
 
         # initialize vector DB provider (Qdrant / INMEMORY)
         if settings.VECTOR_DB_BACKEND:
             from stores.vectordb.VectorDBProviderFactory import VectorDBProviderFactory
             vec_factory = VectorDBProviderFactory(settings)
-            app.vector_db_provider = vec_factory.create(provider=settings.VECTOR_DB_BACKEND)
-            if app.vector_db_provider:
-                app.vector_db_provider.connect()
+            registry.vector_db_provider = vec_factory.create(provider=settings.VECTOR_DB_BACKEND)
+            if registry.vector_db_provider:
+                registry.vector_db_provider.connect()
                 print(f"✅ Vector DB provider initialized: {settings.VECTOR_DB_BACKEND}")
+
+                # warm start: in-memory store reloads its last snapshot instead of re-embedding
+                if hasattr(registry.vector_db_provider, 'restore') and registry.vector_db_provider.restore():
+                    print(f"✅ Vector DB restored from snapshot: {registry.vector_db_provider.list_all_collections()}")
             else:
-                app.vector_db_provider = None
                 print("⚠️  Vector DB provider could not be created")
     
             
     except Exception as e:
         print(f"❌ Error initializing LLM or Vector DB providers: {e}")
-        app.generation_client = None
-        app.embedding_client = None
-        app.vector_db_provider = None
+        registry.generation_client = None
+        registry.embedding_client = None
+        registry.vector_db_provider = None
     
+    # optional second-stage re-ranking of search candidates, bounded by RERANK_BUDGET_MS per request
+    if settings.RERANK_BACKEND:
+        try:
+            from stores.rerank.RerankerFactory import RerankerFactory
+            registry.reranker = RerankerFactory(settings).create(backend=settings.RERANK_BACKEND,
+                                                                 generation_client=registry.generation_client)
+        except Exception as e:
+            print(f"❌ Error initializing reranker: {e}")
+            registry.reranker = None
+        if registry.reranker:
+            print(f"✅ Reranker initialized: {settings.RERANK_BACKEND} ({settings.RERANK_BUDGET_MS} ms budget)")
+        else:
+            print("⚠️  Reranker could not be created, search keeps the retrieval order")
+
+    # BM25 indexes kept next to the vector collections for hybrid search
+    lexical_store = get_lexical_index_store(path=BaseController().get_database_path(db_name=settings.LEXICAL_INDEX_PATH))
+    print(f"✅ Lexical index loaded: {sorted(lexical_store.indexes)}")
+
+    # background jobs (document ingestion, patient indexing); unfinished jobs from the last run are resumed
+    app.job_store = JobStore(db_path=os.path.join(BaseController().get_database_path(db_name=settings.JOBS_DB_PATH), "jobs.sqlite"))
+    app.job_scheduler = JobScheduler(store=app.job_store, max_workers=settings.JOBS_MAX_WORKERS)
+    for kind, handler in JobController(provider_registry=registry).handlers().items():
+        app.job_scheduler.register(kind, handler)
+    resumed = app.job_scheduler.start()
+    print(f"✅ Job scheduler started ({settings.JOBS_MAX_WORKERS} workers, {resumed} jobs resumed)")
+
     yield
     
     # Shutdown
+    # running jobs stop at their next progress report and stay queued for the next start
+    app.job_scheduler.shutdown(wait=True)
+    app.job_store.close()
+    print("✅ Job scheduler stopped")
+
+    shutdown_pdf_process_pool()
+
+    if lexical_store.snapshot():
+        print("✅ Lexical index snapshot written")
+
     try:
-        if hasattr(app, 'vector_db_provider') and app.vector_db_provider:
-            app.vector_db_provider.disconnect()
+        if registry.vector_db_provider:
+            if hasattr(registry.vector_db_provider, 'snapshot') and registry.vector_db_provider.db_path:
+                registry.vector_db_provider.snapshot()
+                print("✅ Vector DB snapshot written")
+            registry.vector_db_provider.disconnect()
             print("✅ Vector DB provider disconnected")
     except Exception:
         pass
 
+    if hasattr(registry.embedding_client, 'cache'):
+        print(f"📊 Embedding cache stats: {registry.embedding_client.stats()}")
+        registry.embedding_client.cache.close()
+
+    if registry.reranker is not None:
+        print(f"📊 Reranker stats: {registry.reranker.stats()}")
+        registry.reranker.close()
+
+    if app.answer_cache is not None:
+        print(f"📊 Answer cache stats: {app.answer_cache.stats()}")
+
+    await registry.aclose()
+
+    app.patient_repository.stop_watching()
+
     print("🛑 Shutting down...")
 
 
@@ -107,4 +222,5 @@ app.include_router(base.base_router)
 app.include_router(data.data_router)
 app.include_router(test.test_router)
 app.include_router(patients.patients_router)
+app.include_router(jobs.jobs_router)
 
@@ -7,4 +7,10 @@ class ResponseSignal(Enum):
     File_Size_Error = "File size exceeds the maximum limit."
     FILE_UPLOAD_FAILED = "File upload failed."
     Processing_Failed = "File processing failed."
-    Processing_Successful = "File processed successfully."
\ No newline at end of file
+    Processing_Successful = "File processed successfully."
+    Ingestion_Started = "File ingestion started."
+    Ingestion_Not_Configured = "Embedding or Vector DB not configured."
+    Job_Not_Found = "Job not found."
+    Job_Cancel_Requested = "Job cancellation requested."
+    Job_Already_Finished = "Job already finished."
+    Job_Already_Running = "An equivalent job is already queued or running."
\ No newline at end of file
@@ -1,10 +1,12 @@
-from fastapi import FastAPI, APIRouter, Depends, UploadFile, status
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, Depends, UploadFile, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
 import os
 from helpers.config import Settings, get_settings
-from controllers import DataController, ProjectController, ProcessController
+from controllers import DataController, ProjectController, ProcessController, IngestionController, JobController
 from models import ResponseSignal
 import aiofiles
+import hashlib
+import json
 import logging
 from .schemes.data import ProcessReuest
 logger = logging.getLogger(__name__)
@@ -33,18 +35,27 @@ async def upload_file(
             }
         )
     
-    file_path, file_id = data_controller.generate_unique_filepath(
-        orig_file_name=file.filename,
-        project_id=project_id
-    )
+    temp_path = data_controller.generate_upload_filepath(project_id=project_id)
 
+    # hash while streaming to disk, so identical uploads are recognised without reading them twice
+    file_hash = hashlib.sha256()
     try:
-        async with aiofiles.open(file_path, "wb") as f:
+        async with aiofiles.open(temp_path, "wb") as f:
             while chunk := await file.read(app_settings.CHUNK_SIZE):
+                file_hash.update(chunk)
                 await f.write(chunk)
+
+        file_id, deduplicated = data_controller.store_upload(
+            temp_path=temp_path,
+            content_hash=file_hash.hexdigest(),
+            orig_file_name=file.filename,
+            project_id=project_id
+        )
     except Exception as e:
 
         logger.error(f"Error while uploading file: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
 
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -57,21 +68,34 @@ async def upload_file(
             status_code=status.HTTP_200_OK,
             content={
                 "signal": ResponseSignal.File_Uploaded_Successfully.value,
-                "file_id": file_id
+                "file_id": file_id,
+                "file_hash": file_hash.hexdigest(),
+                "deduplicated": deduplicated
             }
         )
 
 @data_router.post("/process/{project_id}")
 async def process_endpoint(
+    request: Request,
     project_id: str,
     process_request: ProcessReuest,
+    app_settings: Settings = Depends(get_settings)
 ):
     file_id = process_request.file_id
     chunk_size = process_request.chunk_size
     overlap_size = process_request.overlap_size
-    process_controller = ProcessController(project_id=project_id)
+
+    registry = request.app.provider_registry
+    if not registry.embedding_client or not registry.vector_db_provider:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.Ingestion_Not_Configured.value}
+        )
+
+    ingestion_controller = IngestionController(project_id=project_id)
     try:
-        file_content = process_controller.get_file_content(file_id=file_id)
+        # fail fast on missing / unsupported files instead of inside the background job
+        ingestion_controller.get_file_loader(file_id=file_id)
     except FileNotFoundError as e:
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -82,21 +106,50 @@ async def process_endpoint(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={"signal": str(e)}
         )
-    if len(file_content) == 0:
+
+    # chunking and embedding run on the job scheduler's worker pool, not in the request
+    job = request.app.job_scheduler.submit(JobController.INGEST_DOCUMENT, {
+        "project_id": project_id,
+        "file_id": file_id,
+        "chunk_size": chunk_size,
+        "overlap_size": overlap_size,
+        "do_reset": bool(process_request.do_reset),
+        "batch_size": app_settings.INGESTION_EMBED_BATCH_SIZE,
+    })
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "signal": ResponseSignal.Ingestion_Started.value,
+            "job_id": job["job_id"]
+        }
+    )
+
+@data_router.get("/chunks/{project_id}/{file_id}")
+def stream_file_chunks(
+    project_id: str,
+    file_id: str,
+    chunk_size: int = 100,
+    overlap_size: int = 20
+):
+    """Stream a file's chunks as NDJSON; served from the chunk cache after the first request."""
+    process_controller = ProcessController(project_id=project_id)
+    try:
+        process_controller.get_file_loader(file_id=file_id)
+        chunks = process_controller.iter_processed_chunks(file_id, chunk_size=chunk_size, overlap_size=overlap_size)
+    except FileNotFoundError as e:
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
-            content={"signal": ResponseSignal.Processing_Failed.value}
+            content={"signal": str(e)}
         )
-    file_chunks = process_controller.process_file_content(
-        file_content=file_content,
-        file_id=file_id,
-        chunk_size=chunk_size,
-        overlap_size=overlap_size
-    )
-    if file_chunks is None or len(file_chunks) == 0:
+    except ValueError as e:
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
-            content={"signal": ResponseSignal.Processing_Failed.value}
+            content={"signal": str(e)}
         )
-    return file_chunks
 
+    def ndjson_lines():
+        for chunk in chunks:
+            yield json.dumps({"page_content": chunk.page_content, "metadata": chunk.metadata}, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
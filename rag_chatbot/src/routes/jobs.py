@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Request, status
+from fastapi.responses import JSONResponse
+from models import ResponseSignal
+from stores.jobs.JobStore import JobStore
+
+
+jobs_router = APIRouter(
+    prefix="/Rafeek/v1/jobs",
+    tags=["Jobs"]
+)
+
+
+@jobs_router.get("/")
+async def list_jobs(request: Request, status_filter: str = None, limit: int = 50):
+    """Most recent jobs first; `?status_filter=running` narrows to one status."""
+    jobs = request.app.job_store.list(status=status_filter, limit=limit)
+    return JSONResponse(status_code=status.HTTP_200_OK, content={"jobs": jobs})
+
+
+@jobs_router.get("/{job_id}")
+async def get_job(request: Request, job_id: str):
+    """Job status and progress (pages parsed, chunks embedded, points written, ...)."""
+    job = request.app.job_store.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"signal": ResponseSignal.Job_Not_Found.value})
+    return JSONResponse(status_code=status.HTTP_200_OK, content=job)
+
+
+@jobs_router.post("/{job_id}/cancel")
+async def cancel_job(request: Request, job_id: str):
+    job = request.app.job_store.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"signal": ResponseSignal.Job_Not_Found.value})
+
+    if job["status"] in JobStore.FINISHED or not request.app.job_scheduler.cancel(job_id):
+        return JSONResponse(status_code=status.HTTP_409_CONFLICT,
+                            content={"signal": ResponseSignal.Job_Already_Finished.value, "status": job["status"]})
+
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED,
+                        content={"signal": ResponseSignal.Job_Cancel_Requested.value, "job_id": job_id})
@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Request, Query
 from helpers.config import get_settings, Settings
 from controllers.PatientController import PatientController
+from controllers.JobController import JobController
+from stores.jobs.JobScheduler import JobConflict
+from models import ResponseSignal
+from stores.patients.PatientCohort import parse_biomarker
 from pydantic import BaseModel
-from fastapi.responses import JSONResponse
+from typing import Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+import json
 
 
 patients_router = APIRouter(
@@ -14,6 +20,13 @@ patients_router = APIRouter(
 class SearchRequest(BaseModel):
     query: str
     top_k: int = 5
+    mode: Optional[str] = None  # "vector" | "hybrid"; defaults to SEARCH_MODE
+    rerank: bool = True  # re-rank the candidates when a reranker is configured
+
+
+class BatchSearchRequest(BaseModel):
+    queries: list[str]
+    top_k: int = 5
 
 
 class ChatRequest(BaseModel):
@@ -22,80 +35,39 @@ class ChatRequest(BaseModel):
 
 
 @patients_router.post("/index")
-def index_patients(request: Request, app_settings: Settings = Depends(get_settings)):
-    """Trigger indexing of patients.json into vector DB
-    Reuse the app-level embedding client and vector DB provider when available to avoid concurrent local Qdrant instances."""
-
-    # Prefer app-level clients initialized at startup
-    app = request.app
-
-    embedding_client = getattr(app, 'embedding_client', None)
-    if embedding_client is None and app_settings.EMBEDDING_BACKEND:
-        from stores.LLM.LLMProviderFactory import LLMProviderFactory
-        llm_factory = LLMProviderFactory(app_settings)
-        embedding_client = llm_factory.create(provider=app_settings.EMBEDDING_BACKEND)
-        if embedding_client and app_settings.EMBEDDING_MODEL_ID:
-            embedding_client.set_embedding_model(model_id=app_settings.EMBEDDING_MODEL_ID, embedding_size=app_settings.EMBEDDING_MODEL_SIZE)
-
-    vec_provider = getattr(app, 'vector_db_provider', None)
-    created_local_vec = False
-    if vec_provider is None and app_settings.VECTOR_DB_BACKEND:
-        from stores.vectordb.VectorDBProviderFactory import VectorDBProviderFactory
-        vec_factory = VectorDBProviderFactory(app_settings)
-        vec_provider = vec_factory.create(provider=app_settings.VECTOR_DB_BACKEND)
-        if vec_provider:
-            vec_provider.connect()
-            created_local_vec = True
-
-    if not embedding_client or not vec_provider:
+def index_patients(request: Request, incremental: bool = False, app_settings: Settings = Depends(get_settings)):
+    """Queue indexing of patients.json into the vector DB and return the job id.
+    The job runs on the background job scheduler with the shared embedding client and vector DB provider;
+    poll `/Rafeek/v1/jobs/{job_id}` for its stats.
+    `?incremental=true` only re-embeds new/changed patients and deletes removed ones.
+    Only one index job per collection is queued or running at a time; a second request gets 409 with its job id."""
+
+    registry = request.app.provider_registry
+    if not registry.embedding_client or not registry.vector_db_provider:
         return JSONResponse(status_code=400, content={"status": "error", "message": "Embedding or Vector DB not configured"})
 
-    pc = PatientController()
-    ok = pc.index_patients_to_qdrant(embedding_client=embedding_client, vector_db_provider=vec_provider, collection_name="patients")
-
-    if created_local_vec:
-        vec_provider.disconnect()
-
-    if ok:
-        return JSONResponse(status_code=200, content={"status": "ok", "message": "Patients indexed"})
-    else:
-        return JSONResponse(status_code=500, content={"status": "error", "message": "Indexing failed"})
+    try:
+        job = request.app.job_scheduler.submit(JobController.INDEX_PATIENTS, {"collection_name": "patients", "incremental": incremental},
+                                               unique_by=("collection_name",))
+    except JobConflict as e:
+        return JSONResponse(status_code=409, content={"status": "error", "message": ResponseSignal.Job_Already_Running.value,
+                                                      "job_id": e.job["job_id"]})
+    return JSONResponse(status_code=202, content={"status": "queued", "message": "Patient indexing queued", "job_id": job["job_id"]})
 
 
 @patients_router.post("/search")
-def search_patients(request: Request, req: SearchRequest, app_settings: Settings = Depends(get_settings)):
-    # Use app-level clients if available to avoid opening multiple Qdrant clients
-    app = request.app
-
-    if not app_settings.EMBEDDING_BACKEND or not app_settings.VECTOR_DB_BACKEND:
-        return JSONResponse(status_code=400, content={"status": "error", "message": "Embedding or Vector DB not configured"})
-
-    embedding_client = getattr(app, 'embedding_client', None)
-    if embedding_client is None and app_settings.EMBEDDING_BACKEND:
-        from stores.LLM.LLMProviderFactory import LLMProviderFactory
-        llm_factory = LLMProviderFactory(app_settings)
-        embedding_client = llm_factory.create(provider=app_settings.EMBEDDING_BACKEND)
-        if embedding_client and app_settings.EMBEDDING_MODEL_ID:
-            embedding_client.set_embedding_model(model_id=app_settings.EMBEDDING_MODEL_ID, embedding_size=app_settings.EMBEDDING_MODEL_SIZE)
-
-    vec_provider = getattr(app, 'vector_db_provider', None)
-    created_local_vec = False
-    if vec_provider is None and app_settings.VECTOR_DB_BACKEND:
-        from stores.vectordb.VectorDBProviderFactory import VectorDBProviderFactory
-        vec_factory = VectorDBProviderFactory(app_settings)
-        vec_provider = vec_factory.create(provider=app_settings.VECTOR_DB_BACKEND)
-        if vec_provider:
-            vec_provider.connect()
-            created_local_vec = True
+async def search_patients(request: Request, req: SearchRequest, app_settings: Settings = Depends(get_settings)):
+    # clients are built once at startup and shared through the provider registry
+    registry = request.app.provider_registry
+    embedding_client = registry.embedding_client
+    vec_provider = registry.vector_db_provider
 
     if not embedding_client or not vec_provider:
         return JSONResponse(status_code=400, content={"status": "error", "message": "Embedding or Vector DB not configured"})
 
     pc = PatientController()
-    results = pc.search_patients(query=req.query, embedding_client=embedding_client, vector_db_provider=vec_provider, collection_name="patients", top_k=req.top_k)
-
-    if created_local_vec:
-        vec_provider.disconnect()
+    results = await pc.asearch_patients(query=req.query, embedding_client=embedding_client, vector_db_provider=vec_provider, collection_name="patients", top_k=req.top_k, mode=req.mode,
+                                        reranker=registry.reranker if req.rerank else None)
 
     # Add a user-friendly Arabic message depending on whether we have results
     if not results:
@@ -106,8 +78,61 @@ def search_patients(request: Request, req: SearchRequest, app_settings: Settings
     return {"status": "ok", "results": results, "message": message}
 
 
+@patients_router.post("/search/batch")
+def search_patients_batch(request: Request, req: BatchSearchRequest):
+    """Vector search for many queries at once (evaluation runs, cohort lookups): the queries are embedded in
+    batches and sent to the vector DB as one multi-vector search. Returns one result list per query, in order."""
+    registry = request.app.provider_registry
+    embedding_client = registry.embedding_client
+    vec_provider = registry.vector_db_provider
+
+    if not embedding_client or not vec_provider:
+        return JSONResponse(status_code=400, content={"status": "error", "message": "Embedding or Vector DB not configured"})
+
+    pc = PatientController()
+    results = pc.search_patients_many(queries=req.queries, embedding_client=embedding_client, vector_db_provider=vec_provider,
+                                      collection_name="patients", top_k=req.top_k)
+    return {"status": "ok", "results": [{"query": q, "results": r} for q, r in zip(req.queries, results)]}
+
+
+@patients_router.get("/")
+async def list_patients(stage: str = None, tumor_type: str = None, biomarker: list[str] = Query(default=[])):
+    """List patients from the in-memory repository, e.g. `?stage=IIA&biomarker=HER2:Negative&biomarker=ER:Positive`."""
+    biomarkers = {}
+    for item in biomarker:
+        marker, sep, status = item.partition(":")
+        if not sep:
+            return JSONResponse(status_code=400, content={"status": "error", "message": f"Invalid biomarker filter: {item}"})
+        biomarkers[marker] = status
+
+    pc = PatientController()
+    patients = pc.find_patients(stage=stage, biomarkers=biomarkers, tumor_type=tumor_type)
+    return {"status": "ok", "count": len(patients), "patients": patients}
+
+
+@patients_router.get("/query")
+def query_patients(age_min: float = None, age_max: float = None, stage: list[str] = Query(default=[]),
+                   grade: list[int] = Query(default=[]), biomarker: list[str] = Query(default=[]),
+                   treatment: list[str] = Query(default=[]), comorbidity: list[str] = Query(default=[]),
+                   tumor_type: list[str] = Query(default=[]), limit: int = Query(default=100, ge=0)):
+    """Structured cohort query evaluated as vectorized masks over the columnar patient view, e.g.
+    "ER+/HER2- stage II under 50 treated with AC-T": `?biomarker=ER+&biomarker=HER2-&stage=II&age_max=49&treatment=AC-T`.
+    Stages and grades match any given value (a bare "II" includes IIA/IIB); all other filters must all match.
+    Returns the total match count and the first `limit` patients."""
+    try:
+        biomarkers = [parse_biomarker(item) for item in biomarker]
+        pc = PatientController()
+        count, patients = pc.query_cohort(limit=limit, age_min=age_min, age_max=age_max, stages=stage, grades=grade,
+                                          biomarkers=biomarkers, treatments=treatment, comorbidities=comorbidity,
+                                          tumor_types=tumor_type)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+
+    return {"status": "ok", "count": count, "patients": patients}
+
+
 @patients_router.get("/{patient_id}")
-def get_patient(patient_id: str):
+async def get_patient(patient_id: str):
     pc = PatientController()
     p = pc.get_patient_by_id(patient_id)
     if not p:
@@ -118,8 +143,7 @@ def get_patient(patient_id: str):
 @patients_router.get("/status")
 def patients_status(request: Request, app_settings: Settings = Depends(get_settings)):
     """Return whether the `patients` collection exists and its size (number of records)."""
-    app = request.app
-    vec_provider = getattr(app, 'vector_db_provider', None)
+    vec_provider = request.app.provider_registry.vector_db_provider
 
     if vec_provider is None:
         return {"status": "ok", "collection_exists": False, "size": 0, "message": "Vector DB not configured"}
@@ -137,19 +161,48 @@ def patients_status(request: Request, app_settings: Settings = Depends(get_setti
 
 
 @patients_router.post("/{patient_id}/chat")
-def patient_chat(patient_id: str, request: Request, req: ChatRequest, app_settings: Settings = Depends(get_settings)):
+async def patient_chat(patient_id: str, request: Request, req: ChatRequest, app_settings: Settings = Depends(get_settings)):
     """Chat with the system about a specific patient. The response will be tailored using the patient's data."""
-    app = request.app
+    registry = request.app.provider_registry
 
     # Get generation client; fallback to None (LocalProvider will be used)
-    generation_client = getattr(app, 'generation_client', None)
-    embedding_client = getattr(app, 'embedding_client', None)
-    vec_provider = getattr(app, 'vector_db_provider', None)
+    generation_client = registry.generation_client
+    embedding_client = registry.embedding_client
+    vec_provider = registry.vector_db_provider
 
     pc = PatientController()
-    resp = pc.chat_with_patient(patient_id=patient_id, question=req.question, generation_client=generation_client, embedding_client=embedding_client, vector_db_provider=vec_provider, top_k=req.top_k)
+    resp = await pc.achat_with_patient(patient_id=patient_id, question=req.question, generation_client=generation_client, embedding_client=embedding_client, vector_db_provider=vec_provider, top_k=req.top_k,
+                                       answer_cache=request.app.answer_cache)
 
     if isinstance(resp, dict) and resp.get('error'):
-        return JSONResponse(status_code=404, content={"status": "error", "message": resp.get('error')})
+        # 404 for an unknown patient, 500 when no answer could be built
+        return JSONResponse(status_code=resp.get('status_code', 404), content={"status": "error", "message": resp.get('error')})
+
+    return {"status": "ok", "answer": resp.get('answer'), "sources": resp.get('sources', []), "patient_id": patient_id, "cached": resp.get('cached', False)}
+
+@patients_router.post("/{patient_id}/chat/stream")
+def patient_chat_stream(patient_id: str, request: Request, req: ChatRequest, format: str = "sse"):
+    """Streaming variant of the chat endpoint.
+    Sends Server-Sent Events (`event: token` per text chunk, then `event: done` with the final answer and sources);
+    `?format=ndjson` sends the same events as one JSON object per line."""
+    registry = request.app.provider_registry
+
+    generation_client = registry.generation_client
+    embedding_client = registry.embedding_client
+    vec_provider = registry.vector_db_provider
+
+    pc = PatientController()
+    if not pc.get_patient_by_id(patient_id):
+        return JSONResponse(status_code=404, content={"status": "error", "message": "Patient not found"})
+
+    events = pc.stream_chat_with_patient(patient_id=patient_id, question=req.question, generation_client=generation_client, embedding_client=embedding_client, vector_db_provider=vec_provider, top_k=req.top_k,
+                                         answer_cache=request.app.answer_cache)
+
+    if format == "ndjson":
+        lines = (json.dumps({"event": event, **data}, ensure_ascii=False) + "\n" for event, data in events)
+        return StreamingResponse(lines, media_type="application/x-ndjson")
 
-    return {"status": "ok", "answer": resp.get('answer'), "sources": resp.get('sources', []), "patient_id": patient_id}
\ No newline at end of file
+    messages = (f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n" for event, data in events)
+    # disable proxy buffering so tokens reach the client as they are generated
+    return StreamingResponse(messages, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from fastapi.responses import JSONResponse
 from helpers.config import Settings, get_settings
+from stores.LLM.LLMEnums import LLMEnums
 
 test_router = APIRouter(
     prefix="/test",
@@ -49,7 +50,7 @@ async def test_hello(name: str):
     }
 
 @test_router.get("/gemini")
-async def test_gemini_key(app_settings: Settings = Depends(get_settings)):
+async def test_gemini_key(request: Request, app_settings: Settings = Depends(get_settings)):
     """اختبار فعلي لـ Gemini API key"""
     
     if not app_settings.GEMINI_API_KEY:
@@ -60,14 +61,11 @@ async def test_gemini_key(app_settings: Settings = Depends(get_settings)):
         }
     
     try:
-        # استيراد Gemini
-        from google import genai
-        
-        # إنشاء client
-        client = genai.Client(api_key=app_settings.GEMINI_API_KEY)
+        # shared client (pooled connections) from the provider registry
+        client = request.app.provider_registry.get_llm(LLMEnums.GEMINI.value).client
         
         # اختبار بسيط - طريقة مبسطة
-        response = client.models.generate_content(
+        response = await client.aio.models.generate_content(
             model="gemini-2.5-flash",
             contents="Say hello in Arabic"
         )
@@ -95,7 +93,7 @@ async def test_gemini_key(app_settings: Settings = Depends(get_settings)):
         }
 
 @test_router.get("/gemini/full")
-async def test_gemini_full_performance(app_settings: Settings = Depends(get_settings)):
+async def test_gemini_full_performance(request: Request, app_settings: Settings = Depends(get_settings)):
     """اختبار شامل لأداء Gemini في Generation و Embedding"""
     
     if not app_settings.GEMINI_API_KEY:
@@ -112,11 +110,10 @@ async def test_gemini_full_performance(app_settings: Settings = Depends(get_sett
     }
     
     try:
-        from google import genai
         import time
         
-        # إنشاء client
-        client = genai.Client(api_key=app_settings.GEMINI_API_KEY)
+        # shared client (pooled connections) from the provider registry
+        client = request.app.provider_registry.get_llm(LLMEnums.GEMINI.value).client
         
         # =========================
         # اختبار Text Generation
@@ -124,7 +121,7 @@ async def test_gemini_full_performance(app_settings: Settings = Depends(get_sett
         try:
             start_time = time.time()
             
-            generation_response = client.models.generate_content(
+            generation_response = await client.aio.models.generate_content(
                 model="gemini-2.5-flash",
                 contents="اكتب فقرة قصيرة عن أهمية الذكاء الاصطناعي في الطب"
             )
@@ -162,7 +159,7 @@ async def test_gemini_full_performance(app_settings: Settings = Depends(get_sett
                 "التكنولوجيا الطبية الحديثة"
             ]
             
-            embedding_response = client.models.embed_content(
+            embedding_response = await client.aio.models.embed_content(
                 model="text-embedding-004",
                 contents=test_texts[0]
             )
@@ -173,7 +170,7 @@ async def test_gemini_full_performance(app_settings: Settings = Depends(get_sett
             start_time_batch = time.time()
             batch_responses = []
             for text in test_texts:
-                batch_response = client.models.embed_content(
+                batch_response = await client.aio.models.embed_content(
                     model="text-embedding-004", 
                     contents=text
                 )
@@ -260,7 +257,7 @@ async def test_gemini_full_performance(app_settings: Settings = Depends(get_sett
         }
 
 @test_router.post("/chat")
-async def chat_with_gemini(message: dict, app_settings: Settings = Depends(get_settings)):
+async def chat_with_gemini(request: Request, message: dict, app_settings: Settings = Depends(get_settings)):
     """محادثة مع Gemini - شات بوت بسيط"""
     
     if not app_settings.GEMINI_API_KEY:
@@ -279,11 +276,10 @@ async def chat_with_gemini(message: dict, app_settings: Settings = Depends(get_s
         }
     
     try:
-        from google import genai
         import time
         
-        # إنشاء client
-        client = genai.Client(api_key=app_settings.GEMINI_API_KEY)
+        # shared client (pooled connections) from the provider registry
+        client = request.app.provider_registry.get_llm(LLMEnums.GEMINI.value).client
         
         # تحسين الـ prompt للشات بوت
         enhanced_prompt = f"""
@@ -300,7 +296,7 @@ async def chat_with_gemini(message: dict, app_settings: Settings = Depends(get_s
         
         start_time = time.time()
         
-        response = client.models.generate_content(
+        response = await client.aio.models.generate_content(
             model="gemini-2.5-flash",
             contents=enhanced_prompt
         )
@@ -327,7 +323,7 @@ async def chat_with_gemini(message: dict, app_settings: Settings = Depends(get_s
         }
 
 @test_router.post("/chat/medical")
-async def medical_chat_with_gemini(message: dict, app_settings: Settings = Depends(get_settings)):
+async def medical_chat_with_gemini(request: Request, message: dict, app_settings: Settings = Depends(get_settings)):
     """محادثة طبية متخصصة مع Gemini"""
     
     if not app_settings.GEMINI_API_KEY:
@@ -346,10 +342,9 @@ async def medical_chat_with_gemini(message: dict, app_settings: Settings = Depen
         }
     
     try:
-        from google import genai
         import time
         
-        client = genai.Client(api_key=app_settings.GEMINI_API_KEY)
+        client = request.app.provider_registry.get_llm(LLMEnums.GEMINI.value).client
         
         # prompt متخصص للاستشارات الطبية
         medical_prompt = f"""
@@ -374,7 +369,7 @@ async def medical_chat_with_gemini(message: dict, app_settings: Settings = Depen
         
         start_time = time.time()
         
-        response = client.models.generate_content(
+        response = await client.aio.models.generate_content(
             model="gemini-2.5-flash",
             contents=medical_prompt
         )
@@ -402,16 +397,15 @@ async def medical_chat_with_gemini(message: dict, app_settings: Settings = Depen
         }
 
 @test_router.get("/all-apis")
-async def test_all_api_keys(app_settings: Settings = Depends(get_settings)):
+async def test_all_api_keys(request: Request, app_settings: Settings = Depends(get_settings)):
     """اختبار جميع مفاتيح الـ API دفعة واحدة"""
     results = {}
     
     # اختبار Gemini
     try:
         if app_settings.GEMINI_API_KEY:
-            from google import genai
-            client = genai.Client(api_key=app_settings.GEMINI_API_KEY)
-            response = client.models.generate_content(
+            client = request.app.provider_registry.get_llm(LLMEnums.GEMINI.value).client
+            response = await client.aio.models.generate_content(
                 model="gemini-2.5-flash",
                 contents="Say hello"
             )
@@ -424,9 +418,8 @@ async def test_all_api_keys(app_settings: Settings = Depends(get_settings)):
     # اختبار OpenAI
     try:
         if app_settings.OPENAI_API_KEY:
-            from openai import OpenAI
-            client = OpenAI(api_key=app_settings.OPENAI_API_KEY)
-            response = client.chat.completions.create(
+            client = request.app.provider_registry.get_llm(LLMEnums.OPENAI.value).async_client
+            response = await client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": "Say hello"}],
                 max_tokens=10
@@ -440,9 +433,8 @@ async def test_all_api_keys(app_settings: Settings = Depends(get_settings)):
     # اختبار Cohere
     try:
         if app_settings.COHERE_API_KEY:
-            import cohere
-            client = cohere.Client(api_key=app_settings.COHERE_API_KEY)
-            response = client.generate(prompt="Say hello", max_tokens=10)
+            client = request.app.provider_registry.get_llm(LLMEnums.COHERE.value).async_client
+            response = await client.generate(prompt="Say hello", max_tokens=10)
             results["cohere"] = {"status": "success", "working": True, "response": "Hello from Cohere!"}
         else:
             results["cohere"] = {"status": "error", "working": False, "message": "API key not found"}
@@ -465,7 +457,7 @@ async def test_all_api_keys(app_settings: Settings = Depends(get_settings)):
     }
 
 @test_router.get("/openai")
-async def test_openai_key(app_settings: Settings = Depends(get_settings)):
+async def test_openai_key(request: Request, app_settings: Settings = Depends(get_settings)):
     """اختبار فعلي لـ OpenAI API key"""
     
     if not app_settings.OPENAI_API_KEY:
@@ -476,11 +468,10 @@ async def test_openai_key(app_settings: Settings = Depends(get_settings)):
         }
     
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=app_settings.OPENAI_API_KEY)
+        client = request.app.provider_registry.get_llm(LLMEnums.OPENAI.value).async_client
         
         # اختبار بسيط
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": "Say hello in Arabic"}],
             max_tokens=50
@@ -503,7 +494,7 @@ async def test_openai_key(app_settings: Settings = Depends(get_settings)):
         }
 
 @test_router.get("/cohere") 
-async def test_cohere_key(app_settings: Settings = Depends(get_settings)):
+async def test_cohere_key(request: Request, app_settings: Settings = Depends(get_settings)):
     """اختبار فعلي لـ Cohere API key"""
     
     if not app_settings.COHERE_API_KEY:
@@ -514,11 +505,10 @@ async def test_cohere_key(app_settings: Settings = Depends(get_settings)):
         }
     
     try:
-        import cohere
-        client = cohere.Client(api_key=app_settings.COHERE_API_KEY)
+        client = request.app.provider_registry.get_llm(LLMEnums.COHERE.value).async_client
         
         # اختبار بسيط
-        response = client.generate(
+        response = await client.generate(
             prompt="Say hello in Arabic",
             max_tokens=50
         )
@@ -0,0 +1,110 @@
+from .LLMInterface import LLMInterface
+from .EmbeddingCache import EmbeddingCache
+import hashlib
+import asyncio
+import logging
+
+class CachedEmbeddingProvider(LLMInterface):
+    """Wraps any LLMInterface client and serves embed_text / embed_many from an EmbeddingCache.
+    Cache key: (provider, embedding_model_id, document_type, sha256 of the full text). The text is hashed as given,
+    not as process_text cuts it: some providers embed the whole text, so a shared prefix must not share a vector.
+    Generation calls and every other attribute are passed straight through to the wrapped client.
+    """
+
+    def __init__(self, client: LLMInterface, cache: EmbeddingCache, provider_name: str = None):
+        self.client = client
+        self.cache = cache
+        self.provider_name = provider_name or type(client).__name__
+        self.logger = logging.getLogger(__name__)
+
+    def __getattr__(self, name):
+        # only called for attributes not found on the wrapper (embedding_size, embedding_model_id, ...)
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    def set_generation_model(self, model_id: str):
+        self.client.set_generation_model(model_id=model_id)
+
+    def set_embedding_model(self, model_id: str, embedding_size: int):
+        self.client.set_embedding_model(model_id=model_id, embedding_size=embedding_size)
+
+    def generate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                            temperature: float = None):
+        return self.client.generate_text(prompt, chat_history=chat_history, max_output_tokens=max_output_tokens,
+                                         temperature=temperature)
+
+    def generate_stream(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                            temperature: float = None):
+        return self.client.generate_stream(prompt, chat_history=chat_history, max_output_tokens=max_output_tokens,
+                                           temperature=temperature)
+
+    async def agenerate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                            temperature: float = None):
+        return await self.client.agenerate_text(prompt, chat_history=chat_history, max_output_tokens=max_output_tokens,
+                                                temperature=temperature)
+
+    def construct_prompt(self, prompt: str, role: str):
+        return self.client.construct_prompt(prompt=prompt, role=role)
+
+    def cache_key(self, text: str, document_type: str = None) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        document_type = getattr(document_type, "value", document_type)
+        return f"{self.provider_name}|{self.client.embedding_model_id}|{document_type}|{digest}"
+
+    def embed_text(self, text: str, document_type: str = None):
+        key = self.cache_key(text, document_type)
+        vector = self.cache.get(key)
+        if vector is not None:
+            return vector
+
+        vector = self.client.embed_text(text, document_type=document_type)
+        if vector is not None:
+            self.cache.put(key, list(vector))
+        return vector
+
+    def embed_many(self, texts: list, document_type: str = None, batch_size: int = None):
+        keys = [self.cache_key(t, document_type) for t in texts]
+        vectors = self.cache.get_many(keys)
+
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if not missing:
+            return vectors
+
+        fresh = self.client.embed_many([texts[i] for i in missing], document_type=document_type, batch_size=batch_size)
+        if fresh is None:
+            return None
+
+        fresh = [list(v) if v is not None else None for v in fresh]
+        self.cache.put_many([keys[i] for i in missing], fresh)
+        for i, vector in zip(missing, fresh):
+            vectors[i] = vector
+
+        return vectors
+
+    async def aembed_text(self, text: str, document_type: str = None):
+        vectors = await self.aembed_many([text], document_type=document_type)
+        return vectors[0] if vectors else None
+
+    async def aembed_many(self, texts: list, document_type: str = None, batch_size: int = None):
+        # the SQLite tier blocks, so cache reads and writes run on a worker thread, off the event loop
+        keys = [self.cache_key(t, document_type) for t in texts]
+        vectors = await asyncio.to_thread(self.cache.get_many, keys)
+
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if not missing:
+            return vectors
+
+        fresh = await self.client.aembed_many([texts[i] for i in missing], document_type=document_type, batch_size=batch_size)
+        if fresh is None:
+            return None
+
+        fresh = [list(v) if v is not None else None for v in fresh]
+        await asyncio.to_thread(self.cache.put_many, [keys[i] for i in missing], fresh)
+        for i, vector in zip(missing, fresh):
+            vectors[i] = vector
+
+        return vectors
+
+    def stats(self) -> dict:
+        return self.cache.stats()
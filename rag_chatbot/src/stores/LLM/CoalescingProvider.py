@@ -0,0 +1,134 @@
+from .LLMInterface import LLMInterface
+import threading
+import hashlib
+import logging
+import asyncio
+import json
+
+class _InflightCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class CoalescingProvider(LLMInterface):
+    """Single-flight layer over an LLMInterface client.
+    Concurrent calls with identical arguments share one in-flight provider call and all receive its result
+    (or its exception). Sync callers wait on the leader thread; async callers await one shared task.
+    Nothing is remembered once the call finishes - caching is EmbeddingCache's / SemanticAnswerCache's job.
+    """
+
+    def __init__(self, client: LLMInterface):
+        self.client = client
+
+        self.inflight = {}
+        self.ainflight = {}
+        self.lock = threading.Lock()
+
+        self.calls = 0
+        self.coalesced = 0
+
+        self.logger = logging.getLogger(__name__)
+
+    def __getattr__(self, name):
+        # only called for attributes not found on the wrapper (embedding_size, cache, stats, ...)
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    @staticmethod
+    def _key(*parts) -> str:
+        raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _do(self, key: str, fn):
+        with self.lock:
+            call = self.inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _InflightCall()
+                self.inflight[key] = call
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+            call.done.set()
+        return call.result
+
+    async def _ado(self, key: str, coro_fn):
+        task = self.ainflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coro_fn())
+            self.ainflight[key] = task
+            self.calls += 1
+
+            def _forget(finished, key=key):
+                if self.ainflight.get(key) is finished:
+                    del self.ainflight[key]
+
+            task.add_done_callback(_forget)
+        else:
+            self.coalesced += 1
+
+        # shield: one waiter being cancelled must not cancel the call the others are waiting on
+        return await asyncio.shield(task)
+
+    def set_generation_model(self, model_id: str):
+        self.client.set_generation_model(model_id=model_id)
+
+    def set_embedding_model(self, model_id: str, embedding_size: int):
+        self.client.set_embedding_model(model_id=model_id, embedding_size=embedding_size)
+
+    def generate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                            temperature: float = None):
+        key = self._key("generate", prompt, chat_history, max_output_tokens, temperature)
+        return self._do(key, lambda: self.client.generate_text(prompt, chat_history=list(chat_history),
+                                                               max_output_tokens=max_output_tokens, temperature=temperature))
+
+    async def agenerate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                            temperature: float = None):
+        key = self._key("generate", prompt, chat_history, max_output_tokens, temperature)
+        return await self._ado(key, lambda: self.client.agenerate_text(prompt, chat_history=list(chat_history),
+                                                                       max_output_tokens=max_output_tokens, temperature=temperature))
+
+    def generate_stream(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                            temperature: float = None):
+        return self.client.generate_stream(prompt, chat_history=chat_history, max_output_tokens=max_output_tokens,
+                                           temperature=temperature)
+
+    def embed_text(self, text: str, document_type: str = None):
+        key = self._key("embed", getattr(document_type, "value", document_type), text)
+        return self._do(key, lambda: self.client.embed_text(text, document_type=document_type))
+
+    async def aembed_text(self, text: str, document_type: str = None):
+        key = self._key("embed", getattr(document_type, "value", document_type), text)
+        return await self._ado(key, lambda: self.client.aembed_text(text, document_type=document_type))
+
+    def embed_many(self, texts: list, document_type: str = None, batch_size: int = None):
+        key = self._key("embed_many", getattr(document_type, "value", document_type), texts)
+        return self._do(key, lambda: self.client.embed_many(texts, document_type=document_type, batch_size=batch_size))
+
+    async def aembed_many(self, texts: list, document_type: str = None, batch_size: int = None):
+        key = self._key("embed_many", getattr(document_type, "value", document_type), texts)
+        return await self._ado(key, lambda: self.client.aembed_many(texts, document_type=document_type, batch_size=batch_size))
+
+    def construct_prompt(self, prompt: str, role: str):
+        return self.client.construct_prompt(prompt=prompt, role=role)
+
+    def coalescing_stats(self) -> dict:
+        return {"calls": self.calls, "coalesced": self.coalesced}
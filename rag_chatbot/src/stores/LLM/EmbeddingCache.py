@@ -0,0 +1,168 @@
+from collections import OrderedDict
+import numpy as np
+import threading
+import sqlite3
+import logging
+import time
+import os
+
+class EmbeddingCache:
+    """Two-tier embedding cache: an in-process LRU in front of a size-bounded SQLite table.
+    Vectors are stored as float32 blobs; the least recently used rows are evicted when a tier is full.
+    Disk hits only read: their last_access times are kept in memory and written in one batch with the next
+    insert, before an eviction, on close, or once `access_flush_items` keys are pending.
+    """
+
+    def __init__(self, db_path: str = None, memory_items: int = 10000, disk_items: int = 500000,
+                 access_flush_items: int = 1000):
+        self.memory_items = memory_items
+        self.disk_items = disk_items
+        self.access_flush_items = access_flush_items
+
+        self.memory = OrderedDict()
+        self.pending_access = {}  # key -> last_access not yet written to disk
+        self.lock = threading.Lock()
+
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+        self.logger = logging.getLogger(__name__)
+
+        self.conn = None
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_access ON embeddings(last_access)")
+            self.conn.commit()
+
+        # upper bound on the disk row count; replaced rows make it overshoot, so it is re-synced before evicting
+        self.disk_count = self._count_disk()
+
+    def _remember(self, key: str, vector: list):
+        self.memory[key] = vector
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_items:
+            self.memory.popitem(last=False)
+
+    def get_many(self, keys: list) -> list:
+        """Return the cached vector (or None) for every key, in order."""
+        out = [None] * len(keys)
+        missing = {}
+
+        with self.lock:
+            for i, key in enumerate(keys):
+                vector = self.memory.get(key)
+                if vector is not None:
+                    self.memory.move_to_end(key)
+                    self.hits_memory += 1
+                    out[i] = vector
+                else:
+                    missing.setdefault(key, []).append(i)
+
+            if missing and self.conn is not None:
+                found = {}
+                key_list = list(missing.keys())
+                # stay well under SQLite's bound-parameter limit
+                for start in range(0, len(key_list), 500):
+                    chunk = key_list[start:start + 500]
+                    rows = self.conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchall()
+                    found.update(rows)
+
+                if found:
+                    now = time.time()
+                    self.pending_access.update((k, now) for k in found)
+                    if len(self.pending_access) >= self.access_flush_items:
+                        self._flush_access()
+                        self.conn.commit()
+
+                for key, blob in found.items():
+                    vector = np.frombuffer(blob, dtype=np.float32).tolist()
+                    self._remember(key, vector)
+                    for i in missing.pop(key):
+                        out[i] = vector
+                        self.hits_disk += 1
+
+            self.misses += sum(len(positions) for positions in missing.values())
+
+        return out
+
+    def get(self, key: str):
+        return self.get_many([key])[0]
+
+    def put_many(self, keys: list, vectors: list):
+        items = [(k, v) for k, v in zip(keys, vectors) if v is not None]
+        if not items:
+            return
+
+        with self.lock:
+            for key, vector in items:
+                self._remember(key, vector)
+
+            if self.conn is None:
+                return
+
+            now = time.time()
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)",
+                [(k, np.asarray(v, dtype=np.float32).tobytes(), now) for k, v in items]
+            )
+            self.disk_count += len(items)
+            self._flush_access()
+            if self.disk_count > self.disk_items:
+                self._evict_disk()
+            self.conn.commit()
+
+    def put(self, key: str, vector: list):
+        self.put_many([key], [vector])
+
+    def _flush_access(self):
+        # caller holds the lock and commits
+        if self.pending_access:
+            self.conn.executemany("UPDATE embeddings SET last_access = ? WHERE key = ?",
+                                  [(t, k) for k, t in self.pending_access.items()])
+            self.pending_access = {}
+
+    def _count_disk(self) -> int:
+        if self.conn is None:
+            return 0
+        return self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def _evict_disk(self):
+        count = self._count_disk()
+        self.disk_count = count
+        if count <= self.disk_items:
+            return
+        # drop a little more than the overflow so eviction does not run on every insert
+        excess = count - self.disk_items + max(1, self.disk_items // 20)
+        self.conn.execute(
+            "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_access LIMIT ?)", (excess,)
+        )
+        self.disk_count = count - excess
+        self.logger.info(f"Embedding cache evicted {excess} rows")
+
+    def stats(self) -> dict:
+        lookups = self.hits_memory + self.hits_disk + self.misses
+        return {
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "hit_rate": round((self.hits_memory + self.hits_disk) / lookups, 4) if lookups else 0.0,
+            "memory_items": len(self.memory),
+            "disk_items": self.disk_count,
+        }
+
+    def close(self):
+        if self.conn is not None:
+            with self.lock:
+                self._flush_access()
+                self.conn.commit()
+            self.conn.close()
+            self.conn = None
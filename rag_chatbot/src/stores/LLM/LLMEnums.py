@@ -23,6 +23,9 @@ class GeminiEnums(Enum):
     USER = "user"
     MODEL = "model"
 
+    DOCUMENT = "RETRIEVAL_DOCUMENT"
+    QUERY = "RETRIEVAL_QUERY"
+
 
 class DocumentTypeEnum(Enum):
     DOCUMENT = "document"
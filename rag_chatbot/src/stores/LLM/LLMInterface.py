@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import asyncio
 class LLMInterface(ABC):
 
     @abstractmethod
@@ -15,14 +16,40 @@ class LLMInterface(ABC):
                             temperature: float = None):
         pass # Generate text based on the prompt (e.g., completion or chat)
 
+    @abstractmethod
+    def generate_stream(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                            temperature: float = None):
+        pass # Generator yielding the completion as text chunks as soon as the provider produces them
+
     @abstractmethod
     def embed_text(self,
                 text: str,
                 document_type: str):
         pass # Embed text for the specified document type 
 
+    @abstractmethod
+    def embed_many(self,
+                texts: list,
+                document_type: str,
+                batch_size: int = None):
+        pass # Embed a list of texts with as few provider calls as possible; returns one vector (or None) per text, in order
+
     @abstractmethod
     def construct_prompt(self,
                         prompt: str,
                         role: str):
         pass # Construct a prompt for the LLM based on the role (e.g., system, user, assistant)
+
+    # Async variants. The defaults run the blocking call on a worker thread so the event loop stays free;
+    # providers with an async SDK client override them with native implementations.
+
+    async def agenerate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                            temperature: float = None):
+        return await asyncio.to_thread(self.generate_text, prompt, chat_history=chat_history,
+                                       max_output_tokens=max_output_tokens, temperature=temperature)
+
+    async def aembed_text(self, text: str, document_type: str = None):
+        return await asyncio.to_thread(self.embed_text, text, document_type=document_type)
+
+    async def aembed_many(self, texts: list, document_type: str = None, batch_size: int = None):
+        return await asyncio.to_thread(self.embed_many, texts, document_type=document_type, batch_size=batch_size)
@@ -6,14 +6,16 @@ class LLMProviderFactory:
     def __init__(self, config: dict):
         self.config = config
 
-    def create(self, provider: str):
+    def create(self, provider: str, http_client=None, async_http_client=None):
         if provider == LLMEnums.OPENAI.value:
             return OpenAIProvider(
                 api_key = self.config.OPENAI_API_KEY,
                 api_url = self.config.OPENAI_API_URL,
                 default_input_max_characters=self.config.INPUT_DAFAULT_MAX_CHARACTERS,
                 default_generation_max_output_tokens=self.config.GENERATION_DAFAULT_MAX_TOKENS,
-                default_generation_temperature=self.config.GENERATION_DAFAULT_TEMPERATURE
+                default_generation_temperature=self.config.GENERATION_DAFAULT_TEMPERATURE,
+                http_client=http_client,
+                async_http_client=async_http_client
             )
 
         if provider == LLMEnums.COHERE.value:
@@ -21,7 +23,9 @@ class LLMProviderFactory:
                 api_key = self.config.COHERE_API_KEY,
                 default_input_max_characters=self.config.INPUT_DAFAULT_MAX_CHARACTERS,
                 default_generation_max_output_tokens=self.config.GENERATION_DAFAULT_MAX_TOKENS,
-                default_generation_temperature=self.config.GENERATION_DAFAULT_TEMPERATURE
+                default_generation_temperature=self.config.GENERATION_DAFAULT_TEMPERATURE,
+                http_client=http_client,
+                async_http_client=async_http_client
             )
 
         if provider == LLMEnums.GEMINI.value:
@@ -29,7 +33,9 @@ class LLMProviderFactory:
                 api_key = self.config.GEMINI_API_KEY,
                 default_input_max_characters=self.config.INPUT_DAFAULT_MAX_CHARACTERS,
                 default_generation_max_output_tokens=self.config.GENERATION_DAFAULT_MAX_TOKENS,
-                default_generation_temperature=self.config.GENERATION_DAFAULT_TEMPERATURE
+                default_generation_temperature=self.config.GENERATION_DAFAULT_TEMPERATURE,
+                http_client=http_client,
+                async_http_client=async_http_client
             )
 
         if provider == LLMEnums.LOCAL.value:
@@ -0,0 +1,121 @@
+from .LLMProviderFactory import LLMProviderFactory
+from .LLMEnums import LLMEnums
+from .ResilientProvider import ResilientProvider
+import threading
+import logging
+import httpx
+
+class ProviderRegistry:
+    """Process-wide home for the LLM, vector DB and reranker clients, populated once by the app lifespan.
+    Each remote LLM provider is built once on top of its own pooled, keep-alive httpx clients
+    (one sync, one async), so requests reuse warm TLS connections instead of constructing SDK clients.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.llm_factory = LLMProviderFactory(config)
+
+        self.limits = httpx.Limits(
+            max_connections=config.HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.HTTP_POOL_KEEPALIVE_EXPIRY_SECONDS,
+        )
+
+        self.providers = {}
+        self.http_clients = {}
+        self.lock = threading.Lock()
+
+        # role slots filled by the lifespan hook
+        self.generation_client = None
+        self.embedding_client = None
+        self.vector_db_provider = None
+        self.reranker = None
+
+        self.logger = logging.getLogger(__name__)
+
+    def timeout_for(self, provider: str) -> float:
+        return self.config.LLM_PROVIDER_TIMEOUTS.get(provider, self.config.HTTP_TIMEOUT_SECONDS)
+
+    def has_credentials(self, provider: str) -> bool:
+        if provider == LLMEnums.LOCAL.value:
+            return True
+        key = {
+            LLMEnums.OPENAI.value: self.config.OPENAI_API_KEY,
+            LLMEnums.COHERE.value: self.config.COHERE_API_KEY,
+            LLMEnums.GEMINI.value: self.config.GEMINI_API_KEY,
+        }.get(provider)
+        return bool(key and key.strip())
+
+    def _http_clients(self, provider: str):
+        if provider not in self.http_clients:
+            timeout = httpx.Timeout(self.timeout_for(provider))
+            self.http_clients[provider] = (
+                httpx.Client(limits=self.limits, timeout=timeout),
+                httpx.AsyncClient(limits=self.limits, timeout=timeout),
+            )
+        return self.http_clients[provider]
+
+    def get_llm(self, provider: str):
+        """Return the shared provider instance for an LLMEnums name, building it on first use."""
+        if provider in self.providers:
+            return self.providers[provider]
+
+        with self.lock:
+            if provider not in self.providers:
+                if provider == LLMEnums.LOCAL.value:
+                    client = self.llm_factory.create(provider=provider)
+                else:
+                    http_client, async_http_client = self._http_clients(provider)
+                    client = self.llm_factory.create(provider=provider, http_client=http_client,
+                                                     async_http_client=async_http_client)
+                self.providers[provider] = client
+        return self.providers[provider]
+
+    def generation_fallbacks(self, primary: str) -> list:
+        """Parse GENERATION_FALLBACK_CHAIN ("COHERE,OPENAI:gpt-4o-mini") into [(name, client)],
+        skipping the primary backend and providers without credentials.
+        LOCAL is never chained: the chat controllers fall back to it themselves and mark those answers as
+        fallbacks (tagged, not cached), which a LOCAL answer coming out of the chain would bypass."""
+        chain = []
+        for entry in (self.config.GENERATION_FALLBACK_CHAIN or "").split(","):
+            name, _, model_id = entry.strip().partition(":")
+            name = name.strip().upper()
+            if not name or name == primary or any(name == n for n, _ in chain):
+                continue
+            if name == LLMEnums.LOCAL.value:
+                self.logger.warning("Ignoring LOCAL in GENERATION_FALLBACK_CHAIN; it is already the last-resort fallback")
+                continue
+            if not self.has_credentials(name):
+                self.logger.warning(f"Skipping fallback provider {name}: missing API key")
+                continue
+
+            client = self.get_llm(name)
+            if client is None:
+                self.logger.warning(f"Skipping unknown fallback provider {name}")
+                continue
+            if model_id.strip():
+                client.set_generation_model(model_id=model_id.strip())
+            chain.append((name, client))
+        return chain
+
+    def wrap_resilient(self, providers: list) -> ResilientProvider:
+        """Wrap [(name, client), ...] with retries, backoff, circuit breakers and fallback in that order."""
+        return ResilientProvider(
+            providers,
+            max_retries=self.config.LLM_MAX_RETRIES,
+            backoff_base=self.config.LLM_BACKOFF_BASE_SECONDS,
+            backoff_max=self.config.LLM_BACKOFF_MAX_SECONDS,
+            timeouts={name: self.timeout_for(name) for name, _ in providers},
+            failure_threshold=self.config.LLM_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=self.config.LLM_CIRCUIT_RESET_SECONDS,
+        )
+
+    async def aclose(self):
+        for provider, (http_client, async_http_client) in self.http_clients.items():
+            try:
+                http_client.close()
+                await async_http_client.aclose()
+            except Exception as e:
+                self.logger.error(f"Error closing HTTP clients for {provider}: {e}")
+        self.http_clients = {}
+        self.providers = {}
@@ -8,7 +8,8 @@ class CoHereProvider(LLMInterface):
     def __init__(self, api_key: str,
                        default_input_max_characters: int=1000,
                        default_generation_max_output_tokens: int=1000,
-                       default_generation_temperature: float=0.1):
+                       default_generation_temperature: float=0.1,
+                       http_client=None, async_http_client=None):
         
         self.api_key = api_key
 
@@ -20,8 +21,11 @@ class CoHereProvider(LLMInterface):
 
         self.embedding_model_id = None
         self.embedding_size = None
+        self.default_embedding_batch_size = 96  # API limit per embed call
 
-        self.client = cohere.Client(api_key=self.api_key)
+        # http_client / async_http_client: shared, pooled httpx clients (see ProviderRegistry)
+        self.client = cohere.Client(api_key=self.api_key, httpx_client=http_client)
+        self.async_client = cohere.AsyncClient(api_key=self.api_key, httpx_client=async_http_client)
 
         self.logger = logging.getLogger(__name__)
 
@@ -47,7 +51,7 @@ class CoHereProvider(LLMInterface):
             return None
         
         max_output_tokens = max_output_tokens if max_output_tokens else self.default_generation_max_output_tokens
-        temperature = temperature if temperature else self.default_generation_temperature
+        temperature = temperature if temperature is not None else self.default_generation_temperature
 
         response = self.client.chat(
             model = self.generation_model_id,
@@ -62,6 +66,61 @@ class CoHereProvider(LLMInterface):
             return None
         
         return response.text
+
+    def generate_stream(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                            temperature: float = None):
+
+        if not self.client:
+            self.logger.error("CoHere client was not set")
+            return
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model for CoHere was not set")
+            return
+
+        max_output_tokens = max_output_tokens if max_output_tokens else self.default_generation_max_output_tokens
+        temperature = temperature if temperature is not None else self.default_generation_temperature
+
+        stream = self.client.chat_stream(
+            model = self.generation_model_id,
+            chat_history = chat_history,
+            message = self.process_text(prompt),
+            temperature = temperature,
+            max_tokens = max_output_tokens
+        )
+
+        for event in stream:
+            if event.event_type == "text-generation" and event.text:
+                yield event.text
+
+
+    async def agenerate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                            temperature: float = None):
+
+        if not self.async_client:
+            self.logger.error("CoHere async client was not set")
+            return None
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model for CoHere was not set")
+            return None
+
+        max_output_tokens = max_output_tokens if max_output_tokens else self.default_generation_max_output_tokens
+        temperature = temperature if temperature is not None else self.default_generation_temperature
+
+        response = await self.async_client.chat(
+            model = self.generation_model_id,
+            chat_history = chat_history,
+            message = self.process_text(prompt),
+            temperature = temperature,
+            max_tokens = max_output_tokens
+        )
+
+        if not response or not response.text:
+            self.logger.error("Error while generating text with CoHere")
+            return None
+
+        return response.text
     
     def embed_text(self, text: str, document_type: str = None):
         if not self.client:
@@ -88,6 +147,74 @@ class CoHereProvider(LLMInterface):
             return None
         
         return response.embeddings.float[0]
+
+    def embed_many(self, texts: list, document_type: str = None, batch_size: int = None):
+        if not self.client:
+            self.logger.error("CoHere client was not set")
+            return None
+
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model for CoHere was not set")
+            return None
+
+        input_type = CoHereEnums.DOCUMENT.value
+        if document_type == DocumentTypeEnum.QUERY.value:
+            input_type = CoHereEnums.QUERY.value
+
+        batch_size = min(batch_size or self.default_embedding_batch_size, self.default_embedding_batch_size)
+        vectors = []
+
+        for i in range(0, len(texts), batch_size):
+            response = self.client.embed(
+                model = self.embedding_model_id,
+                texts = [self.process_text(t) for t in texts[i:i + batch_size]],
+                input_type = input_type,
+                embedding_types=['float'],
+            )
+
+            if not response or not response.embeddings or not response.embeddings.float:
+                self.logger.error("Error while embedding batch with CoHere")
+                return None
+
+            vectors.extend(response.embeddings.float)
+
+        return vectors
+
+    async def aembed_text(self, text: str, document_type: str = None):
+        vectors = await self.aembed_many([text], document_type=document_type)
+        return vectors[0] if vectors else None
+
+    async def aembed_many(self, texts: list, document_type: str = None, batch_size: int = None):
+        if not self.async_client:
+            self.logger.error("CoHere async client was not set")
+            return None
+
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model for CoHere was not set")
+            return None
+
+        input_type = CoHereEnums.DOCUMENT.value
+        if document_type == DocumentTypeEnum.QUERY.value:
+            input_type = CoHereEnums.QUERY.value
+
+        batch_size = min(batch_size or self.default_embedding_batch_size, self.default_embedding_batch_size)
+        vectors = []
+
+        for i in range(0, len(texts), batch_size):
+            response = await self.async_client.embed(
+                model = self.embedding_model_id,
+                texts = [self.process_text(t) for t in texts[i:i + batch_size]],
+                input_type = input_type,
+                embedding_types=['float'],
+            )
+
+            if not response or not response.embeddings or not response.embeddings.float:
+                self.logger.error("Error while embedding batch with CoHere")
+                return None
+
+            vectors.extend(response.embeddings.float)
+
+        return vectors
     
     def construct_prompt(self, prompt: str, role: str):
         return {
@@ -1,5 +1,5 @@
 from ..LLMInterface import LLMInterface
-from ..LLMEnums import GeminiEnums
+from ..LLMEnums import GeminiEnums, DocumentTypeEnum
 from google import genai
 import logging
 
@@ -8,7 +8,8 @@ class GeminiProvider(LLMInterface):
     def __init__(self, api_key: str, api_url: str=None,
                     default_input_max_characters: int=1000,
                     default_generation_max_output_tokens: int=1000,
-                    default_generation_temperature: float=0.1):
+                    default_generation_temperature: float=0.1,
+                    http_client=None, async_http_client=None):
         
         self.api_key = api_key
         self.api_url = api_url  # Not used in Gemini
@@ -20,10 +21,15 @@ class GeminiProvider(LLMInterface):
         self.generation_model_id = None
         self.embedding_model_id = None
         self.embedding_size = None
+        self.default_embedding_batch_size = 100  # API limit per embed call
 
         # Only configure Gemini if API key is provided
         if self.api_key and self.api_key.strip():
-            self.client = genai.Client(api_key=self.api_key)
+            # http_client / async_http_client: shared, pooled httpx clients (see ProviderRegistry)
+            self.client = genai.Client(
+                api_key=self.api_key,
+                http_options=genai.types.HttpOptions(httpx_client=http_client, httpx_async_client=async_http_client)
+            )
         else:
             self.client = None
 
@@ -39,6 +45,24 @@ class GeminiProvider(LLMInterface):
     def process_text(self, text: str):
         return text[:self.default_input_max_characters].strip()
 
+    def build_contents(self, prompt: str, chat_history: list) -> list:
+        # Convert chat history to the new format
+        messages = []
+        for msg in chat_history:
+            if isinstance(msg, dict) and 'role' in msg and 'content' in msg:
+                role = "user" if msg['role'] in ['user', 'USER'] else "model"
+                messages.append(genai.types.Content(
+                    role=role,
+                    parts=[genai.types.Part.from_text(text=msg['content'])]
+                ))
+
+        # Add current prompt
+        messages.append(genai.types.Content(
+            role="user",
+            parts=[genai.types.Part.from_text(text=self.process_text(prompt))]
+        ))
+        return messages
+
     def generate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
                             temperature: float = None):
         
@@ -50,48 +74,89 @@ class GeminiProvider(LLMInterface):
             self.logger.error("Generation model for Gemini was not set")
             return None
         
-        try:
-            max_output_tokens = max_output_tokens if max_output_tokens else self.default_generation_max_output_tokens
-            temperature = temperature if temperature else self.default_generation_temperature
-
-            # Convert chat history to the new format
-            messages = []
-            for msg in chat_history:
-                if isinstance(msg, dict) and 'role' in msg and 'content' in msg:
-                    role = "user" if msg['role'] in ['user', 'USER'] else "model"
-                    messages.append(genai.types.Content(
-                        role=role,
-                        parts=[genai.types.Part.from_text(msg['content'])]
-                    ))
-
-            # Add current prompt
-            messages.append(genai.types.Content(
-                role="user",
-                parts=[genai.types.Part.from_text(self.process_text(prompt))]
-            ))
-
-            # Generate response using the new API
-            response = self.client.models.generate_content(
-                model=self.generation_model_id,
-                contents=messages,
-                config=genai.types.GenerateContentConfig(
-                    max_output_tokens=max_output_tokens,
-                    temperature=temperature,
-                )
+        max_output_tokens = max_output_tokens if max_output_tokens else self.default_generation_max_output_tokens
+        temperature = temperature if temperature is not None else self.default_generation_temperature
+
+        messages = self.build_contents(prompt, chat_history)
+
+        # Generate response using the new API
+        response = self.client.models.generate_content(
+            model=self.generation_model_id,
+            contents=messages,
+            config=genai.types.GenerateContentConfig(
+                max_output_tokens=max_output_tokens,
+                temperature=temperature,
             )
+        )
 
-            if response and hasattr(response, 'text') and response.text:
-                return response.text
-            else:
-                self.logger.error("Error while generating text with Gemini")
-                return None
+        if response and hasattr(response, 'text') and response.text:
+            return response.text
+        else:
+            self.logger.error("Error while generating text with Gemini")
+            return None
+
+    def generate_stream(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                            temperature: float = None):
+
+        if not self.client:
+            self.logger.error("Gemini client was not set")
+            return
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model for Gemini was not set")
+            return
+
+        max_output_tokens = max_output_tokens if max_output_tokens else self.default_generation_max_output_tokens
+        temperature = temperature if temperature is not None else self.default_generation_temperature
 
-        except Exception as e:
-            self.logger.error(f"Error generating text with Gemini: {e}")
+        stream = self.client.models.generate_content_stream(
+            model=self.generation_model_id,
+            contents=self.build_contents(prompt, chat_history),
+            config=genai.types.GenerateContentConfig(
+                max_output_tokens=max_output_tokens,
+                temperature=temperature,
+            )
+        )
+
+        for chunk in stream:
+            if chunk and chunk.text:
+                yield chunk.text
+
+    async def agenerate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                            temperature: float = None):
+
+        if not self.client:
+            self.logger.error("Gemini client was not set")
+            return None
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model for Gemini was not set")
+            return None
+
+        max_output_tokens = max_output_tokens if max_output_tokens else self.default_generation_max_output_tokens
+        temperature = temperature if temperature is not None else self.default_generation_temperature
+
+        response = await self.client.aio.models.generate_content(
+            model=self.generation_model_id,
+            contents=self.build_contents(prompt, chat_history),
+            config=genai.types.GenerateContentConfig(
+                max_output_tokens=max_output_tokens,
+                temperature=temperature,
+            )
+        )
+
+        if response and hasattr(response, 'text') and response.text:
+            return response.text
+        else:
+            self.logger.error("Error while generating text with Gemini")
             return None
 
     def embed_text(self, text: str, document_type: str = None):
-        
+        vectors = self.embed_many([text], document_type=document_type)
+        return vectors[0] if vectors else None
+
+    def embed_many(self, texts: list, document_type: str = None, batch_size: int = None):
+
         if not self.client:
             self.logger.error("Gemini client was not set")
             return None
@@ -99,25 +164,62 @@ class GeminiProvider(LLMInterface):
         if not self.embedding_model_id:
             self.logger.error("Embedding model for Gemini was not set")
             return None
-        
-        try:
-            # Use the new embed API
+
+        batch_size = min(batch_size or self.default_embedding_batch_size, self.default_embedding_batch_size)
+        # anything that is not a query ("document", "patient", ...) is embedded as a document
+        task_type = GeminiEnums.QUERY.value if document_type == DocumentTypeEnum.QUERY.value else GeminiEnums.DOCUMENT.value
+        vectors = []
+
+        for i in range(0, len(texts), batch_size):
+            # one request embeds the whole batch
             result = self.client.models.embed_content(
                 model=self.embedding_model_id,
-                content=genai.types.Content(parts=[genai.types.Part.from_text(text)]),
-                task_type="RETRIEVAL_DOCUMENT" if document_type == "document" else "RETRIEVAL_QUERY"
+                contents=texts[i:i + batch_size],
+                config=genai.types.EmbedContentConfig(task_type=task_type)
             )
 
-            if result and hasattr(result, 'embedding') and result.embedding:
-                return result.embedding.values
-            else:
-                self.logger.error("Error while embedding text with Gemini")
+            if not result or not result.embeddings:
+                self.logger.error("Error while embedding batch with Gemini")
                 return None
 
-        except Exception as e:
-            self.logger.error(f"Error embedding text with Gemini: {e}")
+            vectors.extend(e.values for e in result.embeddings)
+
+        return vectors
+
+    async def aembed_text(self, text: str, document_type: str = None):
+        vectors = await self.aembed_many([text], document_type=document_type)
+        return vectors[0] if vectors else None
+
+    async def aembed_many(self, texts: list, document_type: str = None, batch_size: int = None):
+
+        if not self.client:
+            self.logger.error("Gemini client was not set")
             return None
 
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model for Gemini was not set")
+            return None
+
+        batch_size = min(batch_size or self.default_embedding_batch_size, self.default_embedding_batch_size)
+        # anything that is not a query ("document", "patient", ...) is embedded as a document
+        task_type = GeminiEnums.QUERY.value if document_type == DocumentTypeEnum.QUERY.value else GeminiEnums.DOCUMENT.value
+        vectors = []
+
+        for i in range(0, len(texts), batch_size):
+            result = await self.client.aio.models.embed_content(
+                model=self.embedding_model_id,
+                contents=texts[i:i + batch_size],
+                config=genai.types.EmbedContentConfig(task_type=task_type)
+            )
+
+            if not result or not result.embeddings:
+                self.logger.error("Error while embedding batch with Gemini")
+                return None
+
+            vectors.extend(e.values for e in result.embeddings)
+
+        return vectors
+
     def construct_prompt(self, prompt: str, role: str):
         return {
             "role": role,
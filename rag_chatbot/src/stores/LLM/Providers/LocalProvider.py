@@ -1,5 +1,6 @@
 from ..LLMInterface import LLMInterface
 import hashlib
+import numpy as np
 import logging
 
 class LocalProvider(LLMInterface):
@@ -55,9 +56,44 @@ class LocalProvider(LLMInterface):
 
         return vec
 
+    def embed_many(self, texts: list, document_type: str = None, batch_size: int = None):
+        """Bulk version of embed_text: hashes every text, then maps all digests to vectors in one NumPy pass.
+        Produces exactly the same vectors as embed_text."""
+        if not self.embedding_size:
+            self.logger.error("Embedding model/size is not set for LocalProvider")
+            return None
+
+        if not texts:
+            return []
+
+        digests = b"".join(hashlib.sha256(self.process_text(t).encode('utf-8')).digest() for t in texts)
+        digest_bytes = np.frombuffer(digests, dtype=np.uint8).reshape(len(texts), 32)
+
+        # same byte cycling as embed_text: position i reads byte i % 32, except the wrap-around slot reads byte 0
+        positions = np.arange(self.embedding_size) % 32
+        positions[positions == 31] = 0
+
+        return ((digest_bytes[:, positions] / 127.5) - 1.0).tolist()
+
     def generate_text(self, prompt: str, chat_history: list = [], max_output_tokens: int=None, temperature: float=None):
         # Simple stub for generation: return the prompt truncated
         return self.process_text(prompt)
 
+    def generate_stream(self, prompt: str, chat_history: list = [], max_output_tokens: int=None, temperature: float=None):
+        # Stub streaming: emit the generate_text output word by word
+        text = self.generate_text(prompt, chat_history=chat_history, max_output_tokens=max_output_tokens, temperature=temperature)
+        for word in text.split(" "):
+            yield word + " "
+
+    # pure CPU and microseconds long: run inline instead of paying for a worker thread
+    async def agenerate_text(self, prompt: str, chat_history: list = [], max_output_tokens: int=None, temperature: float=None):
+        return self.generate_text(prompt, chat_history=chat_history, max_output_tokens=max_output_tokens, temperature=temperature)
+
+    async def aembed_text(self, text: str, document_type: str = None):
+        return self.embed_text(text, document_type=document_type)
+
+    async def aembed_many(self, texts: list, document_type: str = None, batch_size: int = None):
+        return self.embed_many(texts, document_type=document_type, batch_size=batch_size)
+
     def construct_prompt(self, prompt: str, role: str):
         return {"role": role, "content": self.process_text(prompt)}
@@ -1,6 +1,6 @@
 from ..LLMInterface import LLMInterface
 from ..LLMEnums import OpenAIEnums
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 import logging
 
 class OpenAIProvider(LLMInterface):
@@ -8,7 +8,8 @@ class OpenAIProvider(LLMInterface):
     def __init__(self, api_key: str, api_url: str=None,
                     default_input_max_characters: int=1000,
                     default_generation_max_output_tokens: int=1000,
-                    default_generation_temperature: float=0.1):
+                    default_generation_temperature: float=0.1,
+                    http_client=None, async_http_client=None):
         
         self.api_key = api_key
         self.api_url = api_url
@@ -21,10 +22,18 @@ class OpenAIProvider(LLMInterface):
 
         self.embedding_model_id = None
         self.embedding_size = None
+        self.default_embedding_batch_size = 100
 
+        # http_client / async_http_client: shared, pooled httpx clients (see ProviderRegistry)
         self.client = OpenAI(
             api_key = self.api_key,
-            api_url = self.api_url
+            base_url = self.api_url or None,
+            http_client = http_client
+        )
+        self.async_client = AsyncOpenAI(
+            api_key = self.api_key,
+            base_url = self.api_url or None,
+            http_client = async_http_client
         )
 
         self.logger = logging.getLogger(__name__)
@@ -51,7 +60,7 @@ class OpenAIProvider(LLMInterface):
             return None
         
         max_output_tokens = max_output_tokens if max_output_tokens else self.default_generation_max_output_tokens
-        temperature = temperature if temperature else self.default_generation_temperature
+        temperature = temperature if temperature is not None else self.default_generation_temperature
 
         chat_history.append(
             self.construct_prompt(prompt=prompt, role=OpenAIEnums.USER.value)
@@ -68,8 +77,69 @@ class OpenAIProvider(LLMInterface):
             self.logger.error("Error while generating text with OpenAI")
             return None
 
-        return response.choices[0].message["content"]
+        return response.choices[0].message.content
+
+    def generate_stream(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                            temperature: float = None):
+
+        if not self.client:
+            self.logger.error("OpenAI client was not set")
+            return
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model for OpenAI was not set")
+            return
+
+        max_output_tokens = max_output_tokens if max_output_tokens else self.default_generation_max_output_tokens
+        temperature = temperature if temperature is not None else self.default_generation_temperature
+
+        messages = list(chat_history) + [
+            self.construct_prompt(prompt=prompt, role=OpenAIEnums.USER.value)
+        ]
+
+        stream = self.client.chat.completions.create(
+            model = self.generation_model_id,
+            messages = messages,
+            max_tokens = max_output_tokens,
+            temperature = temperature,
+            stream = True
+        )
+
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+    async def agenerate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                            temperature: float = None):
+
+        if not self.async_client:
+            self.logger.error("OpenAI async client was not set")
+            return None
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model for OpenAI was not set")
+            return None
+
+        max_output_tokens = max_output_tokens if max_output_tokens else self.default_generation_max_output_tokens
+        temperature = temperature if temperature is not None else self.default_generation_temperature
+
+        messages = list(chat_history) + [
+            self.construct_prompt(prompt=prompt, role=OpenAIEnums.USER.value)
+        ]
+
+        response = await self.async_client.chat.completions.create(
+            model = self.generation_model_id,
+            messages = messages,
+            max_tokens = max_output_tokens,
+            temperature = temperature
+        )
+
+        if not response or not response.choices or len(response.choices) == 0 or not response.choices[0].message:
+            self.logger.error("Error while generating text with OpenAI")
+            return None
 
+        return response.choices[0].message.content
 
     def embed_text(self, text: str, document_type: str = None):
         
@@ -92,6 +162,71 @@ class OpenAIProvider(LLMInterface):
 
         return response.data[0].embedding
 
+    def embed_many(self, texts: list, document_type: str = None, batch_size: int = None):
+
+        if not self.client:
+            self.logger.error("OpenAI client was not set")
+            return None
+
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model for OpenAI was not set")
+            return None
+
+        batch_size = batch_size or self.default_embedding_batch_size
+        vectors = []
+
+        for i in range(0, len(texts), batch_size):
+            batch = texts[i:i + batch_size]
+
+            response = self.client.embeddings.create(
+                model = self.embedding_model_id,
+                input = batch,
+            )
+
+            if not response or not response.data or len(response.data) != len(batch):
+                self.logger.error("Error while embedding batch with OpenAI")
+                return None
+
+            # the API returns one item per input, tagged with its position
+            for item in sorted(response.data, key=lambda d: d.index):
+                vectors.append(item.embedding)
+
+        return vectors
+
+    async def aembed_text(self, text: str, document_type: str = None):
+        vectors = await self.aembed_many([text], document_type=document_type)
+        return vectors[0] if vectors else None
+
+    async def aembed_many(self, texts: list, document_type: str = None, batch_size: int = None):
+
+        if not self.async_client:
+            self.logger.error("OpenAI async client was not set")
+            return None
+
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model for OpenAI was not set")
+            return None
+
+        batch_size = batch_size or self.default_embedding_batch_size
+        vectors = []
+
+        for i in range(0, len(texts), batch_size):
+            batch = texts[i:i + batch_size]
+
+            response = await self.async_client.embeddings.create(
+                model = self.embedding_model_id,
+                input = batch,
+            )
+
+            if not response or not response.data or len(response.data) != len(batch):
+                self.logger.error("Error while embedding batch with OpenAI")
+                return None
+
+            for item in sorted(response.data, key=lambda d: d.index):
+                vectors.append(item.embedding)
+
+        return vectors
+
     def construct_prompt(self, prompt: str, role: str):
         return {
             "role": role,
@@ -0,0 +1,206 @@
+from .LLMInterface import LLMInterface
+from .CircuitBreaker import CircuitBreaker
+import asyncio
+import logging
+import random
+import httpx
+import time
+
+def get_status_code(error: Exception):
+    # openai / cohere errors expose status_code, google-genai errors expose code
+    for attr in ("status_code", "code"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    value = getattr(getattr(error, "response", None), "status_code", None)
+    return value if isinstance(value, int) else None
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits (429), server errors (5xx), timeouts and dropped connections are worth retrying."""
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, httpx.TimeoutException, httpx.TransportError)):
+        return True
+    status = get_status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    # SDK wrappers such as openai.APITimeoutError / APIConnectionError
+    name = type(error).__name__
+    return "Timeout" in name or "Connection" in name
+
+def get_retry_after(error: Exception):
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class ResilientProvider(LLMInterface):
+    """Wraps an ordered chain of LLMInterface clients, e.g. [("GEMINI", gemini), ("OPENAI", openai), ("LOCAL", local)].
+    Each call retries the current provider with jittered exponential backoff on 429/5xx/timeouts, skips providers
+    whose circuit breaker is open, and moves down the chain until one succeeds (None when all fail).
+    Generation uses the whole chain; embeddings only ever use the first provider, since vectors from
+    different models are not comparable.
+    Sync calls are bounded by the provider's HTTP client timeout, async calls additionally by `timeouts[name]`.
+    """
+
+    def __init__(self, providers: list, max_retries: int = 2, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 timeouts: dict = None, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.providers = providers
+        self.client = providers[0][1]
+
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeouts = timeouts or {}
+
+        self.breakers = {name: CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+                         for name, _ in providers}
+
+        self.logger = logging.getLogger(__name__)
+
+    def __getattr__(self, name):
+        # only called for attributes not found on the wrapper (embedding_size, process_text, ...)
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        # full jitter: uniform in [0, base * 2^attempt], but never sooner than the server asked for
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        retry_after = get_retry_after(error)
+        if retry_after:
+            delay = min(self.backoff_max, max(delay, retry_after))
+        return delay
+
+    def _chain(self, fallback: bool) -> list:
+        return self.providers if fallback else self.providers[:1]
+
+    def _copy_kwargs(self, kwargs: dict) -> dict:
+        # some providers append to chat_history in place; each attempt gets a fresh copy
+        kwargs = dict(kwargs)
+        if kwargs.get("chat_history") is not None:
+            kwargs["chat_history"] = list(kwargs["chat_history"])
+        return kwargs
+
+    def _call(self, method: str, *args, fallback: bool = True, **kwargs):
+        for name, client in self._chain(fallback):
+            breaker = self.breakers[name]
+            if not breaker.allow():
+                self.logger.warning(f"Circuit open for {name}; skipping {method}")
+                continue
+
+            for attempt in range(self.max_retries + 1):
+                try:
+                    result = getattr(client, method)(*args, **self._copy_kwargs(kwargs))
+                except Exception as e:
+                    if attempt < self.max_retries and is_retryable(e):
+                        delay = self._backoff(attempt, e)
+                        self.logger.warning(f"{name}.{method} failed ({e}); retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+                        time.sleep(delay)
+                        continue
+                    self.logger.error(f"{name}.{method} failed: {e}")
+                    break
+
+                if result is None:
+                    # not configured or an empty response; not retried, but it counts against the breaker
+                    self.logger.error(f"{name}.{method} returned no result")
+                    break
+
+                breaker.record_success()
+                return result
+
+            breaker.record_failure()
+
+        return None
+
+    async def _acall(self, method: str, *args, fallback: bool = True, **kwargs):
+        for name, client in self._chain(fallback):
+            breaker = self.breakers[name]
+            if not breaker.allow():
+                self.logger.warning(f"Circuit open for {name}; skipping {method}")
+                continue
+
+            for attempt in range(self.max_retries + 1):
+                try:
+                    result = await asyncio.wait_for(getattr(client, method)(*args, **self._copy_kwargs(kwargs)),
+                                                    timeout=self.timeouts.get(name))
+                except Exception as e:
+                    if attempt < self.max_retries and is_retryable(e):
+                        delay = self._backoff(attempt, e)
+                        self.logger.warning(f"{name}.{method} failed ({e!r}); retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+                        await asyncio.sleep(delay)
+                        continue
+                    self.logger.error(f"{name}.{method} failed: {e!r}")
+                    break
+
+                if result is None:
+                    self.logger.error(f"{name}.{method} returned no result")
+                    break
+
+                breaker.record_success()
+                return result
+
+            breaker.record_failure()
+
+        return None
+
+    def set_generation_model(self, model_id: str):
+        self.client.set_generation_model(model_id=model_id)
+
+    def set_embedding_model(self, model_id: str, embedding_size: int):
+        self.client.set_embedding_model(model_id=model_id, embedding_size=embedding_size)
+
+    def generate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                            temperature: float = None):
+        return self._call("generate_text", prompt, chat_history=chat_history,
+                          max_output_tokens=max_output_tokens, temperature=temperature)
+
+    async def agenerate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                            temperature: float = None):
+        return await self._acall("agenerate_text", prompt, chat_history=chat_history,
+                                 max_output_tokens=max_output_tokens, temperature=temperature)
+
+    def generate_stream(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                            temperature: float = None):
+        # falls back only while nothing has been streamed yet; a provider cannot be swapped mid-answer
+        for name, client in self.providers:
+            breaker = self.breakers[name]
+            if not breaker.allow():
+                self.logger.warning(f"Circuit open for {name}; skipping generate_stream")
+                continue
+
+            started = False
+            try:
+                for chunk in client.generate_stream(prompt, chat_history=list(chat_history),
+                                                    max_output_tokens=max_output_tokens, temperature=temperature):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                self.logger.error(f"{name}.generate_stream failed: {e}")
+                breaker.record_failure()
+                if started:
+                    return
+                continue
+
+            if started:
+                breaker.record_success()
+                return
+            breaker.record_failure()
+
+    def embed_text(self, text: str, document_type: str = None):
+        return self._call("embed_text", text, fallback=False, document_type=document_type)
+
+    def embed_many(self, texts: list, document_type: str = None, batch_size: int = None):
+        return self._call("embed_many", texts, fallback=False, document_type=document_type, batch_size=batch_size)
+
+    async def aembed_text(self, text: str, document_type: str = None):
+        return await self._acall("aembed_text", text, fallback=False, document_type=document_type)
+
+    async def aembed_many(self, texts: list, document_type: str = None, batch_size: int = None):
+        return await self._acall("aembed_many", texts, fallback=False, document_type=document_type, batch_size=batch_size)
+
+    def construct_prompt(self, prompt: str, role: str):
+        return self.client.construct_prompt(prompt=prompt, role=role)
+
+    def health(self) -> dict:
+        return {name: breaker.stats() for name, breaker in self.breakers.items()}
@@ -0,0 +1,127 @@
+from collections import OrderedDict
+import numpy as np
+import threading
+import logging
+import time
+
+class SemanticAnswerCache:
+    """In-process cache of generated answers, looked up by question meaning rather than exact text.
+    Keys are (patient_id, record version, language): entries live in one bucket per (patient_id, language), and a
+    bucket is emptied as soon as it is accessed with a different version, so edited records never serve
+    stale answers. Within a bucket the cached question vector with the highest cosine similarity wins if it
+    reaches `similarity_threshold`. Entries expire after `ttl_seconds`; least recently used buckets are evicted
+    once `max_entries` answers are held.
+    """
+
+    def __init__(self, similarity_threshold: float = 0.92, ttl_seconds: float = 21600, max_entries: int = 10000,
+                 max_entries_per_bucket: int = 64):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_entries_per_bucket = max_entries_per_bucket
+
+        # (patient_id, lang) -> {"version", "vectors": float32 (n, dim) unit rows, "values": [...], "created": [...]}
+        self.buckets = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(v)
+        return v / norm if norm > 0 else v
+
+    def _bucket(self, key: tuple, create: bool = False):
+        patient_id, version, lang = key
+        bucket_key = (patient_id, lang)
+        bucket = self.buckets.get(bucket_key)
+
+        if bucket is not None and bucket["version"] != version:
+            # the patient record changed: everything cached for it is stale
+            self.size -= len(bucket["values"])
+            del self.buckets[bucket_key]
+            bucket = None
+
+        if bucket is None and create:
+            bucket = {"version": version, "vectors": None, "values": [], "created": []}
+            self.buckets[bucket_key] = bucket
+
+        if bucket is not None:
+            self.buckets.move_to_end(bucket_key)
+        return bucket
+
+    def _drop(self, bucket: dict, keep: list):
+        removed = len(bucket["values"]) - len(keep)
+        if not removed:
+            return
+        bucket["vectors"] = bucket["vectors"][keep] if keep else None
+        bucket["values"] = [bucket["values"][i] for i in keep]
+        bucket["created"] = [bucket["created"][i] for i in keep]
+        self.size -= removed
+
+    def _expire(self, bucket: dict):
+        now = time.monotonic()
+        keep = [i for i, created in enumerate(bucket["created"]) if now - created < self.ttl_seconds]
+        self._drop(bucket, keep)
+
+    def get(self, key: tuple, vector):
+        """Return the cached value for the most similar earlier question, or None."""
+        query = self._unit(vector)
+        with self.lock:
+            bucket = self._bucket(key)
+            if bucket is not None:
+                self._expire(bucket)
+            if bucket is None or not bucket["values"] or bucket["vectors"].shape[1] != query.shape[0]:
+                self.misses += 1
+                return None
+
+            scores = bucket["vectors"] @ query
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return bucket["values"][best]
+
+    def put(self, key: tuple, vector, value):
+        row = self._unit(vector)[None, :]
+        with self.lock:
+            bucket = self._bucket(key, create=True)
+            self._expire(bucket)
+
+            if bucket["vectors"] is not None and bucket["vectors"].shape[1] != row.shape[1]:
+                # embedding model changed; vectors of different sizes cannot be compared
+                self._drop(bucket, [])
+            if len(bucket["values"]) >= self.max_entries_per_bucket:
+                self._drop(bucket, list(range(len(bucket["values"]) - self.max_entries_per_bucket + 1, len(bucket["values"]))))
+
+            bucket["vectors"] = row if bucket["vectors"] is None else np.vstack([bucket["vectors"], row])
+            bucket["values"].append(value)
+            bucket["created"].append(time.monotonic())
+            self.size += 1
+
+            while self.size > self.max_entries and len(self.buckets) > 1:
+                _, evicted = self.buckets.popitem(last=False)
+                self.size -= len(evicted["values"])
+
+    def invalidate(self, patient_id: str):
+        """Drop every answer cached for the patient, e.g. when their record is reloaded."""
+        with self.lock:
+            for bucket_key in [k for k in self.buckets if k[0] == patient_id]:
+                self.size -= len(self.buckets.pop(bucket_key)["values"])
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": self.size,
+            "buckets": len(self.buckets),
+        }
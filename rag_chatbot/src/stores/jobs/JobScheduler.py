@@ -0,0 +1,134 @@
+from concurrent.futures import ThreadPoolExecutor
+from .JobStore import JobStore
+import threading
+import logging
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobInterrupted(Exception):
+    """Raised inside a job when the scheduler shuts down; the job stays resumable."""
+    pass
+
+
+class JobConflict(Exception):
+    """Raised by submit() when an unfinished job already covers the same work; carries that job."""
+
+    def __init__(self, job: dict):
+        super().__init__(job["job_id"])
+        self.job = job
+
+
+class JobContext:
+    """Handed to job handlers: report progress and reach cancellation points."""
+
+    def __init__(self, scheduler, job: dict):
+        self.scheduler = scheduler
+        self.job_id = job["job_id"]
+        self.params = job["params"]
+        # progress of an earlier, interrupted attempt; handlers use it to resume
+        self.progress = dict(job["progress"])
+
+    def check(self):
+        if self.scheduler.stopping.is_set():
+            raise JobInterrupted(self.job_id)
+        if self.scheduler.store.is_cancel_requested(self.job_id):
+            raise JobCancelled(self.job_id)
+
+    def report(self, progress: dict):
+        self.progress.update(progress)
+        self.scheduler.store.update_progress(self.job_id, self.progress)
+        self.check()
+
+
+class JobScheduler:
+    """Runs jobs from a JobStore on a thread pool, off the request path.
+    Handlers are registered per job kind as `handler(context)`. They run in this process, because they use the
+    shared embedding client and vector DB; calling `context.report(...)` between units of work records
+    progress and is where cancellation and shutdown take effect. `start()` re-queues whatever was queued
+    or running when the process last stopped.
+    """
+
+    def __init__(self, store: JobStore, max_workers: int = 2):
+        self.store = store
+        self.max_workers = max_workers
+
+        self.handlers = {}
+        self.executor = None
+        self.stopping = threading.Event()
+        self.submit_lock = threading.Lock()
+
+        self.logger = logging.getLogger(__name__)
+
+    def register(self, kind: str, handler):
+        self.handlers[kind] = handler
+
+    def start(self) -> int:
+        self.stopping.clear()
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job-worker")
+
+        resumed = 0
+        for job in self.store.list_unfinished():
+            self.executor.submit(self._run, job["job_id"])
+            resumed += 1
+        if resumed:
+            self.logger.info(f"Resuming {resumed} unfinished jobs")
+        return resumed
+
+    def submit(self, kind: str, params: dict, unique_by: tuple = ()) -> dict:
+        """Queue a job. With `unique_by`, raises JobConflict when a queued or running job of the same kind has the
+        same values for those params, e.g. unique_by=("collection_name",) keeps one rebuild per collection.
+        Jobs with a pending cancellation do not count."""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        with self.submit_lock:
+            if unique_by:
+                for job in self.store.list_unfinished():
+                    if job["kind"] == kind and not job["cancel_requested"] and all(job["params"].get(key) == params.get(key) for key in unique_by):
+                        raise JobConflict(job)
+            job = self.store.create(kind, params)
+        self.executor.submit(self._run, job["job_id"])
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        # queued jobs are dropped when a worker picks them up, running ones at their next report()
+        return self.store.request_cancel(job_id)
+
+    def _run(self, job_id: str):
+        job = self.store.get(job_id)
+        if job is None or job["status"] in JobStore.FINISHED or self.stopping.is_set():
+            return
+        if job["cancel_requested"]:
+            self.store.set_status(job_id, JobStore.CANCELLED)
+            return
+
+        handler = self.handlers.get(job["kind"])
+        if handler is None:
+            self.store.set_status(job_id, JobStore.FAILED, error=f"Unknown job kind: {job['kind']}")
+            return
+
+        self.store.set_status(job_id, JobStore.RUNNING)
+        context = JobContext(self, job)
+        try:
+            result = handler(context)
+            if result:
+                context.progress.update(result)
+                self.store.update_progress(job_id, context.progress)
+            self.store.set_status(job_id, JobStore.COMPLETED)
+        except JobCancelled:
+            self.logger.info(f"Job {job_id} cancelled")
+            self.store.set_status(job_id, JobStore.CANCELLED)
+        except JobInterrupted:
+            # left resumable: the next start() picks it up again from its recorded progress
+            self.logger.info(f"Job {job_id} interrupted by shutdown")
+            self.store.set_status(job_id, JobStore.QUEUED)
+        except Exception as e:
+            self.logger.error(f"Job {job_id} ({job['kind']}) failed: {e}")
+            self.store.set_status(job_id, JobStore.FAILED, error=str(e))
+
+    def shutdown(self, wait: bool = True):
+        self.stopping.set()
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait, cancel_futures=True)
+            self.executor = None
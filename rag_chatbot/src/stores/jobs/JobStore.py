@@ -0,0 +1,117 @@
+import threading
+import sqlite3
+import logging
+import json
+import time
+import uuid
+import os
+
+class JobStore:
+    """SQLite table of background jobs: kind, JSON params, status, JSON progress and a cancel flag.
+    Survives restarts, so queued and interrupted jobs can be picked up again by the scheduler.
+    Statuses: queued -> running -> completed | failed | cancelled.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    FINISHED = (COMPLETED, FAILED, CANCELLED)
+
+    def __init__(self, db_path: str):
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL, status TEXT NOT NULL, "
+            "progress TEXT NOT NULL, error TEXT, cancel_requested INTEGER NOT NULL DEFAULT 0, "
+            "attempts INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+        self.conn.commit()
+
+    def _row(self, row) -> dict:
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["progress"] = json.loads(job["progress"])
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def create(self, kind: str, params: dict) -> dict:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO jobs (job_id, kind, params, status, progress, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(params), self.QUEUED, "{}", now, now)
+            )
+            self.conn.commit()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> dict:
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row(row)
+
+    def list(self, status: str = None, limit: int = 50) -> list:
+        with self.lock:
+            if status:
+                rows = self.conn.execute("SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?",
+                                         (status, limit)).fetchall()
+            else:
+                rows = self.conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self._row(row) for row in rows]
+
+    def list_unfinished(self) -> list:
+        """Queued jobs and jobs that were running when the process stopped, oldest first."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (self.QUEUED, self.RUNNING)
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+    def set_status(self, job_id: str, status: str, error: str = None):
+        with self.lock:
+            if status == self.RUNNING:
+                self.conn.execute("UPDATE jobs SET status = ?, error = NULL, attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                                  (status, time.time(), job_id))
+            else:
+                self.conn.execute("UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE job_id = ?",
+                                  (status, error, time.time(), job_id))
+            self.conn.commit()
+
+    def update_progress(self, job_id: str, progress: dict):
+        with self.lock:
+            self.conn.execute("UPDATE jobs SET progress = ?, updated_at = ? WHERE job_id = ?",
+                              (json.dumps(progress), time.time(), job_id))
+            self.conn.commit()
+
+    def request_cancel(self, job_id: str) -> bool:
+        """Flag an unfinished job for cancellation; False when it does not exist or already finished."""
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE job_id = ? AND status IN (?, ?)",
+                (time.time(), job_id, self.QUEUED, self.RUNNING)
+            )
+            self.conn.commit()
+        return cursor.rowcount > 0
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        with self.lock:
+            row = self.conn.execute("SELECT cancel_requested FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
@@ -0,0 +1,159 @@
+from collections import Counter
+import unicodedata
+import threading
+import heapq
+import math
+import re
+
+# tashkeel, Quranic marks and superscript alef
+ARABIC_DIACRITICS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed]")
+
+ARABIC_LETTER_MAP = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ى": "ي", "ئ": "ي", "ؤ": "و", "ة": "ه",
+    "\u0640": None,  # tatweel
+    **{chr(0x0660 + d): str(d) for d in range(10)},  # Arabic-Indic digits
+    **{chr(0x06f0 + d): str(d) for d in range(10)},  # Persian digits
+})
+
+# definite article with attached conjunction / preposition, longest first
+ARABIC_PREFIXES = ("وال", "بال", "كال", "فال", "لل", "ال")
+
+# latin tokens keep inner hyphens/slashes and a trailing "+" or "-" (AC-T, ER+, HER2-, T1/N0); arabic runs are one token each
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-/][a-z0-9]+)*[+-]?|[\u0621-\u064a]+")
+
+# stored with snapshots; an index built by an older tokenizer is dropped on restore and rebuilt
+TOKENIZER_VERSION = 2
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is", "it", "of", "on",
+    "or", "that", "the", "to", "was", "were", "with", "what", "which", "who", "does", "do", "my", "me", "i",
+    "في", "من", "علي", "الي", "عن", "مع", "هل", "ما", "ماذا", "هو", "هي", "ده", "دي", "اللي", "او", "و", "ان",
+}
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, NFKC-fold and normalise Arabic spelling variants (hamza/alef forms, ta marbuta, ya, diacritics)."""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    text = ARABIC_DIACRITICS.sub("", text)
+    return text.translate(ARABIC_LETTER_MAP)
+
+
+def _strip_arabic_prefix(token: str) -> str:
+    for prefix in ARABIC_PREFIXES:
+        if token.startswith(prefix) and len(token) - len(prefix) >= 2:
+            return token[len(prefix):]
+    return token
+
+
+def tokenize(text: str) -> list:
+    """Index/query terms: compound latin tokens are kept whole and also split into their parts,
+    so "AC-T" matches both "ac-t" and "ac"; a trailing sign is never split off ("ER-" does not match "er" or
+    "er+"), the last part keeps it ("T1/N0+" -> t1, n0+). Arabic tokens lose the definite article."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(normalize_text(text)):
+        if token in STOPWORDS:
+            continue
+        if "\u0621" <= token[0] <= "\u064a":
+            tokens.append(_strip_arabic_prefix(token))
+            continue
+        tokens.append(token)
+        body, sign = (token[:-1], token[-1]) if token[-1] in "+-" else (token, "")
+        if "-" in body or "/" in body:
+            parts = re.split(r"[-/]", body)
+            parts[-1] += sign
+            tokens.extend(part for part in parts if part not in STOPWORDS)
+    return tokens
+
+
+class BM25Index:
+    """In-memory inverted index with Okapi BM25 scoring.
+    Documents are upserted by id with the payload returned on a hit (same {"text", "metadata"} shape as vector hits).
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+        self.docs = {}       # doc_id -> {"tf": {term: count}, "length": int, "payload": dict}
+        self.postings = {}   # term -> {doc_id: count}
+        self.total_length = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _remove(self, doc_id: str):
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return
+        self.total_length -= doc["length"]
+        for term in doc["tf"]:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
+
+    def _add(self, doc_id: str, tf: dict, length: int, payload: dict):
+        self.docs[doc_id] = {"tf": tf, "length": length, "payload": payload}
+        self.total_length += length
+        for term, count in tf.items():
+            self.postings.setdefault(term, {})[doc_id] = count
+
+    def add(self, doc_id: str, text: str, payload: dict = None):
+        tokens = tokenize(text)
+        with self.lock:
+            self._remove(doc_id)
+            self._add(doc_id, dict(Counter(tokens)), len(tokens), payload or {"text": text, "metadata": {}})
+
+    def add_many(self, doc_ids: list, texts: list, payloads: list = None):
+        payloads = payloads or [None] * len(texts)
+        for doc_id, text, payload in zip(doc_ids, texts, payloads):
+            self.add(doc_id, text, payload)
+
+    def remove(self, doc_ids: list):
+        with self.lock:
+            for doc_id in doc_ids:
+                self._remove(doc_id)
+
+    def clear(self):
+        with self.lock:
+            self.docs = {}
+            self.postings = {}
+            self.total_length = 0
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """Best `limit` documents for the query as [{"id", "score", "payload"}], best first."""
+        terms = set(tokenize(query))
+        with self.lock:
+            n_docs = len(self.docs)
+            if not n_docs or not terms or limit <= 0:
+                return []
+            avg_length = self.total_length / n_docs or 1.0
+
+            scores = {}
+            for term in terms:
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, tf in posting.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.docs[doc_id]["length"] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [{"id": doc_id, "score": score, "payload": self.docs[doc_id]["payload"]} for doc_id, score in best]
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            return {"tokenizer": TOKENIZER_VERSION, "k1": self.k1, "b": self.b,
+                    "docs": {doc_id: {"tf": d["tf"], "length": d["length"], "payload": d["payload"]}
+                             for doc_id, d in self.docs.items()}}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        index = cls(k1=data.get("k1", 1.5), b=data.get("b", 0.75))
+        for doc_id, doc in data.get("docs", {}).items():
+            index._add(doc_id, doc["tf"], doc["length"], doc["payload"])
+        return index
@@ -0,0 +1,101 @@
+from .BM25Index import BM25Index, TOKENIZER_VERSION
+import threading
+import logging
+import json
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class LexicalIndexStore:
+    """One BM25Index per vector collection, kept alongside the vector store by the indexing paths.
+    Persists each changed collection to `<db_path>/<collection>.json` on snapshot() and restores them on start;
+    db_path=None keeps everything in memory only."""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path
+        self.indexes = {}
+        self.dirty = set()
+        self.lock = threading.Lock()
+
+        if db_path:
+            self.restore()
+
+    def get(self, collection_name: str, create: bool = True) -> BM25Index:
+        with self.lock:
+            index = self.indexes.get(collection_name)
+            if index is None and create:
+                index = BM25Index()
+                self.indexes[collection_name] = index
+            return index
+
+    def add_many(self, collection_name: str, doc_ids: list, texts: list, payloads: list = None):
+        self.get(collection_name).add_many(doc_ids, texts, payloads)
+        self.dirty.add(collection_name)
+
+    def remove(self, collection_name: str, doc_ids: list):
+        index = self.get(collection_name, create=False)
+        if index is not None:
+            index.remove(doc_ids)
+            self.dirty.add(collection_name)
+
+    def reset(self, collection_name: str):
+        self.get(collection_name).clear()
+        self.dirty.add(collection_name)
+
+    def search(self, collection_name: str, query: str, limit: int = 10) -> list:
+        index = self.get(collection_name, create=False)
+        return index.search(query, limit=limit) if index is not None else []
+
+    def snapshot(self) -> bool:
+        if not self.db_path:
+            return False
+        os.makedirs(self.db_path, exist_ok=True)
+
+        for collection_name in list(self.dirty):
+            self.dirty.discard(collection_name)
+            target = os.path.join(self.db_path, f"{collection_name}.json")
+            try:
+                with open(target + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump(self.indexes[collection_name].to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+                os.replace(target + ".tmp", target)
+            except Exception as e:
+                self.dirty.add(collection_name)
+                logger.error(f"Could not write lexical index {collection_name}: {e}")
+                return False
+        return True
+
+    def restore(self) -> bool:
+        if not self.db_path or not os.path.isdir(self.db_path):
+            return False
+
+        for name in os.listdir(self.db_path):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.db_path, name), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("tokenizer") != TOKENIZER_VERSION:
+                    # its terms would not match today's query tokens; the next index run rebuilds it
+                    logger.warning(f"Skipping lexical index {name}: built with an older tokenizer")
+                    continue
+                self.indexes[name[:-len(".json")]] = BM25Index.from_dict(data)
+            except Exception as e:
+                logger.error(f"Could not restore lexical index {name}: {e}")
+
+        logger.info(f"Restored {len(self.indexes)} lexical indexes from {self.db_path}")
+        return bool(self.indexes)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_lexical_index_store(path: str = None) -> LexicalIndexStore:
+    """Return the process-wide lexical index store, creating (and restoring) it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = LexicalIndexStore(db_path=path)
+    return _store
@@ -0,0 +1,53 @@
+from langchain_core.documents import Document
+import logging
+import gzip
+import json
+import uuid
+import os
+
+class ChunkCache:
+    """On-disk cache of chunker output, keyed by file content hash and the chunking parameters.
+    Each entry is a gzip-compressed JSON-lines file with one chunk per line, so hits are streamed back line by line
+    without re-parsing the document. `CHUNKER_VERSION` is part of the key; bump it when chunking changes.
+    """
+
+    CHUNKER_VERSION = 1
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.logger = logging.getLogger(__name__)
+
+    def get_entry_path(self, file_hash: str, chunk_size: int, overlap_size: int) -> str:
+        return os.path.join(self.cache_dir, file_hash[:2],
+                            f"{file_hash}_{chunk_size}_{overlap_size}_v{self.CHUNKER_VERSION}.jsonl.gz")
+
+    def has(self, file_hash: str, chunk_size: int, overlap_size: int) -> bool:
+        return os.path.exists(self.get_entry_path(file_hash, chunk_size, overlap_size))
+
+    def iter_chunks(self, file_hash: str, chunk_size: int, overlap_size: int):
+        """Yield the cached chunks as Documents, in their original order."""
+        with gzip.open(self.get_entry_path(file_hash, chunk_size, overlap_size), "rt", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                yield Document(page_content=record["text"], metadata=record["metadata"])
+
+    def write_through(self, file_hash: str, chunk_size: int, overlap_size: int, chunks):
+        """Pass chunks through unchanged while recording them. The entry only becomes visible once the whole
+        iterable was consumed; a consumer that stops early (error, cancelled job) leaves no partial entry."""
+        path = self.get_entry_path(file_hash, chunk_size, overlap_size)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+
+        completed = False
+        try:
+            with gzip.open(temp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+                for chunk in chunks:
+                    f.write(json.dumps({"text": chunk.page_content, "metadata": chunk.metadata}, ensure_ascii=False, default=str))
+                    f.write("\n")
+                    yield chunk
+            completed = True
+        finally:
+            if completed:
+                os.replace(temp_path, path)
+            elif os.path.exists(temp_path):
+                os.remove(temp_path)
@@ -0,0 +1,111 @@
+from concurrent.futures import ProcessPoolExecutor
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+from collections import deque
+import multiprocessing
+import threading
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def parse_page_range(file_path: str, start: int, end: int, text_kwargs: dict = None) -> list:
+    """Worker: extract pages [start, end) of a PDF as (text, metadata) pairs, with the same metadata
+    PyMuPDFLoader produces. Runs in a pool process, so it returns plain picklable data."""
+    import fitz
+
+    with fitz.open(file_path) as doc:
+        doc_metadata = {k: v for k, v in (doc.metadata or {}).items() if type(v) in [str, int]}
+        total_pages = len(doc)
+        return [
+            (
+                doc[number].get_text(**(text_kwargs or {})),
+                {"source": file_path, "file_path": file_path, "page": number, "total_pages": total_pages, **doc_metadata},
+            )
+            for number in range(start, min(end, total_pages))
+        ]
+
+
+class ParallelPDFLoader(BaseLoader):
+    """Drop-in for PyMuPDFLoader that parses page ranges on a shared process pool.
+    `lazy_load()` yields page documents in page order while later ranges are still being parsed; at most
+    `2 * max_workers` ranges are in flight, so memory stays bounded for long documents.
+    Small PDFs (a single range) and `max_workers <= 1` are parsed inline without touching the pool.
+    """
+
+    def __init__(self, file_path: str, max_workers: int = None, pages_per_task: int = 8, **text_kwargs):
+        self.file_path = str(file_path)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.pages_per_task = max(1, pages_per_task)
+        self.text_kwargs = text_kwargs
+
+    def page_count(self) -> int:
+        import fitz
+
+        with fitz.open(self.file_path) as doc:
+            return len(doc)
+
+    def _documents(self, pages: list):
+        for text, metadata in pages:
+            yield Document(page_content=text, metadata=metadata)
+
+    def lazy_load(self):
+        total_pages = self.page_count()
+        ranges = [(start, min(start + self.pages_per_task, total_pages))
+                  for start in range(0, total_pages, self.pages_per_task)]
+
+        if len(ranges) <= 1 or self.max_workers <= 1:
+            for start, end in ranges:
+                yield from self._documents(parse_page_range(self.file_path, start, end, self.text_kwargs))
+            return
+
+        pool = get_pdf_process_pool(self.max_workers)
+        remaining = iter(ranges)
+        pending = deque()
+
+        def submit_next():
+            page_range = next(remaining, None)
+            if page_range is not None:
+                pending.append(pool.submit(parse_page_range, self.file_path, *page_range, self.text_kwargs))
+
+        try:
+            for _ in range(2 * self.max_workers):
+                submit_next()
+            while pending:
+                pages = pending.popleft().result()
+                submit_next()
+                yield from self._documents(pages)
+        finally:
+            # the consumer stopped early (error, cancelled job): drop ranges nobody will read
+            for future in pending:
+                future.cancel()
+
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def get_pdf_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Process-wide PDF parsing pool, created on first use. Uses the spawn start method: forking a
+    process that already runs server and job threads can deadlock the children."""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers < max_workers:
+        with _pool_lock:
+            if _pool is None or _pool_workers < max_workers:
+                if _pool is not None:
+                    _pool.shutdown(wait=False)
+                _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+                _pool_workers = max_workers
+                logger.info(f"Started PDF parsing pool with {max_workers} processes")
+    return _pool
+
+
+def shutdown_pdf_process_pool():
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+            _pool_workers = 0
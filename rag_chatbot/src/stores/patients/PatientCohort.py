@@ -0,0 +1,157 @@
+from stores.lexical.BM25Index import tokenize
+import numpy as np
+import re
+
+STAGE_PATTERN = re.compile(r"^(IV|III|II|I|0)([A-C])?")
+STAGE_GROUPS = {"0": 0, "I": 1, "II": 2, "III": 3, "IV": 4}
+
+# biomarker flag values
+NEGATIVE, POSITIVE, UNKNOWN = 0, 1, -1
+
+
+def parse_biomarker(item: str) -> tuple:
+    """"ER+", "HER2-" or "ER:Positive" -> (marker, flag)."""
+    if item.endswith(" ") and item.strip():
+        # an unescaped "+" in a query string arrives as a space ("?biomarker=ER+")
+        item = item.strip() + "+"
+    item = item.strip()
+    marker, sep, status = item.partition(":")
+    if not sep:
+        if item[-1:] not in ("+", "-") or len(item) < 2:
+            raise ValueError(f"Invalid biomarker filter: {item}")
+        marker, status = item[:-1], item[-1]
+    flag = biomarker_flag(status)
+    if flag == UNKNOWN:
+        raise ValueError(f"Invalid biomarker status: {item}")
+    return marker.strip().upper(), flag
+
+
+def biomarker_flag(status) -> int:
+    status = str(status).strip().lower()
+    if status.startswith("pos") or status == "+":
+        return POSITIVE
+    if status.startswith("neg") or status == "-":
+        return NEGATIVE
+    return UNKNOWN
+
+
+class PatientCohort:
+    """Columnar copy of the patient records for structured cohort filters.
+    Numeric fields are NumPy columns (age, grade, stage group/code, one int8 flag column per biomarker);
+    treatments, comorbidities and tumor type are term bitsets (one packed bit per patient per term, terms from the
+    BM25 tokenizer). A query ANDs boolean masks over whole columns, so its cost does not depend on Python loops
+    over the records."""
+
+    TERM_FIELDS = ("treatment", "comorbidity", "tumor_type")
+
+    def __init__(self, patients: list):
+        self.patients = patients
+        self.size = len(patients)
+
+        self.age = np.array([self._number(p.get("age"), np.nan) for p in patients], dtype=np.float32)
+        self.grade = np.array([self._number(p.get("grade"), -1) for p in patients], dtype=np.int8)
+
+        # stage "IIA" -> group 2, code of "IIA"; unparseable stages are group -1
+        self.stages = {}
+        stage_groups, stage_codes = [], []
+        for p in patients:
+            stage = str(p.get("stage") or "").strip().upper()
+            match = STAGE_PATTERN.match(stage)
+            stage_groups.append(STAGE_GROUPS[match.group(1)] if match else -1)
+            stage_codes.append(self.stages.setdefault(stage, len(self.stages)))
+        self.stage_group = np.array(stage_groups, dtype=np.int8)
+        self.stage_code = np.array(stage_codes, dtype=np.int32)
+
+        rows_by_marker = {}
+        for row, p in enumerate(patients):
+            for marker, status in (p.get("biomarkers") or {}).items():
+                rows_by_marker.setdefault(str(marker).strip().upper(), []).append((row, biomarker_flag(status)))
+        self.biomarkers = {}
+        for marker, entries in rows_by_marker.items():
+            column = np.full(self.size, UNKNOWN, dtype=np.int8)
+            rows, flags = zip(*entries)
+            column[list(rows)] = flags
+            self.biomarkers[marker] = column
+
+        texts = {
+            "treatment": lambda p: [f"{t.get('type') or ''} {t.get('details') or ''}" for t in (p.get("treatments") or [])],
+            "comorbidity": lambda p: list(p.get("comorbidities") or []),
+            "tumor_type": lambda p: [p.get("tumor_type") or ""],
+        }
+        self.terms = {field: self._build_bitsets(texts[field]) for field in self.TERM_FIELDS}
+
+    @staticmethod
+    def _number(value, missing):
+        try:
+            return float(value) if value is not None else missing
+        except (TypeError, ValueError):
+            return missing
+
+    def _build_bitsets(self, texts_of) -> dict:
+        rows_by_term = {}
+        tokens_of = {}  # treatment and comorbidity texts repeat a lot across patients
+        for row, p in enumerate(self.patients):
+            terms = set()
+            for text in texts_of(p):
+                if text not in tokens_of:
+                    tokens_of[text] = tokenize(text)
+                terms.update(tokens_of[text])
+            for term in terms:
+                rows_by_term.setdefault(term, []).append(row)
+
+        bitsets = {}
+        for term, rows in rows_by_term.items():
+            mask = np.zeros(self.size, dtype=bool)
+            mask[rows] = True
+            bitsets[term] = np.packbits(mask)
+        return bitsets
+
+    def _term_mask(self, field: str, phrase: str) -> np.ndarray:
+        """Patients having every token of the phrase in the field ("AC-T" needs ac-t, ac and t)."""
+        tokens = set(tokenize(phrase))
+        if not tokens:
+            raise ValueError(f"Invalid {field} filter: {phrase}")
+        mask = np.ones(self.size, dtype=bool)
+        for token in tokens:
+            bits = self.terms[field].get(token)
+            if bits is None:
+                return np.zeros(self.size, dtype=bool)
+            mask &= np.unpackbits(bits, count=self.size).view(bool)
+        return mask
+
+    def _stage_mask(self, stage: str) -> np.ndarray:
+        # a bare group ("II") matches its sub-stages (IIA, IIB); "IIA" matches exactly
+        stage = stage.strip().upper()
+        if stage in STAGE_GROUPS:
+            return self.stage_group == STAGE_GROUPS[stage]
+        code = self.stages.get(stage)
+        if code is None:
+            return np.zeros(self.size, dtype=bool)
+        return self.stage_code == code
+
+    def select(self, age_min: float = None, age_max: float = None, stages: list = None, grades: list = None,
+               biomarkers: list = None, treatments: list = None, comorbidities: list = None,
+               tumor_types: list = None) -> np.ndarray:
+        """Row numbers of the patients matching every filter. Ages are inclusive bounds; stages and grades match
+        any of the given values; biomarkers ([(marker, flag)]), treatments, comorbidities and tumor types must
+        all match."""
+        mask = np.ones(self.size, dtype=bool)
+
+        if age_min is not None:
+            mask &= self.age >= age_min
+        if age_max is not None:
+            mask &= self.age <= age_max
+        if stages:
+            mask &= np.logical_or.reduce([self._stage_mask(s) for s in stages])
+        if grades:
+            mask &= np.isin(self.grade, np.array(grades, dtype=np.int8))
+        for marker, flag in biomarkers or []:
+            column = self.biomarkers.get(marker)
+            if column is None:
+                return np.empty(0, dtype=np.int64)
+            mask &= column == flag
+        for field, phrases in (("treatment", treatments), ("comorbidity", comorbidities), ("tumor_type", tumor_types)):
+            for phrase in phrases or []:
+                mask &= self._term_mask(field, phrase)
+
+        return np.flatnonzero(mask)
@@ -0,0 +1,179 @@
+from .PatientCohort import PatientCohort
+from pathlib import Path
+import threading
+import logging
+import json
+import os
+
+logger = logging.getLogger(__name__)
+
+# default patients file at repo root data/patients.json
+DEFAULT_PATIENTS_PATH = os.path.join(Path(__file__).resolve().parents[4], "data", "patients.json")
+
+
+class PatientIndex:
+    """Immutable view of one load of the patients file: the records plus lookup indexes.
+    A reload builds a new PatientIndex and swaps the reference, so readers never see a half-built index."""
+
+    def __init__(self, patients: list, mtime_ns: int = None):
+        self.patients = patients
+        self.mtime_ns = mtime_ns
+
+        self.by_id = {}
+        self.by_stage = {}
+        self.by_biomarker = {}     # (marker, status) -> [patients], e.g. ("HER2", "positive")
+        self.by_tumor_type = {}
+
+        for p in patients:
+            if p.get("patient_id") is not None:
+                self.by_id[p["patient_id"]] = p
+            if p.get("stage") is not None:
+                self.by_stage.setdefault(self.normalize_stage(p["stage"]), []).append(p)
+            for marker, status in (p.get("biomarkers") or {}).items():
+                self.by_biomarker.setdefault(self.normalize_biomarker(marker, status), []).append(p)
+            if p.get("tumor_type"):
+                self.by_tumor_type.setdefault(p["tumor_type"].strip().lower(), []).append(p)
+
+        # columnar view for vectorized cohort filters (age ranges, stage groups, treatments, ...)
+        self.cohort = PatientCohort(patients)
+
+    @staticmethod
+    def normalize_stage(stage) -> str:
+        return str(stage).strip().upper()
+
+    @staticmethod
+    def normalize_biomarker(marker: str, status) -> tuple:
+        return (str(marker).strip().upper(), str(status).strip().lower())
+
+
+class PatientRepository:
+    """Process-wide, in-memory copy of the patients file with O(1) lookups.
+    A background thread polls the file's mtime and reloads it on change; request handlers never touch the disk."""
+
+    def __init__(self, path: str = None):
+        self.path = path or DEFAULT_PATIENTS_PATH
+        self._index = PatientIndex([])
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        self._failed_mtime_ns = None
+        self._reload_listeners = []
+
+    @property
+    def index(self) -> PatientIndex:
+        return self._index
+
+    def load(self) -> bool:
+        """(Re)read the patients file and atomically replace the current index."""
+        with self._reload_lock:
+            mtime_ns = None
+            try:
+                mtime_ns = os.stat(self.path).st_mtime_ns
+                with open(self.path, "r", encoding="utf-8") as f:
+                    patients = json.load(f)
+            except FileNotFoundError:
+                logger.error(f"Patients file not found: {self.path}")
+                return False
+            except Exception as e:
+                # keep serving the previous version if the file is mid-write or invalid
+                logger.error(f"Could not load patients file {self.path}: {e}")
+                self._failed_mtime_ns = mtime_ns
+                return False
+
+            previous = self._index
+            self._index = PatientIndex(patients, mtime_ns=mtime_ns)
+            logger.info(f"Loaded {len(patients)} patients from {self.path}")
+
+            changed = self._changed_ids(previous, self._index)
+            if changed:
+                for listener in self._reload_listeners:
+                    try:
+                        listener(changed)
+                    except Exception as e:
+                        logger.error(f"Patient reload listener failed: {e}")
+            return True
+
+    @staticmethod
+    def _changed_ids(previous: PatientIndex, current: PatientIndex) -> set:
+        """Ids of patients whose record was edited or removed by a reload."""
+        return {pid for pid, p in previous.by_id.items() if current.by_id.get(pid) != p}
+
+    def add_reload_listener(self, listener):
+        """Call `listener(changed_ids)` after each reload that edits or removes patient records."""
+        self._reload_listeners.append(listener)
+
+    def reload_if_changed(self) -> bool:
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return False
+        if mtime_ns != self._index.mtime_ns and mtime_ns != self._failed_mtime_ns:
+            return self.load()
+        return False
+
+    def start_watching(self, interval_seconds: float = 2.0):
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+
+        def _watch():
+            while not self._stop.wait(interval_seconds):
+                self.reload_if_changed()
+
+        self._watcher = threading.Thread(target=_watch, name="patient-repository-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def all(self) -> list:
+        return self._index.patients
+
+    def get(self, patient_id: str):
+        return self._index.by_id.get(patient_id)
+
+    def find(self, stage: str = None, biomarkers: dict = None, tumor_type: str = None) -> list:
+        """Patients matching every given criterion, e.g. find(stage="IIA", biomarkers={"HER2": "Negative"})."""
+        index = self._index
+        candidates = []
+        if stage is not None:
+            candidates.append(index.by_stage.get(PatientIndex.normalize_stage(stage), []))
+        for marker, status in (biomarkers or {}).items():
+            candidates.append(index.by_biomarker.get(PatientIndex.normalize_biomarker(marker, status), []))
+        if tumor_type is not None:
+            candidates.append(index.by_tumor_type.get(tumor_type.strip().lower(), []))
+
+        if not candidates:
+            return list(index.patients)
+
+        # walk the smallest posting list and check membership in the others by identity
+        candidates.sort(key=len)
+        others = [{id(p) for p in c} for c in candidates[1:]]
+        return [p for p in candidates[0] if all(id(p) in o for o in others)]
+
+    def query(self, limit: int = None, **filters) -> tuple:
+        """Cohort filter over the columnar view, see PatientCohort.select for the filters.
+        Returns (number of matches, the first `limit` matching patients in file order)."""
+        index = self._index
+        rows = index.cohort.select(**filters)
+        selected = rows if limit is None else rows[:limit]
+        return len(rows), [index.patients[row] for row in selected]
+
+
+_repository = None
+_repository_lock = threading.Lock()
+
+
+def get_patient_repository(path: str = None) -> PatientRepository:
+    """Return the process-wide repository, creating and loading it on first use."""
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                repository = PatientRepository(path=path)
+                repository.load()
+                _repository = repository
+    return _repository
@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+import threading
+import logging
+import time
+
+class BudgetedReranker:
+    """Runs a reranker under a per-request time budget.
+    Scoring happens on a small dedicated pool; the caller waits at most `budget_ms` and gets None when the budget
+    runs out or the reranker fails, so it can keep the retrieval order. Step-wise rerankers also see the deadline
+    and stop early; a late LLM call finishes in the background and is ignored."""
+
+    def __init__(self, reranker, budget_ms: int = 300, max_workers: int = 2):
+        self.reranker = reranker
+        self.budget_seconds = max(0, budget_ms) / 1000.0
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rerank")
+
+        self.calls = 0
+        self.timed_out = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+
+        self.logger = logging.getLogger(__name__)
+
+    def _count(self, counter: str):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def rerank(self, query: str, texts: list, budget_seconds: float = None) -> list:
+        """Scores for texts in input order, or None when the budget ran out or scoring failed."""
+        if not texts:
+            return []
+        self._count("calls")
+
+        budget = self.budget_seconds if budget_seconds is None else budget_seconds
+        future = self.executor.submit(self.reranker.score, query, texts, time.monotonic() + budget)
+        try:
+            scores = future.result(timeout=budget)
+        except (FuturesTimeoutError, TimeoutError):
+            # still queued behind slower requests: drop it instead of scoring for nobody
+            future.cancel()
+            self._count("timed_out")
+            self.logger.warning(f"Rerank budget of {budget * 1000:.0f} ms exceeded for {len(texts)} candidates")
+            return None
+        except Exception as e:
+            self._count("failed")
+            self.logger.error(f"Reranking failed: {e}")
+            return None
+
+        if len(scores) != len(texts):
+            self._count("failed")
+            self.logger.error(f"Reranker returned {len(scores)} scores for {len(texts)} candidates")
+            return None
+        return scores
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "timed_out": self.timed_out, "failed": self.failed}
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
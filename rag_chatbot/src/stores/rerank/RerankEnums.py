@@ -0,0 +1,5 @@
+from enum import Enum
+
+class RerankerEnums(Enum):
+    CROSS_ENCODER = "CROSS_ENCODER"
+    LLM = "LLM"
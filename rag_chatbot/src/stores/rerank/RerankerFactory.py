@@ -0,0 +1,34 @@
+from .providers import CrossEncoderReranker, LLMReranker
+from .RerankEnums import RerankerEnums
+from .BudgetedReranker import BudgetedReranker
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RerankerFactory:
+    def __init__(self, config):
+        self.config = config
+
+    def create(self, backend: str, generation_client=None):
+        """Build the configured reranker wrapped in its time budget, or None when it cannot be built."""
+        reranker = None
+
+        if backend == RerankerEnums.CROSS_ENCODER.value:
+            if CrossEncoderReranker is None:
+                logger.error("CROSS_ENCODER reranking needs the sentence-transformers package")
+                return None
+            reranker = CrossEncoderReranker(
+                model_id=self.config.RERANK_MODEL_ID,
+                batch_size=self.config.RERANK_BATCH_SIZE,
+            )
+
+        if backend == RerankerEnums.LLM.value:
+            if generation_client is None:
+                logger.error("LLM reranking needs a generation client")
+                return None
+            reranker = LLMReranker(generation_client=generation_client)
+
+        if reranker is None:
+            return None
+
+        return BudgetedReranker(reranker, budget_ms=self.config.RERANK_BUDGET_MS)
@@ -0,0 +1,10 @@
+from abc import ABC, abstractmethod
+
+class RerankerInterface(ABC):
+
+    @abstractmethod
+    def score(self, query: str, texts: list, deadline: float = None) -> list:
+        """Relevance score per text (higher is better), in input order.
+        `deadline` is a time.monotonic() value; implementations that work in steps stop once it has passed
+        and raise TimeoutError."""
+        pass
@@ -0,0 +1,26 @@
+from ..RerankerInterface import RerankerInterface
+from sentence_transformers import CrossEncoder
+import logging
+import time
+
+class CrossEncoderReranker(RerankerInterface):
+    """Scores (query, text) pairs with a local cross-encoder on CPU.
+    Pairs are scored in small batches and the deadline is checked between them, so an over-budget request
+    stops after the current batch instead of finishing the whole candidate list."""
+
+    def __init__(self, model_id: str, batch_size: int = 16, max_length: int = 512):
+        self.model_id = model_id
+        self.batch_size = max(1, batch_size)
+        self.model = CrossEncoder(model_id, max_length=max_length, device="cpu")
+
+        self.logger = logging.getLogger(__name__)
+        self.logger.info(f"Loaded cross-encoder reranker {model_id}")
+
+    def score(self, query: str, texts: list, deadline: float = None) -> list:
+        scores = []
+        for start in range(0, len(texts), self.batch_size):
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Rerank budget exhausted after {start} of {len(texts)} candidates")
+            pairs = [(query, text) for text in texts[start:start + self.batch_size]]
+            scores.extend(float(s) for s in self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False))
+        return scores
@@ -0,0 +1,52 @@
+from ..RerankerInterface import RerankerInterface
+import logging
+import json
+import re
+
+class LLMReranker(RerankerInterface):
+    """Scores all candidates with one generation call: the prompt asks for a JSON array with a 0-10 relevance
+    score per candidate, then lists them numbered. Output that does not parse into one score per candidate is an
+    error, so the caller keeps the retrieval order.
+    Providers cut prompts to their input limit (`default_input_max_characters`), so candidate texts are shortened
+    until the whole prompt fits it."""
+
+    def __init__(self, generation_client, max_chars_per_text: int = 600, max_output_tokens: int = 200,
+                 max_prompt_chars: int = None):
+        self.generation_client = generation_client
+        self.max_chars_per_text = max_chars_per_text
+        self.max_output_tokens = max_output_tokens
+        self.max_prompt_chars = max_prompt_chars or getattr(generation_client, "default_input_max_characters", None)
+
+        self.logger = logging.getLogger(__name__)
+
+    def build_prompt(self, query: str, texts: list) -> str:
+        # the instruction goes first: whatever a provider trims from the end, it is never the question
+        header = (
+            "Rate how relevant each candidate is to the query on a scale from 0 (unrelated) to 10 (exact match). "
+            f"Reply with only a JSON array of {len(texts)} numbers, one per candidate, in order.\n"
+            f"Query: {' '.join(query.split())}\n\nCandidates:"
+        )
+        labels = [f"\n[{i}] " for i in range(len(texts))]
+
+        max_chars = self.max_chars_per_text
+        if self.max_prompt_chars:
+            room = self.max_prompt_chars - len(header) - sum(len(label) for label in labels)
+            max_chars = min(max_chars, room // max(len(texts), 1))
+            if max_chars <= 0:
+                raise ValueError(f"{len(texts)} rerank candidates do not fit in {self.max_prompt_chars} prompt characters")
+
+        return header + "".join(label + " ".join(text.split())[:max_chars].rstrip() for label, text in zip(labels, texts))
+
+    def parse_scores(self, answer: str, expected: int) -> list:
+        match = re.search(r"\[[^\[\]]*\]", answer or "")
+        if not match:
+            raise ValueError("No score array in reranker output")
+        scores = [float(s) for s in json.loads(match.group(0))]
+        if len(scores) != expected:
+            raise ValueError(f"Reranker returned {len(scores)} scores for {expected} candidates")
+        return scores
+
+    def score(self, query: str, texts: list, deadline: float = None) -> list:
+        answer = self.generation_client.generate_text(prompt=self.build_prompt(query, texts),
+                                                      max_output_tokens=self.max_output_tokens, temperature=0.0)
+        return self.parse_scores(answer, len(texts))
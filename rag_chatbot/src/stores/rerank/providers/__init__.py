@@ -0,0 +1,9 @@
+# the cross-encoder needs sentence-transformers (and torch); keep the LLM reranker usable without them
+try:
+    from .CrossEncoderReranker import CrossEncoderReranker
+except Exception:
+    CrossEncoderReranker = None
+
+from .LLMReranker import LLMReranker
+
+__all__ = ["CrossEncoderReranker", "LLMReranker"]
@@ -0,0 +1,117 @@
+import numpy as np
+import logging
+
+class IVFFlatIndex:
+    """Inverted-file (IVF-flat) index over the rows of an in-memory collection matrix.
+    Rows are clustered with spherical k-means; a query only scans the rows of its `nprobe`
+    closest clusters. The index stores row ids, never copies of the vectors.
+    """
+
+    def __init__(self, nlist: int = None, nprobe: int = 8, n_iter: int = 10,
+                 sample_per_list: int = 64, seed: int = 0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.n_iter = n_iter
+        self.sample_per_list = sample_per_list
+        self.seed = seed
+
+        self.centroids = None        # (nlist x dim) unit vectors
+        self.assignments = np.zeros((0,), dtype=np.int32)
+        self.trained_size = 0
+        self._order = None           # row ids sorted by list
+        self._offsets = None         # list boundaries into _order
+
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def indexed_size(self) -> int:
+        return self.assignments.shape[0]
+
+    def reset(self):
+        self.centroids = None
+        self.assignments = np.zeros((0,), dtype=np.int32)
+        self.trained_size = 0
+        self._order = None
+        self._offsets = None
+
+    def needs_training(self, size: int) -> bool:
+        # retrain once the collection has doubled since the last training so centroids keep up with the data
+        return self.centroids is None or size > 2 * self.trained_size
+
+    @staticmethod
+    def _normalize(rows: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(rows, axis=1, keepdims=True)
+        return np.divide(rows, norms, out=np.zeros_like(rows), where=norms > 0)
+
+    def _assign(self, matrix: np.ndarray, start: int, end: int, block: int = 65536) -> np.ndarray:
+        out = np.empty((end - start,), dtype=np.int32)
+        for i in range(start, end, block):
+            j = min(i + block, end)
+            out[i - start:j - start] = np.argmax(self._normalize(matrix[i:j]) @ self.centroids.T, axis=1)
+        return out
+
+    def train(self, matrix: np.ndarray, size: int):
+        """Cluster the first `size` rows of `matrix` and assign every row to a list."""
+        rng = np.random.default_rng(self.seed)
+        nlist = self.nlist or max(1, int(np.sqrt(size)))
+        nlist = min(nlist, size)
+
+        sample_size = min(size, nlist * self.sample_per_list)
+        sample_ids = rng.choice(size, sample_size, replace=False) if sample_size < size else np.arange(size)
+        data = self._normalize(matrix[np.sort(sample_ids)])
+
+        centroids = data[rng.choice(data.shape[0], nlist, replace=False)].copy()
+        for _ in range(self.n_iter):
+            assign = np.argmax(data @ centroids.T, axis=1)
+            counts = np.bincount(assign, minlength=nlist)
+            order = np.argsort(assign, kind="stable")
+            present = np.flatnonzero(counts)
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[present]
+            centroids[present] = np.add.reduceat(data[order], starts, axis=0)
+            empty = np.flatnonzero(counts == 0)
+            if empty.size:
+                centroids[empty] = data[rng.choice(data.shape[0], empty.size)]
+            centroids = self._normalize(centroids)
+
+        self.centroids = centroids.astype(np.float32)
+        self.assignments = self._assign(matrix, 0, size)
+        self.trained_size = size
+        self._order = None
+        self.logger.info(f"IVF index trained: {size} rows, {nlist} lists")
+
+    def add(self, matrix: np.ndarray, start: int, end: int):
+        """Assign rows [start, end) that were appended after training."""
+        if end <= start:
+            return
+        self.assignments = np.concatenate((self.assignments, self._assign(matrix, start, end)))
+        self._order = None
+
+    def update(self, matrix: np.ndarray, rows: list):
+        """Reassign rows whose vectors were overwritten in place."""
+        rows = np.asarray(rows, dtype=np.int64)
+        rows = rows[rows < self.indexed_size]
+        if rows.size == 0:
+            return
+        self.assignments[rows] = np.argmax(self._normalize(matrix[rows]) @ self.centroids.T, axis=1)
+        self._order = None
+
+    def _lists(self):
+        if self._order is None:
+            counts = np.bincount(self.assignments, minlength=self.centroids.shape[0])
+            self._order = np.argsort(self.assignments, kind="stable")
+            self._offsets = np.concatenate(([0], np.cumsum(counts)))
+        return self._order, self._offsets
+
+    def candidates(self, query: np.ndarray, nprobe: int = None) -> np.ndarray:
+        """Row ids stored in the `nprobe` lists closest to the query."""
+        order, offsets = self._lists()
+        nprobe = min(nprobe or self.nprobe, self.centroids.shape[0])
+
+        q_norm = np.linalg.norm(query)
+        cscores = self.centroids @ (query / q_norm if q_norm > 0 else query)
+        if nprobe < cscores.shape[0]:
+            probe = np.argpartition(-cscores, nprobe - 1)[:nprobe]
+        else:
+            probe = np.arange(cscores.shape[0])
+
+        return np.concatenate([order[offsets[c]:offsets[c + 1]] for c in probe])
@@ -6,4 +6,8 @@ class VectorDBEnums(Enum):
 
 class DistanceMethodEnums(Enum):
     COSINE = "cosine"
-    DOT = "dot"
\ No newline at end of file
+    DOT = "dot"
+
+class VectorDBIndexEnums(Enum):
+    FLAT = "flat"
+    IVF = "ivf"
@@ -46,6 +46,27 @@ class VectorDBInterface(ABC):
         pass
 
     @abstractmethod
-    def search_by_vector(self, collection_name: str, vector: list, limit: int):
+    def get_existing_ids(self, collection_name: str, record_ids: list) -> set:
+        pass
+
+    @abstractmethod
+    def delete_by_ids(self, collection_name: str, record_ids: list):
+        pass
+
+    @abstractmethod
+    def delete_by_filter(self, collection_name: str, filter: dict):
+        pass
+
+    @abstractmethod
+    def create_payload_index(self, collection_name: str, field_name: str):
+        pass
+
+    @abstractmethod
+    def search_by_vector(self, collection_name: str, vector: list, limit: int,
+                               filter: dict = None):
+        pass
+
+    @abstractmethod
+    def search_by_vectors(self, collection_name: str, vectors: list, limit: int,
+                                filter: dict = None):
         pass
-    
\ No newline at end of file
@@ -18,6 +18,16 @@ class VectorDBProviderFactory:
 
         if provider == VectorDBEnums.INMEMORY.value:
             # In-memory provider useful for local testing (no external deps)
-            return InMemoryDBProvider()
+            db_path = None
+            if self.config.VECTOR_DB_PATH:
+                db_path = self.base_controller.get_database_path(db_name=self.config.VECTOR_DB_PATH)
+
+            return InMemoryDBProvider(
+                db_path=db_path,
+                distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
+                index_type=self.config.VECTOR_DB_INDEX_TYPE,
+                ivf_nlist=self.config.VECTOR_DB_IVF_NLIST,
+                ivf_nprobe=self.config.VECTOR_DB_IVF_NPROBE,
+            )
         
         return None
\ No newline at end of file
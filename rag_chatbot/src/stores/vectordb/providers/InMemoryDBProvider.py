@@ -1,12 +1,33 @@
 from ..VectorDBInterface import VectorDBInterface
+from ..VectorDBEnums import DistanceMethodEnums, VectorDBIndexEnums
+from ..IVFFlatIndex import IVFFlatIndex
 from typing import List
-import math
+import numpy as np
+import threading
 import logging
+import json
+import os
+import shutil
 
 class InMemoryDBProvider(VectorDBInterface):
-    def __init__(self, db_path: str = None, distance_method: str = "cosine"):
-        self.store = {}  # collection_name -> { "vectors": [vec], "texts": [text], "metadata": [meta], "ids": [id] }
-        self.distance_method = distance_method
+    def __init__(self, db_path: str = None, distance_method: str = "cosine",
+                 index_type: str = VectorDBIndexEnums.FLAT.value,
+                 ivf_nlist: int = None, ivf_nprobe: int = 8, ivf_min_size: int = 10000):
+        # collection_name -> { "vectors": float32 matrix (capacity x dim), "norms": float32 (capacity,),
+        #                      "size": int, "texts": [text], "metadata": [meta], "ids": [id],
+        #                      "ivf": IVFFlatIndex or None,
+        #                      "inverted": { metadata_key: { value: [row ids] } },
+        #                      "id_index": { record_id: row },
+        #                      "lock": RLock held by writers and searches } }
+        self.store = {}
+        self.db_path = db_path  # snapshot directory; None disables persistence
+        self.distance_method = distance_method or DistanceMethodEnums.COSINE.value
+
+        # optional approximate search; collections smaller than ivf_min_size are always scanned exactly
+        self.index_type = index_type or VectorDBIndexEnums.FLAT.value
+        self.ivf_nlist = ivf_nlist
+        self.ivf_nprobe = ivf_nprobe or 8
+        self.ivf_min_size = ivf_min_size
         self.logger = logging.getLogger(__name__)
 
     def connect(self):
@@ -26,7 +47,12 @@ class InMemoryDBProvider(VectorDBInterface):
         if not self.is_collection_existed(collection_name):
             return {}
         col = self.store[collection_name]
-        return {"size": len(col["vectors"]) }
+        ivf = col.get("ivf")
+        return {
+            "size": col["size"],
+            "index_type": self.index_type,
+            "index_trained": bool(ivf and ivf.centroids is not None),
+        }
 
     def delete_collection(self, collection_name: str):
         if self.is_collection_existed(collection_name):
@@ -37,22 +63,197 @@ class InMemoryDBProvider(VectorDBInterface):
             self.delete_collection(collection_name)
 
         if not self.is_collection_existed(collection_name):
-            self.store[collection_name] = {"vectors": [], "texts": [], "metadata": [], "ids": []}
+            self.store[collection_name] = {
+                "vectors": np.zeros((0, embedding_size or 0), dtype=np.float32),
+                "norms": np.zeros((0,), dtype=np.float32),
+                "size": 0,
+                "texts": [], "metadata": [], "ids": [],
+                "ivf": None,
+                "inverted": {},
+                "id_index": {},
+                # ingest/index jobs write on worker threads while requests search: changes and searches hold it
+                "lock": threading.RLock(),
+            }
             return True
         return False
 
+    def create_payload_index(self, collection_name: str, field_name: str):
+        # every scalar top-level metadata key is indexed on insert; nothing extra to build
+        return self.is_collection_existed(collection_name)
+
+    def _index_metadata(self, col: dict, start: int, metadata: list):
+        """Add rows starting at `start` to the inverted index (scalar top-level metadata values only)."""
+        inverted = col["inverted"]
+        for row, meta in enumerate(metadata, start=start):
+            if not isinstance(meta, dict):
+                continue
+            for key, value in meta.items():
+                if isinstance(value, (str, int, float, bool)):
+                    inverted.setdefault(key, {}).setdefault(value, []).append(row)
+
+    def _unindex_metadata(self, col: dict, row: int, meta: dict):
+        if not isinstance(meta, dict):
+            return
+        for key, value in meta.items():
+            if isinstance(value, (str, int, float, bool)):
+                postings = col["inverted"].get(key, {}).get(value)
+                if postings and row in postings:
+                    postings.remove(row)
+
+    def _rebuild_indexes(self, col: dict):
+        """Recompute the record_id and metadata indexes from the row lists (after restore or compaction)."""
+        col["id_index"] = {rid: row for row, rid in enumerate(col["ids"]) if rid is not None}
+        col["inverted"] = {}
+        self._index_metadata(col, 0, col["metadata"])
+
+    def _filter_rows(self, col: dict, filter: dict) -> np.ndarray:
+        """Row ids whose metadata matches every {key: value | [values]} pair of the filter."""
+        rows = None
+        for key, value in filter.items():
+            postings = col["inverted"].get(key, {})
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            key_rows = np.unique(np.fromiter((r for v in values for r in postings.get(v, [])), dtype=np.int64))
+            rows = key_rows if rows is None else np.intersect1d(rows, key_rows, assume_unique=True)
+            if rows.size == 0:
+                break
+        return rows if rows is not None else np.arange(col["size"])
+
+    def snapshot(self, path: str = None) -> bool:
+        """Write every collection to `path` (default: db_path) as <collection>/vectors.npy,
+        norms.npy and a payloads.json sidecar. Each collection is written to a temp dir and swapped in."""
+        path = path or self.db_path
+        if not path:
+            self.logger.error("No snapshot path configured for InMemoryDBProvider")
+            return False
+
+        os.makedirs(path, exist_ok=True)
+        for name, col in list(self.store.items()):
+            target = os.path.join(path, name)
+            tmp = target + ".tmp"
+            shutil.rmtree(tmp, ignore_errors=True)
+            os.makedirs(tmp)
+
+            with col["lock"]:
+                size = col["size"]
+                np.save(os.path.join(tmp, "vectors.npy"), np.ascontiguousarray(col["vectors"][:size]))
+                np.save(os.path.join(tmp, "norms.npy"), np.ascontiguousarray(col["norms"][:size]))
+                with open(os.path.join(tmp, "payloads.json"), "w", encoding="utf-8") as f:
+                    json.dump({"texts": col["texts"], "metadata": col["metadata"], "ids": col["ids"]},
+                              f, ensure_ascii=False, separators=(",", ":"))
+
+            shutil.rmtree(target, ignore_errors=True)
+            os.replace(tmp, target)
+
+        # drop snapshots of collections that no longer exist
+        for name in os.listdir(path):
+            if name not in self.store and os.path.isfile(os.path.join(path, name, "vectors.npy")):
+                shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+        self.logger.info(f"Snapshot written: {len(self.store)} collections -> {path}")
+        return True
+
+    def restore(self, path: str = None) -> bool:
+        """Load collections written by snapshot(). Vectors are memory-mapped read-only and only
+        copied into RAM when the collection is next modified."""
+        path = path or self.db_path
+        if not path or not os.path.isdir(path):
+            return False
+
+        restored = 0
+        for name in os.listdir(path):
+            col_dir = os.path.join(path, name)
+            vectors_path = os.path.join(col_dir, "vectors.npy")
+            if name.endswith(".tmp") or not os.path.isfile(vectors_path):
+                continue
+            try:
+                vectors = np.load(vectors_path, mmap_mode="r")
+                norms = np.load(os.path.join(col_dir, "norms.npy"), mmap_mode="r")
+                with open(os.path.join(col_dir, "payloads.json"), "r", encoding="utf-8") as f:
+                    payloads = json.load(f)
+            except Exception as e:
+                self.logger.error(f"Could not restore collection {name}: {e}")
+                continue
+
+            self.store[name] = {
+                "vectors": vectors,
+                "norms": norms,
+                "size": vectors.shape[0],
+                "texts": payloads["texts"],
+                "metadata": payloads["metadata"],
+                "ids": payloads["ids"],
+                "ivf": None,
+                "lock": threading.RLock(),
+            }
+            self._rebuild_indexes(self.store[name])
+            restored += 1
+
+        self.logger.info(f"Restored {restored} collections from {path}")
+        return restored > 0
+
+    def _append_vectors(self, col: dict, vectors: list):
+        """Append rows to the collection matrix, growing its capacity geometrically."""
+        new_rows = np.asarray(vectors, dtype=np.float32)
+        if new_rows.ndim == 1:
+            new_rows = new_rows.reshape(1, -1)
+
+        size = col["size"]
+        matrix = col["vectors"]
+
+        if size == 0 and matrix.shape[1] != new_rows.shape[1]:
+            # embedding size was unknown (or wrong) at creation time; adopt the first batch's dimension
+            matrix = np.zeros((0, new_rows.shape[1]), dtype=np.float32)
+
+        if new_rows.shape[1] != matrix.shape[1]:
+            raise ValueError(f"Vector size {new_rows.shape[1]} does not match collection size {matrix.shape[1]}")
+
+        needed = size + new_rows.shape[0]
+        if needed > matrix.shape[0]:
+            capacity = max(needed, 2 * matrix.shape[0], 64)
+            grown = np.zeros((capacity, matrix.shape[1]), dtype=np.float32)
+            grown[:size] = matrix[:size]
+            norms = np.zeros((capacity,), dtype=np.float32)
+            norms[:size] = col["norms"][:size]
+            matrix = grown
+            col["norms"] = norms
+
+        matrix[size:needed] = new_rows
+        col["norms"][size:needed] = np.linalg.norm(new_rows, axis=1)
+        col["vectors"] = matrix
+        col["size"] = needed
+
+    def _ensure_writable(self, col: dict):
+        # restored collections are read-only memory maps; copy them into RAM before modifying rows in place
+        if not col["vectors"].flags.writeable:
+            col["vectors"] = np.array(col["vectors"])
+            col["norms"] = np.array(col["norms"])
+
+    def _replace_rows(self, col: dict, rows: list, texts: list, vectors: list, metadata: list):
+        """Overwrite existing rows in place (upsert of already-known record ids)."""
+        new_rows = np.asarray(vectors, dtype=np.float32).reshape(len(rows), -1)
+        if new_rows.shape[1] != col["vectors"].shape[1]:
+            raise ValueError(f"Vector size {new_rows.shape[1]} does not match collection size {col['vectors'].shape[1]}")
+
+        self._ensure_writable(col)
+        col["vectors"][rows] = new_rows
+        col["norms"][rows] = np.linalg.norm(new_rows, axis=1)
+
+        for row, text, meta in zip(rows, texts, metadata):
+            self._unindex_metadata(col, row, col["metadata"][row])
+            col["texts"][row] = text
+            col["metadata"][row] = meta
+            self._index_metadata(col, row, [meta])
+
+        if col.get("ivf") is not None and col["ivf"].centroids is not None:
+            col["ivf"].update(col["vectors"], rows)
+
     def insert_one(self, collection_name: str, text: str, vector: list, metadata: dict = None, record_id: str = None):
         if not self.is_collection_existed(collection_name):
             self.logger.error(f"Can not insert new record to non-existed collection: {collection_name}")
             return False
-        col = self.store[collection_name]
-        col["vectors"].append(vector)
-        col["texts"].append(text)
-        col["metadata"].append(metadata)
-        col["ids"].append(record_id)
-        return True
+        return self.insert_many(collection_name, texts=[text], vectors=[vector], metadata=[metadata], record_ids=[record_id])
 
     def insert_many(self, collection_name: str, texts: list, vectors: list, metadata: list = None, record_ids: list = None, batch_size: int = 50):
+        """Insert records; a record whose id is already stored replaces that row (upsert)."""
         if metadata is None:
             metadata = [None] * len(texts)
         if record_ids is None:
@@ -62,34 +263,186 @@ class InMemoryDBProvider(VectorDBInterface):
             self.logger.error(f"Collection does not exist: {collection_name}")
             return False
 
+        if len(texts) == 0:
+            return True
+
         col = self.store[collection_name]
-        for i in range(len(texts)):
-            col["vectors"].append(vectors[i])
-            col["texts"].append(texts[i])
-            col["metadata"].append(metadata[i])
-            col["ids"].append(record_ids[i])
+        with col["lock"]:
+            return self._insert_rows(col, texts, vectors, metadata, record_ids)
+
+    def _insert_rows(self, col: dict, texts: list, vectors: list, metadata: list, record_ids: list) -> bool:
+        # split into updates of known ids and appends; a repeated id within the batch keeps its last occurrence
+        updates = {}    # existing row -> batch position
+        new_ids = {}    # new record id -> batch position
+        anonymous = []  # batch positions of records without an id
+        for i, rid in enumerate(record_ids):
+            if rid is None:
+                anonymous.append(i)
+            elif rid in col["id_index"]:
+                updates[col["id_index"][rid]] = i
+            else:
+                new_ids[rid] = i
+
+        try:
+            if updates:
+                rows = list(updates.keys())
+                positions = list(updates.values())
+                self._replace_rows(col, rows, [texts[i] for i in positions], [vectors[i] for i in positions],
+                                   [metadata[i] for i in positions])
+
+            positions = sorted(list(new_ids.values()) + anonymous)
+            if positions:
+                start = col["size"]
+                self._append_vectors(col, [vectors[i] for i in positions])
+                col["texts"].extend(texts[i] for i in positions)
+                col["metadata"].extend(metadata[i] for i in positions)
+                col["ids"].extend(record_ids[i] for i in positions)
+                self._index_metadata(col, start, [metadata[i] for i in positions])
+                for row, i in enumerate(positions, start=start):
+                    if record_ids[i] is not None:
+                        col["id_index"][record_ids[i]] = row
+        except ValueError as e:
+            self.logger.error(f"Error while inserting batch: {e}")
+            return False
 
         return True
 
-    def _cosine_similarity(self, a, b):
-        # safe cosine similarity
-        dot = sum(x*y for x,y in zip(a,b))
-        norm_a = math.sqrt(sum(x*x for x in a))
-        norm_b = math.sqrt(sum(x*x for x in b))
-        if norm_a == 0 or norm_b == 0:
-            return 0.0
-        return dot / (norm_a * norm_b)
+    def get_existing_ids(self, collection_name: str, record_ids: list) -> set:
+        """The subset of record ids that already have a row in the collection."""
+        if not self.is_collection_existed(collection_name):
+            return set()
+        col = self.store[collection_name]
+        with col["lock"]:
+            return {rid for rid in record_ids if rid in col["id_index"]}
 
-    def search_by_vector(self, collection_name: str, vector: list, limit: int = 5):
+    def delete_by_ids(self, collection_name: str, record_ids: list):
+        """Remove the rows stored under the given record ids and compact the collection."""
         if not self.is_collection_existed(collection_name):
-            return []
+            return False
         col = self.store[collection_name]
-        scores = []
-        for i, v in enumerate(col["vectors"]):
-            score = self._cosine_similarity(vector, v)
-            scores.append((i, score))
-        scores.sort(key=lambda x: x[1], reverse=True)
+
+        with col["lock"]:
+            self._delete_rows(col, [col["id_index"][rid] for rid in record_ids if rid in col["id_index"]])
+        return True
+
+    def delete_by_filter(self, collection_name: str, filter: dict):
+        """Remove every row whose metadata matches the filter (same syntax as search_by_vector)."""
+        if not self.is_collection_existed(collection_name):
+            return False
+        if not filter:
+            self.logger.error("Refusing to delete with an empty filter")
+            return False
+        col = self.store[collection_name]
+
+        with col["lock"]:
+            self._delete_rows(col, self._filter_rows(col, filter).tolist())
+        return True
+
+    def _delete_rows(self, col: dict, rows: list):
+        if not rows:
+            return
+
+        size = col["size"]
+        keep = np.ones((size,), dtype=bool)
+        keep[rows] = False
+        kept = np.flatnonzero(keep)
+
+        col["vectors"] = col["vectors"][:size][keep]
+        col["norms"] = col["norms"][:size][keep]
+        col["size"] = int(kept.shape[0])
+        col["texts"] = [col["texts"][i] for i in kept]
+        col["metadata"] = [col["metadata"][i] for i in kept]
+        col["ids"] = [col["ids"][i] for i in kept]
+        col["ivf"] = None  # row ids shifted; the index is retrained on the next search
+        self._rebuild_indexes(col)
+
+    def _score(self, col: dict, queries: np.ndarray, rows: np.ndarray = None) -> np.ndarray:
+        """Score stored rows (all of them, or only `rows`) against a (n_queries x dim) block in a single matrix product."""
+        size = col["size"]
+        vectors = col["vectors"][:size] if rows is None else col["vectors"][rows]
+        norms = col["norms"][:size] if rows is None else col["norms"][rows]
+        scores = queries @ vectors.T
+
+        if self.distance_method == DistanceMethodEnums.DOT.value:
+            return scores
+
+        # cosine: divide by precomputed row norms; zero-norm rows score 0.0
+        q_norms = np.linalg.norm(queries, axis=1)
+        denom = np.outer(q_norms, norms)
+        return np.divide(scores, denom, out=np.zeros_like(scores), where=denom > 0)
+
+    def _top_k(self, scores: np.ndarray, limit: int) -> np.ndarray:
+        """Indices of the `limit` best scores, best first, without sorting the whole array."""
+        if limit >= scores.shape[0]:
+            return np.argsort(-scores, kind="stable")
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        return top[np.argsort(-scores[top], kind="stable")]
+
+    def _to_hits(self, col: dict, scores: np.ndarray, limit: int, rows: np.ndarray = None) -> list:
         out = []
-        for idx, score in scores[:limit]:
-            out.append({"payload": {"text": col["texts"][idx], "metadata": col["metadata"][idx]}, "score": score})
+        for pos in self._top_k(scores, limit):
+            idx = pos if rows is None else rows[pos]
+            out.append({"payload": {"text": col["texts"][idx], "metadata": col["metadata"][idx]}, "score": float(scores[pos])})
         return out
+
+    def _get_ivf(self, col: dict):
+        """Return an up-to-date IVF index for the collection, or None when exact search should be used."""
+        if self.index_type != VectorDBIndexEnums.IVF.value or col["size"] < self.ivf_min_size:
+            return None
+
+        ivf = col.get("ivf")
+        if ivf is None:
+            ivf = IVFFlatIndex(nlist=self.ivf_nlist, nprobe=self.ivf_nprobe)
+            col["ivf"] = ivf
+
+        if ivf.needs_training(col["size"]):
+            ivf.train(col["vectors"], col["size"])
+        elif ivf.indexed_size < col["size"]:
+            ivf.add(col["vectors"], ivf.indexed_size, col["size"])
+        return ivf
+
+    def _search_block(self, col: dict, queries: np.ndarray, limit: int, filter: dict = None) -> list:
+        if filter:
+            # exact scan over the matching subset only; cost scales with the subset, not the collection
+            rows = self._filter_rows(col, filter)
+            if rows.size == 0:
+                return [[] for _ in queries]
+            return [self._to_hits(col, row, limit, rows=rows) for row in self._score(col, queries, rows=rows)]
+
+        ivf = self._get_ivf(col)
+        if ivf is None:
+            return [self._to_hits(col, row, limit) for row in self._score(col, queries)]
+
+        out = []
+        for query in queries:
+            rows = ivf.candidates(query)
+            scores = self._score(col, query.reshape(1, -1), rows=rows)[0]
+            out.append(self._to_hits(col, scores, limit, rows=rows))
+        return out
+
+    def _as_queries(self, col: dict, vectors: list) -> np.ndarray:
+        queries = np.asarray(vectors, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+        if queries.shape[1] != col["vectors"].shape[1]:
+            raise ValueError(f"Query vector size {queries.shape[1]} does not match collection size {col['vectors'].shape[1]}")
+        return queries
+
+    def search_by_vector(self, collection_name: str, vector: list, limit: int = 5, filter: dict = None):
+        if not self.is_collection_existed(collection_name):
+            return []
+        col = self.store[collection_name]
+        with col["lock"]:
+            if col["size"] == 0 or not limit or limit <= 0:
+                return []
+            return self._search_block(col, self._as_queries(col, [vector]), limit, filter=filter)[0]
+
+    def search_by_vectors(self, collection_name: str, vectors: list, limit: int = 5, filter: dict = None):
+        """Search several query vectors at once; returns one hit list per query, in order."""
+        if not self.is_collection_existed(collection_name):
+            return [[] for _ in vectors]
+        col = self.store[collection_name]
+        with col["lock"]:
+            if col["size"] == 0 or not limit or limit <= 0 or len(vectors) == 0:
+                return [[] for _ in vectors]
+            return self._search_block(col, self._as_queries(col, vectors), limit, filter=filter)
@@ -2,8 +2,12 @@ from qdrant_client import models, QdrantClient
 from ..VectorDBInterface import VectorDBInterface
 from ..VectorDBEnums import DistanceMethodEnums
 import logging
+import uuid
 from typing import List
 
+# namespace for deriving UUIDv5 point ids from application record ids (e.g. patient_id)
+RECORD_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "rafeek/vectordb/record_id")
+
 class QdrantDBProvider(VectorDBInterface):
 
     def __init__(self, db_path: str, distance_method: str):
@@ -57,25 +61,33 @@ class QdrantDBProvider(VectorDBInterface):
         
         return False
     
+    def get_point_id(self, record_id):
+        """Deterministic Qdrant point id for a record id, so re-inserting a record replaces its point."""
+        if record_id is None:
+            return str(uuid.uuid4())
+        return str(uuid.uuid5(RECORD_ID_NAMESPACE, str(record_id)))
+
     def insert_one(self, collection_name: str, text: str, vector: list,
                          metadata: dict = None, 
-                         record_id: str = None):
+                         record_id: str = None, wait: bool = True):
         
         if not self.is_collection_existed(collection_name):
             self.logger.error(f"Can not insert new record to non-existed collection: {collection_name}")
             return False
         
         try:
-            _ = self.client.upload_records(
+            _ = self.client.upsert(
                 collection_name=collection_name,
-                records=[
-                    models.Record(
+                points=[
+                    models.PointStruct(
+                        id=self.get_point_id(record_id),
                         vector=vector,
                         payload={
-                            "text": text, "metadata": metadata
+                            "text": text, "metadata": metadata, "record_id": record_id
                         }
                     )
-                ]
+                ],
+                wait=wait
             )
         except Exception as e:
             self.logger.error(f"Error while inserting batch: {e}")
@@ -85,7 +97,8 @@ class QdrantDBProvider(VectorDBInterface):
     
     def insert_many(self, collection_name: str, texts: list, 
                           vectors: list, metadata: list = None, 
-                          record_ids: list = None, batch_size: int = 50):
+                          record_ids: list = None, batch_size: int = 50,
+                          wait: bool = True):
         
         if metadata is None:
             metadata = [None] * len(texts)
@@ -99,12 +112,15 @@ class QdrantDBProvider(VectorDBInterface):
             batch_texts = texts[i:batch_end]
             batch_vectors = vectors[i:batch_end]
             batch_metadata = metadata[i:batch_end]
+            batch_record_ids = record_ids[i:batch_end]
 
-            batch_records = [
-                models.Record(
+            batch_points = [
+                models.PointStruct(
+                    id=self.get_point_id(batch_record_ids[x]),
                     vector=batch_vectors[x],
                     payload={
-                        "text": batch_texts[x], "metadata": batch_metadata[x]
+                        "text": batch_texts[x], "metadata": batch_metadata[x],
+                        "record_id": batch_record_ids[x]
                     }
                 )
 
@@ -112,20 +128,128 @@ class QdrantDBProvider(VectorDBInterface):
             ]
 
             try:
-                _ = self.client.upload_records(
+                _ = self.client.upsert(
                     collection_name=collection_name,
-                    records=batch_records,
+                    points=batch_points,
+                    wait=wait
                 )
             except Exception as e:
                 self.logger.error(f"Error while inserting batch: {e}")
                 return False
 
         return True
+
+    def get_existing_ids(self, collection_name: str, record_ids: list) -> set:
+        """The subset of record ids that already have a point in the collection."""
+        if not record_ids or not self.is_collection_existed(collection_name):
+            return set()
+
+        by_point_id = {self.get_point_id(rid): rid for rid in record_ids}
+        try:
+            points = self.client.retrieve(
+                collection_name=collection_name,
+                ids=list(by_point_id.keys()),
+                with_payload=False,
+                with_vectors=False
+            )
+        except Exception as e:
+            self.logger.error(f"Error while retrieving points: {e}")
+            return set()
+
+        return {by_point_id[str(point.id)] for point in points if str(point.id) in by_point_id}
+
+    def delete_by_ids(self, collection_name: str, record_ids: list, wait: bool = True):
+
+        if not record_ids:
+            return True
+
+        try:
+            _ = self.client.delete(
+                collection_name=collection_name,
+                points_selector=models.PointIdsList(
+                    points=[self.get_point_id(rid) for rid in record_ids]
+                ),
+                wait=wait
+            )
+        except Exception as e:
+            self.logger.error(f"Error while deleting points: {e}")
+            return False
+
+        return True
+
+    def delete_by_filter(self, collection_name: str, filter: dict, wait: bool = True):
+
+        if not filter:
+            self.logger.error("Refusing to delete with an empty filter")
+            return False
+
+        try:
+            _ = self.client.delete(
+                collection_name=collection_name,
+                points_selector=models.FilterSelector(
+                    filter=self._build_filter(filter)
+                ),
+                wait=wait
+            )
+        except Exception as e:
+            self.logger.error(f"Error while deleting points by filter: {e}")
+            return False
+
+        return True
         
-    def search_by_vector(self, collection_name: str, vector: list, limit: int = 5):
+    def create_payload_index(self, collection_name: str, field_name: str):
+        # metadata is nested under the "metadata" payload key
+        try:
+            self.client.create_payload_index(
+                collection_name=collection_name,
+                field_name=f"metadata.{field_name}",
+                field_schema=models.PayloadSchemaType.KEYWORD,
+            )
+        except Exception as e:
+            self.logger.error(f"Error while creating payload index on {field_name}: {e}")
+            return False
+
+        return True
+
+    def _build_filter(self, filter: dict = None):
+        """Translate {metadata_key: value | [values]} into a Qdrant filter (all keys must match)."""
+        if not filter:
+            return None
+
+        conditions = []
+        for key, value in filter.items():
+            if isinstance(value, (list, tuple, set)):
+                match = models.MatchAny(any=list(value))
+            else:
+                match = models.MatchValue(value=value)
+            conditions.append(models.FieldCondition(key=f"metadata.{key}", match=match))
+
+        return models.Filter(must=conditions)
+
+    def search_by_vector(self, collection_name: str, vector: list, limit: int = 5,
+                               filter: dict = None):
 
         return self.client.search(
             collection_name=collection_name,
             query_vector=vector,
+            query_filter=self._build_filter(filter),
             limit=limit
-        )
\ No newline at end of file
+        )
+
+    def search_by_vectors(self, collection_name: str, vectors: list, limit: int = 5,
+                                filter: dict = None):
+
+        query_filter = self._build_filter(filter)
+
+        return self.client.search_batch(
+            collection_name=collection_name,
+            requests=[
+                models.SearchRequest(
+                    vector=vector,
+                    filter=query_filter,
+                    limit=limit,
+                    with_payload=True
+                )
+                for vector in vectors
+            ]
+        )
@@ -0,0 +1,74 @@
+"""Recall-vs-latency report for the in-memory vector store: exact (flat) scan vs IVF-flat index.
+
+Vectors are synthetic clustered embeddings so the numbers are reproducible without any API key.
+Run from rag_chatbot/src (or with it on PYTHONPATH):
+
+    python ../../scripts/benchmark_inmemory_ann.py --sizes 20000 100000 --dim 256
+
+The printed markdown table can be pasted into docs/inmemory_ann_report.md.
+"""
+import argparse
+import time
+import numpy as np
+from stores.vectordb.providers import InMemoryDBProvider
+from stores.vectordb.VectorDBEnums import VectorDBIndexEnums
+
+
+def make_data(n: int, dim: int, n_queries: int, n_topics: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    topics = rng.normal(size=(n_topics, dim))
+    vectors = topics[rng.integers(0, n_topics, n)] + 1.5 * rng.normal(size=(n, dim))
+    queries = topics[rng.integers(0, n_topics, n_queries)] + 1.5 * rng.normal(size=(n_queries, dim))
+    return vectors.astype(np.float32), queries.astype(np.float32)
+
+
+def build(index_type: str, vectors: np.ndarray, nprobe: int = 8):
+    provider = InMemoryDBProvider(index_type=index_type, ivf_nprobe=nprobe, ivf_min_size=0)
+    provider.create_collection("bench", embedding_size=vectors.shape[1])
+    provider.insert_many("bench", texts=[str(i) for i in range(len(vectors))], vectors=vectors)
+    return provider
+
+
+def timed_search(provider, queries: np.ndarray, k: int):
+    hits, latencies = [], []
+    for q in queries:
+        start = time.perf_counter()
+        res = provider.search_by_vector("bench", q, limit=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits.append({h["payload"]["text"] for h in res})
+    return hits, np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20000, 100000])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    print(f"| rows | index | nprobe | recall@{args.k} | p50 ms | p95 ms | build/train s |")
+    print("|---:|---|---:|---:|---:|---:|---:|")
+
+    for n in args.sizes:
+        vectors, queries = make_data(n, args.dim, args.queries, n_topics=max(16, n // 500))
+
+        exact = build(VectorDBIndexEnums.FLAT.value, vectors)
+        truth, lat = timed_search(exact, queries, args.k)
+        print(f"| {n} | flat | - | 1.000 | {np.percentile(lat, 50):.2f} | {np.percentile(lat, 95):.2f} | - |")
+
+        ivf = build(VectorDBIndexEnums.IVF.value, vectors)
+        start = time.perf_counter()
+        ivf.search_by_vector("bench", queries[0], limit=args.k)  # first search trains the index
+        train_s = time.perf_counter() - start
+
+        for nprobe in args.nprobe:
+            ivf.store["bench"]["ivf"].nprobe = nprobe
+            hits, lat = timed_search(ivf, queries, args.k)
+            recall = np.mean([len(h & t) / args.k for h, t in zip(hits, truth)])
+            print(f"| {n} | ivf | {nprobe} | {recall:.3f} | {np.percentile(lat, 50):.2f} | {np.percentile(lat, 95):.2f} | {train_s:.2f} |")
+
+
+if __name__ == "__main__":
+    main()
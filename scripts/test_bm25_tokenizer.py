@@ -0,0 +1,22 @@
+"""Check that the BM25 tokenizer keeps biomarker signs and compound terms"""
+from stores.lexical.BM25Index import BM25Index, tokenize
+
+cases = {
+    "ER+": ["er+"],
+    "ER-": ["er-"],
+    "HER2-": ["her2-"],
+    "AC-T": ["ac-t", "ac", "t"],
+    "ER- HER2-": ["er-", "her2-"],
+    "HER2+/ER-": ["her2+", "er-"],
+    "T1/N0+": ["t1/n0+", "t1", "n0+"],
+}
+for text, expected in cases.items():
+    tokens = tokenize(text)
+    assert tokens == expected, f"{text}: {tokens} != {expected}"
+    print(f"{text!r:14} -> {tokens}")
+
+index = BM25Index()
+index.add_many(["pos", "neg"], ["Biomarker status: ER+ PR+ HER2+", "Biomarker status: ER- PR- HER2-"])
+hits = index.search("ER- HER2-", limit=5)
+print("ER- HER2- ->", hits)
+assert [h["id"] for h in hits] == ["neg"], hits
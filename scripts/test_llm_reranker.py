@@ -0,0 +1,45 @@
+"""Check that a full LLM rerank prompt survives the providers' input truncation (process_text)"""
+import json
+import re
+from helpers.config import get_settings
+from stores.LLM.LLMProviderFactory import LLMProviderFactory
+from stores.patients.PatientRepository import DEFAULT_PATIENTS_PATH
+from stores.rerank.providers import LLMReranker
+from controllers.PatientController import PatientController
+
+settings = get_settings()
+CANDIDATES = 20
+
+
+class EchoScoresClient:
+    """Stands in for a generation provider: truncates the prompt like the real ones, then scores every
+    candidate it can still see by its number."""
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.default_input_max_characters = provider.default_input_max_characters
+        self.prompts = []
+
+    def generate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None, temperature: float = None):
+        seen = self.provider.process_text(prompt)
+        self.prompts.append(seen)
+        expected = int(re.search(r"JSON array of (\d+) numbers", seen).group(1))
+        visible = [int(i) for i in re.findall(r"^\[(\d+)\] ", seen, flags=re.M)]
+        return json.dumps([10 - i % 11 for i in visible] if len(visible) == expected else [])
+
+
+with open(DEFAULT_PATIENTS_PATH, "r", encoding="utf-8") as f:
+    patients = json.load(f)
+pc = PatientController()
+texts = [pc.summarize_patient(patients[i % len(patients)]) for i in range(CANDIDATES)]
+
+client = EchoScoresClient(LLMProviderFactory(settings).create(provider="LOCAL"))
+reranker = LLMReranker(generation_client=client)
+prompt = reranker.build_prompt("ER-positive patients after chemotherapy", texts)
+assert len(prompt) <= settings.INPUT_DAFAULT_MAX_CHARACTERS, len(prompt)
+
+scores = reranker.score("ER-positive patients after chemotherapy", texts)
+assert len(scores) == CANDIDATES, scores
+assert client.prompts[0] == prompt, "prompt was truncated"
+print(f"Prompt: {len(prompt)} chars for {CANDIDATES} candidates (limit {settings.INPUT_DAFAULT_MAX_CHARACTERS})")
+print("Scores:", scores)